@@ -15,8 +15,41 @@ class ClientSettingsDialog(base.modal.BaseModalSettingsDialog):
         self.server_url_edit.setText(config.state.url)
         form_lo.addRow(self.tr("Server URL"), self.server_url_edit)
 
+        self.motion_smoothing_checkbox = QtWidgets.QCheckBox()
+        self.motion_smoothing_checkbox.setChecked(config.state.motion_smoothing)
+        form_lo.addRow(self.tr("Smooth Motion"), self.motion_smoothing_checkbox)
+
+        self.motion_delay_spinbox = self._create_ms_spinbox(
+            "motion_interpolation_delay"
+        )
+        form_lo.addRow(self.tr("Interpolation Delay"), self.motion_delay_spinbox)
+
+        self.motion_horizon_spinbox = self._create_ms_spinbox(
+            "motion_prediction_horizon"
+        )
+        form_lo.addRow(self.tr("Prediction Horizon"), self.motion_horizon_spinbox)
+
+        self.motion_smoothing_checkbox.toggled.connect(
+            self.motion_delay_spinbox.setEnabled
+        )
+        self.motion_smoothing_checkbox.toggled.connect(
+            self.motion_horizon_spinbox.setEnabled
+        )
+        self.motion_delay_spinbox.setEnabled(config.state.motion_smoothing)
+        self.motion_horizon_spinbox.setEnabled(config.state.motion_smoothing)
+
+    def _create_ms_spinbox(self, key):
+        spinbox = QtWidgets.QSpinBox()
+        spinbox.setRange(config.schema[key]["min"], config.schema[key]["max"])
+        spinbox.setSuffix(" ms")
+        spinbox.setValue(getattr(config.state, key))
+        return spinbox
+
     def save(self):
         config.state.url = self.server_url_edit.text()
+        config.state.motion_smoothing = self.motion_smoothing_checkbox.isChecked()
+        config.state.motion_interpolation_delay = self.motion_delay_spinbox.value()
+        config.state.motion_prediction_horizon = self.motion_horizon_spinbox.value()
 
 
 class OpenClientSettingsDialogAction(base.modal.BaseOpenModalSettingsDialogAction):
@@ -1,28 +1,57 @@
 import logging
-from array import array
+import time
+from typing import Optional, Tuple
 
 from PyQt5.QtCore import QByteArray
 from PyQt5.QtWebSockets import QWebSocket
 
+from app import instrument
+
 log = logging.getLogger(__name__)
 
 
 class IOController:
+    """Ingests motion states received from the socket.
+
+    Each message is decoded once, on arrival, and given a sequence number and an
+    arrival timestamp, so a frame tick can skip stale states with a single integer
+    comparison and the input-to-display latency of each state can be measured.
+    """
+
     def __init__(self, socket: QWebSocket):
         self.socket = socket
-        self.motion_state = None
-        self.state_changed = False
+        self.motion_state: Optional[Tuple[float, ...]] = None
+        self.motion_state_time = 0  # Arrival time in perf_counter_ns() nanoseconds
+        self.sequence = 0
+        self.skipped_count = 0  # States replaced before a frame tick consumed them
 
-        self._curr_motion_state = QByteArray()
-        self._last_motion_state = QByteArray()
+        self._consumed_sequence = 0
+        self.last_latency = 0  # Nanoseconds between arrival and consumption
 
         self.socket.binaryMessageReceived.connect(self.received_bytes)
 
-    def received_bytes(self, qbytearray):
-        self._curr_motion_state = qbytearray
-
-    def get_new_motion_state(self):
-        if self._curr_motion_state == self._last_motion_state:
+    def received_bytes(self, qbytearray: QByteArray):
+        arrival_time = time.perf_counter_ns()
+        data = qbytearray.data()
+        if not data or len(data) % 8:
+            log.warning(f"Dropped malformed motion state length={len(data)}")
+            return
+        # Decode doubles straight from the message buffer, without an array copy
+        self.motion_state = tuple(memoryview(data).cast("d"))
+        self.motion_state_time = arrival_time
+        if self.sequence != self._consumed_sequence:
+            self.skipped_count += 1
+        self.sequence += 1
+
+    def has_new_motion_state(self) -> bool:
+        return self.sequence != self._consumed_sequence
+
+    @instrument.timed("io.get_new_motion_state")
+    def get_new_motion_state(self) -> Optional[Tuple[float, ...]]:
+        """Return the latest motion state if it has not been returned before."""
+        if self.sequence == self._consumed_sequence:
             return None
-        motion_state_array = array("d", self._curr_motion_state.data())
-        return motion_state_array
+        self._consumed_sequence = self.sequence
+        self.last_latency = time.perf_counter_ns() - self.motion_state_time
+        instrument.record("io.motion_state_latency", self.last_latency)
+        return self.motion_state
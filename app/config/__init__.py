@@ -6,7 +6,13 @@ log = logging.getLogger(__name__)
 
 
 SCHEMA = {
-    "loop_mode": {"type": str, "default": "off", "options": ("off", "one", "all")},
+    "loop_mode": {
+        "type": str,
+        "default": "off",
+        "options": ("off", "one", "all", "shuffle", "weighted"),
+    },
+    # Tag holding each item's weight in 'weighted' loop mode
+    "weight_tag": {"type": str, "default": "weight", "options": None},
     "stay_on_top": {"type": bool, "default": False, "options": (True, False)},
     "view_scale": {"type": float, "default": 1, "options": (0.25, 0.5, 1, 2)},
     "auto_resize": {"type": bool, "default": False, "options": (True, False)},
@@ -16,6 +22,10 @@ SCHEMA = {
         "default": "wss://seevr.herokuapp.com/mediaplayer",
         "options": None,
     },
+    # Remote viewpoint smoothing, with the delay and horizon in milliseconds
+    "motion_smoothing": {"type": bool, "default": False, "options": (True, False)},
+    "motion_interpolation_delay": {"type": int, "default": 20, "min": 0, "max": 200},
+    "motion_prediction_horizon": {"type": int, "default": 50, "min": 0, "max": 500},
     "volume": {"type": int, "default": 50, "min": 1, "max": 100},
     "tool_bar_area": {"type": str, "default": "bottom", "options": ("top", "bottom")},
     "meta_tags": {
@@ -61,6 +71,20 @@ SCHEMA = {
     "audio_eq_user_presets": {"type": dict, "default": {}, "options": ([])},
     # VLC options
     "hw_accel": {"type": bool, "default": True, "options": (True, False)},
+    # Render into a native window, or decode into memory through video callbacks
+    "video_output": {
+        "type": str,
+        "default": "window",
+        "options": ("window", "callbacks"),
+    },
+    # Media folders
+    "scan_recursive": {"type": bool, "default": True, "options": (True, False)},
+    "watch_directories": {"type": bool, "default": False, "options": (True, False)},
+    # Probe cache size in megabytes
+    "probe_cache_max_size": {"type": int, "default": 64, "min": 1, "max": 4096},
+    "playlist_thumbnails": {"type": bool, "default": False, "options": (True, False)},
+    # Thumbnail cache size in megabytes
+    "thumbnail_cache_max_size": {"type": int, "default": 256, "min": 1, "max": 4096},
 }
 
 
@@ -1,39 +1,84 @@
+import copy
 import sys
 
-from PyQt5.QtCore import QSettings
+from PyQt5.QtCore import QObject, QSettings, QTimer, pyqtSignal
 
 from app.config import SCHEMA
 
 
+class _StateSignals(QObject):
+    changed = pyqtSignal(str, object)
+
+
 class _State:
+    """In-memory snapshot of the validated settings values.
+
+    Reads are served from memory. Writes update memory, emit 'signals.changed' and
+    are flushed to the settings file together, once no write has happened for
+    'flush_interval' milliseconds.
+    """
+
+    flush_interval = 500  # ms
+
     _handlers: dict = {}
 
     _state: dict = {}
 
+    _dirty: set = set()
+
     def load(self, settings: QSettings):
         for key in SCHEMA.keys():
-            val = settings.value(key)
-            if val:
-                self._state[key] = val
+            value = settings.value(
+                key,
+                defaultValue=SCHEMA[key]["default"],
+                type=SCHEMA[key]["type"],
+            )
+            options = SCHEMA[key].get("options")
+            if options and value not in options:
+                value = SCHEMA[key]["default"]
+                settings.setValue(key, value)
+            self._state[key] = value
         super().__setattr__("settings", settings)
+        super().__setattr__("signals", _StateSignals())
+
+        flush_timer = QTimer(self.signals)
+        flush_timer.setSingleShot(True)
+        flush_timer.setInterval(self.flush_interval)
+        flush_timer.timeout.connect(self.flush)
+        super().__setattr__("flush_timer", flush_timer)
+
+    @staticmethod
+    def _coerce(key, value):
+        _type = SCHEMA[key]["type"]
+        if value is None or isinstance(value, _type):
+            return copy.deepcopy(value) if _type in (list, dict) else value
+        return _type(value)
 
     def __setattr__(self, key, value):
+        value = self._coerce(key, value)
         options = SCHEMA[key].get("options")  # Never throws error
         if options and value not in options:
             raise ValueError("Invalid value for this configuration setting")
-        self.settings.setValue(key, value)
+        if self._state.get(key) == value:
+            return
+        self._state[key] = value
+        self._dirty.add(key)
+        self.flush_timer.start()
+        self.signals.changed.emit(key, value)
 
     def __getattr__(self, key):
-        value = self.settings.value(
-            key,
-            defaultValue=SCHEMA[key]["default"],
-            type=SCHEMA[key]["type"],
-        )
-        options = SCHEMA[key].get("options")
-        if options and value not in options:
-            default = SCHEMA[key]["default"]
-            self.settings.setValue(key, default)
-        return value
+        try:
+            return self._state[key]
+        except KeyError:
+            return SCHEMA[key]["default"]
+
+    def flush(self):
+        """Write all pending changes to the settings file."""
+        self.flush_timer.stop()
+        for key in self._dirty:
+            self.settings.setValue(key, self._state[key])
+        self._dirty.clear()
+        self.settings.sync()
 
 
 # See here for explanation from Guido about why this is acceptable:
@@ -4,7 +4,7 @@ import sys
 
 from PyQt5.QtWidgets import QApplication
 
-from app import config
+from app import config, instrument
 
 from .info import BuildInformation
 from .utils import cached_property
@@ -53,6 +53,8 @@ class AppContext(BaseAppContext):
 
         window = MainWindow(
             media_player=self.media_player,
+            probe_cache=self.probe_cache,
+            thumbnail_cache=self.thumbnail_cache,
             stylesheet=self.stylesheet,
         )
         window.load_media(sys.argv[1:])
@@ -81,12 +83,36 @@ class AppContext(BaseAppContext):
             logger.setLevel(level)
             logger.info(f"SET LOGGER LOG LEVEL name={name} level={level}")
 
+        # Set hot path timings
+        player_timings = os.getenv("VR_PLAYER_TIMINGS", "")
+        options = {}
+        for i in player_timings.split(","):
+            name, _, value = i.strip().partition(":")
+            if name:
+                options[name] = value
+        if options and "on" not in options:
+            log.error(f"Timings not enabled, 'on' missing from '{player_timings}'")
+        elif options:
+            capacity = options.get("capacity", "")
+            if capacity.isdecimal() and int(capacity) >= 1:
+                instrument.enable(capacity=int(capacity))
+            else:
+                if capacity:
+                    log.error(
+                        f"Ignored timings capacity '{capacity}', expected an integer"
+                        " of at least 1"
+                    )
+                instrument.enable()
+            timings_file = options.get("file")
+            self.app.aboutToQuit.connect(lambda: instrument.dump(timings_file))
+
     def init_settings(self):
         settings = config.Settings(
             self.app.organizationName(), self.app.applicationName()
         )
         log.info(f"Configuration file: {settings.fileName()}")
         config.state.load(settings)
+        self.app.aboutToQuit.connect(config.state.flush)
 
     def init_vlc(self):
         import vlc
@@ -100,6 +126,31 @@ class AppContext(BaseAppContext):
 
         return vlcqt.MediaPlayer()
 
+    @cached_property
+    def probe_cache(self):
+        from app.playlist.cache import ProbeCache
+
+        settings_dir = os.path.dirname(config.state.settings.fileName())
+        cache = ProbeCache(
+            path=os.path.join(settings_dir, "probe_cache.sqlite3"),
+            max_size=config.state.probe_cache_max_size * 1024**2,
+        )
+        log.info(f"Probe cache file: {cache.path}")
+        self.app.aboutToQuit.connect(cache.close)
+        return cache
+
+    @cached_property
+    def thumbnail_cache(self):
+        from app.playlist.thumbnails import ThumbnailCache
+
+        settings_dir = os.path.dirname(config.state.settings.fileName())
+        cache = ThumbnailCache(
+            path=os.path.join(settings_dir, "thumbnails"),
+            max_size=config.state.thumbnail_cache_max_size * 1024**2,
+        )
+        log.info(f"Thumbnail cache directory: {cache.path}")
+        return cache
+
     @cached_property
     def stylesheet(self):
         qss_path = self.get_resource("style", "dark.qss")
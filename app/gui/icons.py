@@ -39,6 +39,8 @@ class AppIcons:
         self.loop_mode_off = qta.icon("mdi.repeat-off")
         self.loop_mode_one = qta.icon("mdi.repeat-once")
         self.loop_mode_all = qta.icon("mdi.repeat")
+        self.loop_mode_shuffle = qta.icon("mdi.shuffle-variant")
+        self.loop_mode_weighted = qta.icon("mdi.scale-balance")
         self.play_pause = qta.icon(
             "mdi.play",
             on="mdi.pause",
@@ -108,6 +110,7 @@ class AppIcons:
                 },
             ],
         )
+        self.save_playlist = qta.icon("mdi.content-save")
         self.open_file_menu = qta.icon(
             "mdi.file-plus", scale_factor=0.70, offset=(0, -0.06)
         )
@@ -0,0 +1,44 @@
+from PyQt5.QtCore import QTimer, pyqtSlot
+from PyQt5.QtWidgets import QPlainTextEdit
+
+from app import instrument
+from app.base.docking import DockableWidget
+from app.gui.fonts import get_fixed_pitch_font
+
+
+class TimingsWidget(QPlainTextEdit):
+    """Live report of the hot path timings, refreshed while it is visible."""
+
+    refresh_interval = 500  # ms
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.setReadOnly(True)
+        self.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.setFont(get_fixed_pitch_font())
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.refresh_interval)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, e):
+        self.refresh()
+        self.timer.start()
+        return super().showEvent(e)
+
+    def hideEvent(self, e):
+        self.timer.stop()
+        return super().hideEvent(e)
+
+    @pyqtSlot()
+    def refresh(self):
+        scroll_value = self.verticalScrollBar().value()
+        self.setPlainText(instrument.report())
+        self.verticalScrollBar().setValue(scroll_value)
+
+
+class DockableTimings(DockableWidget):
+    def __init__(self, parent):
+        super().__init__(
+            title="Timings", parent=parent, widget=TimingsWidget(), w_titlebar=True
+        )
+        self.toggleViewAction().setShortcut("Ctrl+Shift+T")
@@ -0,0 +1,135 @@
+import functools
+import logging
+from array import array
+from time import perf_counter_ns
+from typing import Callable, Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+PERCENTILES = (50, 95, 99)
+
+
+class TimingHistogram:
+    """Durations in nanoseconds of the latest 'capacity' calls of a hot path.
+
+    Samples are written over the oldest ones in a fixed array, so recording never
+    allocates. Percentiles are computed from the samples in the buffer when asked for.
+    """
+
+    def __init__(self, name: str, capacity: int):
+        self.name = name
+        self.capacity = capacity
+        self.samples = array("q", bytes(8 * capacity))
+        self.count = 0  # Total number of samples recorded, including overwritten ones
+
+    def record(self, duration_ns: int):
+        self.samples[self.count % self.capacity] = duration_ns
+        self.count += 1
+
+    def values(self) -> List[int]:
+        return list(self.samples[: min(self.count, self.capacity)])
+
+    def summary(self) -> dict:
+        """Count, mean, percentiles and maximum of the buffered samples, in ms."""
+        values = sorted(self.values())
+        if not values:
+            return {"count": 0}
+        summary = {"count": self.count, "mean": sum(values) / len(values) / 1e6}
+        for percentile in PERCENTILES:
+            rank = max(0, -(-percentile * len(values) // 100) - 1)  # Nearest rank
+            summary[f"p{percentile}"] = values[rank] / 1e6
+        summary["max"] = values[-1] / 1e6
+        return summary
+
+
+class _State:
+    enabled = False
+    capacity = 4096  # Samples kept per histogram
+    histograms: Dict[str, TimingHistogram] = {}
+    counters: Dict[str, Callable[[], dict]] = {}
+
+
+def enable(capacity: int = _State.capacity):
+    _State.enabled = True
+    _State.capacity = capacity
+    log.info(f"TIMINGS ENABLED capacity={capacity}")
+
+
+def is_enabled() -> bool:
+    return _State.enabled
+
+
+def histogram(name: str) -> TimingHistogram:
+    hist = _State.histograms.get(name)
+    if hist is None:
+        hist = _State.histograms[name] = TimingHistogram(name, _State.capacity)
+    return hist
+
+
+def record(name: str, duration_ns: int):
+    """Record a duration measured by the caller, if timings are enabled."""
+    if _State.enabled:
+        histogram(name).record(duration_ns)
+
+
+def timed(name: str):
+    """Decorator recording the duration of each call in the histogram 'name'. While
+    timings are disabled, calls only pay for one attribute check.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _State.enabled:
+                return func(*args, **kwargs)
+            start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram(name).record(perf_counter_ns() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def add_counters(name: str, read: Callable[[], dict]):
+    """Show the counters returned by 'read' in reports, under 'name'."""
+    _State.counters[name] = read
+
+
+def report() -> str:
+    """Table of the histogram summaries, then the counters."""
+    lines = [
+        f"{'name':<36}{'count':>9}{'mean':>9}"
+        + "".join(f"{'p' + str(p):>9}" for p in PERCENTILES)
+        + f"{'max':>9}  (ms)"
+    ]
+    for name, hist in sorted(_State.histograms.items()):
+        summary = hist.summary()
+        values = [summary.get(key, 0.0) for key in ("mean", "p50", "p95", "p99", "max")]
+        lines.append(
+            f"{name:<36}{summary['count']:>9}"
+            + "".join(f"{value:>9.3f}" for value in values)
+        )
+    for name, read in sorted(_State.counters.items()):
+        counters = " ".join(f"{key}={value}" for key, value in read().items())
+        lines.append(f"{name}: {counters}")
+    return "\n".join(lines)
+
+
+def dump(path: Optional[str] = None):
+    """Write the report to 'path', or to the log if no path is given."""
+    if not _State.enabled:
+        return
+    text = report()
+    if not path:
+        log.info(f"TIMINGS\n{text}")
+        return
+    try:
+        with open(path, "w") as f:
+            f.write(text + "\n")
+    except OSError as e:
+        log.error(f"Could not write timings to {path}: {e}")
+        return
+    log.info(f"TIMINGS WRITTEN path={path}")
@@ -13,6 +13,7 @@ from PyQt5.QtWidgets import (
     QWidget,
 )
 
+from . import instrument
 from .adjustments import OpenMediaPlayerAdjustmentsWindowAction
 from .base.docking import DockableWidget, ToolBar
 from .client.configure import OpenClientSettingsDialogAction
@@ -21,6 +22,7 @@ from .client.controller import IOController
 from .client.socks import AutoReconnectSocket
 from .gui.ontop import AlwaysOnTopAction
 from .gui.style import initialize_style
+from .gui.timings import DockableTimings
 from .output.frame import MediaPlayerContentFrame
 from .output.fullscreen import FullscreenManager, FullscreenMenu, FullscreenStatusLabel
 from .output.orientation import OrientationStatusLabel, ViewpointManager
@@ -50,13 +52,17 @@ class MainWindow(QMainWindow):
     initialized = pyqtSignal()
     centralwidgetresized = pyqtSignal()
 
-    def __init__(self, media_player, stylesheet, flags=None):
+    def __init__(
+        self, media_player, probe_cache, thumbnail_cache, stylesheet, flags=None
+    ):
         QMainWindow.__init__(self, flags)
         self._window_state = None
         self.qapp = QApplication.instance()
         initialize_style(self.qapp, stylesheet)
 
         self.media_player = media_player
+        self.probe_cache = probe_cache
+        self.thumbnail_cache = thumbnail_cache
 
         self.setDockNestingEnabled(True)
 
@@ -66,6 +72,7 @@ class MainWindow(QMainWindow):
         self.create_other_components()
         self.create_gui_layout()
         self.create_window_shortcuts()
+        self.create_instrumentation()
 
         self.initialized.emit()
 
@@ -99,6 +106,7 @@ class MainWindow(QMainWindow):
             viewpoint_mngr=self.viewpoint_mngr,
             loop_mode_mngr=self.loop_mode_mngr,
             media_player=self.media_player,
+            probe_cache=self.probe_cache,
         )
         self.listplayer.newframe.connect(self.viewpoint_mngr.on_newframe)
         self.frame_size_mngr = FrameSizeManager(
@@ -111,6 +119,9 @@ class MainWindow(QMainWindow):
             frame_size_mngr=self.frame_size_mngr,
             media_player=self.media_player,
         )
+        self.media_player_content_frame.resized.connect(
+            self.viewpoint_mngr.trigger_redraw
+        )
         self.setCentralWidget(self.media_player_content_frame)
         self.zoom_ctrl_mngr = ZoomControlManager(
             main_win=self,
@@ -136,6 +147,8 @@ class MainWindow(QMainWindow):
         self.playlist_widget = PlaylistWidget(
             listplayer=self.listplayer,
             play_ctrls=self.play_actions,
+            probe_cache=self.probe_cache,
+            thumbnail_cache=self.thumbnail_cache,
             parent=self,
         )
         self.dockable_playlist = DockablePlaylist(
@@ -157,7 +170,10 @@ class MainWindow(QMainWindow):
             main_win=self, media_player=self.media_player
         )
         self.open_player_prefs_act = OpenMediaPlayerPreferencesWindowAction(
-            main_win=self, media_player=self.media_player
+            main_win=self,
+            media_player=self.media_player,
+            probe_cache=self.probe_cache,
+            thumbnail_cache=self.thumbnail_cache,
         )
 
     def create_other_components(self):
@@ -309,6 +325,29 @@ class MainWindow(QMainWindow):
             QtGui.QKeySequence(Qt.Key_Space), self, self.play_actions.play_pause.trigger
         )
 
+    def create_instrumentation(self):
+        if not instrument.is_enabled():
+            return
+        scheduler = self.listplayer.scheduler
+        instrument.add_counters(
+            "io",
+            lambda: {
+                "skipped_count": self.io_ctrlr.skipped_count,
+                "last_latency_ms": round(self.io_ctrlr.last_latency / 1e6, 3),
+            },
+        )
+        instrument.add_counters(
+            "scheduler",
+            lambda: {"missed_count": scheduler.missed_count},
+        )
+        instrument.add_counters(
+            "libvlc.emissions",
+            lambda: {k: v for k, v in self.media_player.emission_counts.items() if v},
+        )
+        self.dockable_timings = DockableTimings(parent=self)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.dockable_timings)
+        self.addAction(self.dockable_timings.toggleViewAction())
+
     def _screen_size_threshold_filter(self, target_width, target_height):
         main_win_geo = self.geometry()
         screen = self.qapp.screenAt(main_win_geo.center())
@@ -353,3 +392,4 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, e):
         self.fullscreen_mngr.stop()
+        self.playlist_widget.cancel_scans()
@@ -1,9 +1,11 @@
 import logging
 import sys
 
-from PyQt5.QtCore import QSize, Qt
-from PyQt5.QtGui import QColor, QPalette
-from PyQt5.QtWidgets import QFrame, QSizePolicy, QSplitter
+from PyQt5.QtCore import QRect, QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QPainter, QPalette
+from PyQt5.QtWidgets import QFrame, QLabel, QSizePolicy, QSplitter, QVBoxLayout, QWidget
+
+from app import config, vlcqt
 
 log = logging.getLogger(__name__)
 
@@ -27,32 +29,111 @@ class BaseContentFrame(QFrame):
         self.setPalette(p)
 
 
+class VideoSurface(QWidget):
+    """Native child window that libvlc renders into.
+
+    Only this widget has a native window, and it stays a child widget when moved
+    between content frames, so its window id is kept and libvlc keeps rendering
+    into it without reattaching. With a frame buffer set, frames decoded into memory
+    are painted by Qt instead.
+    """
+
+    resized = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_NativeWindow)
+        self.setAttribute(Qt.WA_DontCreateNativeAncestors)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        p = self.palette()
+        p.setColor(QPalette.Window, QColor(0, 0, 0))
+        self.setPalette(p)
+        self.setAutoFillBackground(True)
+        self.frame_buffer = None
+
+    def set_frame_buffer(self, frame_buffer: vlcqt.FrameBuffer):
+        self.frame_buffer = frame_buffer
+        self.frame_buffer.frameready.connect(self.update)
+
+    def paintEvent(self, e):
+        if self.frame_buffer is None:
+            return super().paintEvent(e)
+        painter = QPainter(self)
+        with self.frame_buffer.lock:
+            image = self.frame_buffer.image()
+            if image.isNull():
+                return
+            target = QRect()
+            target.setSize(image.size().scaled(self.size(), Qt.KeepAspectRatio))
+            target.moveCenter(self.rect().center())
+            painter.drawImage(target, image)
+
+    def resizeEvent(self, e):
+        super().resizeEvent(e)
+        self.resized.emit()
+
+
 class MediaPlayerContentFrame(BaseContentFrame):
+    resized = pyqtSignal()
+
     def __init__(self, main_win, frame_size_mngr, media_player):
         super().__init__(parent=main_win)
-        self.setWindowFlags(self.windowFlags() | Qt.FramelessWindowHint)
         self.main_win = main_win
         self.frame_size_mngr = frame_size_mngr
         self.mp = media_player
-        self.mp.set_output_widget(self)
         self.content_qsize = QSize()
 
-    def start_fullscreen(self, qscreen):
-        self.setParent(None)
-        self.setGeometry(qscreen.geometry())
+        self.setLayout(QVBoxLayout())
+        self.layout().setContentsMargins(0, 0, 0, 0)
+        self.placeholder_label = QLabel(self)
+        self.placeholder_label.setAlignment(Qt.AlignCenter)
+        self.placeholder_label.hide()
+        self.layout().addWidget(self.placeholder_label)
+
+        self.surface = VideoSurface(self)
+        self.surface.resized.connect(self.resized)
+        self.layout().addWidget(self.surface)
+        if config.state.video_output == "callbacks":
+            self.frame_buffer = vlcqt.FrameBuffer(parent=self)
+            self.surface.set_frame_buffer(self.frame_buffer)
+            self.mp.set_output_frame_buffer(self.frame_buffer)
+        else:
+            self.frame_buffer = None
+            self.mp.set_output_widget(self.surface)
+
+        self.fullscreen_frame = BaseContentFrame()
+        self.fullscreen_frame.setWindowFlags(
+            self.fullscreen_frame.windowFlags() | Qt.FramelessWindowHint
+        )
+        self.fullscreen_frame.setLayout(QVBoxLayout())
+        self.fullscreen_frame.layout().setContentsMargins(0, 0, 0, 0)
+
+    def start_fullscreen(self, qscreen, placeholder_text=""):
+        """Move the video surface into a fullscreen window on 'qscreen'."""
+        self.fullscreen_frame.layout().addWidget(self.surface)
+        self.placeholder_label.setText(placeholder_text)
+        self.placeholder_label.show()
+        self.fullscreen_frame.setGeometry(qscreen.geometry())
         # TODO: On mac, check if qscreen is main OS screen w/ dock + top bar. If so,
         # use fullscreen instead of maximized.
         if sys.platform == "darwin":
-            self.setWindowState(Qt.WindowMaximized)
-            self.showMaximized()
+            self.fullscreen_frame.setWindowState(Qt.WindowMaximized)
+            self.fullscreen_frame.showMaximized()
         else:
-            self.setWindowState(Qt.WindowFullScreen)
-            self.showFullScreen()
+            self.fullscreen_frame.setWindowState(Qt.WindowFullScreen)
+            self.fullscreen_frame.showFullScreen()
+        self._reattach_output()
 
     def stop_fullscreen(self):
-        self.hide()
-        self.main_win.setCentralWidget(self)
-        self.show()
+        self.placeholder_label.hide()
+        self.layout().addWidget(self.surface)
+        self.fullscreen_frame.hide()
+        self._reattach_output()
+
+    def _reattach_output(self):
+        """A no-op unless the surface's native window was recreated."""
+        if self.frame_buffer is None:
+            self.mp.set_output_widget(self.surface)
 
 
 class SplitView(QSplitter):
@@ -1,7 +1,6 @@
 import logging
 import os
 
-from PyQt5 import QtCore, QtWidgets
 from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
 from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import QAction, QActionGroup, QApplication, QMenu
@@ -9,8 +8,6 @@ from PyQt5.QtWidgets import QAction, QActionGroup, QApplication, QMenu
 from app.gui import icons
 from app.output.status import IconStatusLabel
 
-from .frame import BaseContentFrame
-
 log = logging.getLogger(__name__)
 
 
@@ -34,20 +31,15 @@ class FullscreenManager(QObject):
 
     def start(self, action):
         qscreen = action.qscreen
-        self.main_content_frame.start_fullscreen(qscreen)
+        self.main_content_frame.start_fullscreen(
+            qscreen,
+            placeholder_text=(
+                f"- Fullscreen Mode -{os.linesep}{qscreen_description_string(qscreen)}"
+            ),
+        )
         self._is_fullscreen = True
         self.fullscreenstarted.emit(action)
 
-        # Set a temp frame with a notification in empty window space
-        temp_frame = BaseContentFrame()
-        temp_frame.setLayout(QtWidgets.QVBoxLayout())
-        temp_label = QtWidgets.QLabel(
-            f"""- Fullscreen Mode -{os.linesep}{qscreen_description_string(qscreen)}"""
-        )
-        temp_label.setAlignment(QtCore.Qt.AlignCenter)
-        temp_frame.layout().addWidget(temp_label)
-        self.main_win.setCentralWidget(temp_frame)
-
         # Give focus to main window
         self.main_win.activateWindow()
 
@@ -0,0 +1,100 @@
+import logging
+import math
+from collections import deque
+from typing import Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+Quaternion = Tuple[float, float, float, float]
+
+
+def quat_from_euler(yaw: float, pitch: float, roll: float) -> Quaternion:
+    """Convert yaw/pitch/roll in degrees to a unit quaternion (w, x, y, z)."""
+    cy, sy = math.cos(math.radians(yaw) / 2), math.sin(math.radians(yaw) / 2)
+    cp, sp = math.cos(math.radians(pitch) / 2), math.sin(math.radians(pitch) / 2)
+    cr, sr = math.cos(math.radians(roll) / 2), math.sin(math.radians(roll) / 2)
+    return (
+        cr * cp * cy + sr * sp * sy,
+        sr * cp * cy - cr * sp * sy,
+        cr * sp * cy + sr * cp * sy,
+        cr * cp * sy - sr * sp * cy,
+    )
+
+
+def euler_from_quat(q: Quaternion) -> Tuple[float, float, float]:
+    """Convert a unit quaternion (w, x, y, z) to yaw/pitch/roll in degrees."""
+    w, x, y, z = q
+    roll = math.atan2(2 * (w * x + y * z), 1 - 2 * (x * x + y * y))
+    pitch = math.asin(max(-1.0, min(1.0, 2 * (w * y - z * x))))
+    yaw = math.atan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z))
+    return math.degrees(yaw), math.degrees(pitch), math.degrees(roll)
+
+
+def slerp(q0: Quaternion, q1: Quaternion, t: float) -> Quaternion:
+    """Spherical linear interpolation from q0 to q1. Values of 't' above 1
+    extrapolate along the same arc.
+    """
+    dot = sum(a * b for a, b in zip(q0, q1))
+    if dot < 0:  # Take the shorter arc
+        q1 = tuple(-c for c in q1)
+        dot = -dot
+    if dot > 0.9995:  # Nearly parallel, so interpolate linearly and normalize
+        q = tuple(a + t * (b - a) for a, b in zip(q0, q1))
+    else:
+        theta = math.acos(dot)
+        sin_theta = math.sin(theta)
+        s0 = math.sin((1 - t) * theta) / sin_theta
+        s1 = math.sin(t * theta) / sin_theta
+        q = tuple(s0 * a + s1 * b for a, b in zip(q0, q1))
+    norm = math.sqrt(sum(c * c for c in q))
+    return tuple(c / norm for c in q)  # type: ignore
+
+
+class MotionPredictor:
+    """Resamples remote viewpoint samples at display time.
+
+    Samples are stamped with their arrival time. The viewpoint shown at time 't' is
+    the quaternion SLERP between the samples around 't - delay', so arrival jitter
+    up to 'delay' is smoothed out. When 't - delay' is past the newest sample, the
+    last two samples are extrapolated along their arc, up to 'horizon'.
+    """
+
+    max_samples = 16
+
+    def __init__(self, delay: float = 0.0, horizon: float = 0.0):
+        self.delay = delay  # Milliseconds
+        self.horizon = horizon  # Milliseconds
+        self._samples: deque = deque(maxlen=self.max_samples)
+
+    def reset(self):
+        self._samples.clear()
+
+    def add_sample(self, timestamp_ns: int, yaw: float, pitch: float, roll: float):
+        if self._samples and timestamp_ns <= self._samples[-1][0]:
+            return
+        self._samples.append((timestamp_ns, quat_from_euler(yaw, pitch, roll)))
+
+    def predict(self, now_ns: int) -> Optional[Tuple[float, float, float]]:
+        """Return the yaw/pitch/roll to display at 'now_ns', or None if no samples
+        have been added.
+        """
+        samples = self._samples
+        if not samples:
+            return None
+        if len(samples) == 1:
+            return euler_from_quat(samples[0][1])
+
+        target_ns = now_ns - self.delay * 1e6
+        if target_ns <= samples[0][0]:
+            return euler_from_quat(samples[0][1])
+
+        # Find the samples around the target time, or use the last two to extrapolate
+        (t0, q0), (t1, q1) = samples[-2], samples[-1]
+        if target_ns < t1:
+            for index in range(len(samples) - 1, 0, -1):
+                if samples[index - 1][0] <= target_ns:
+                    (t0, q0), (t1, q1) = samples[index - 1], samples[index]
+                    break
+
+        target_ns = min(target_ns, t1 + self.horizon * 1e6)
+        return euler_from_quat(slerp(q0, q1, (target_ns - t0) / (t1 - t0)))
@@ -1,21 +1,28 @@
 import logging
-from itertools import cycle
+import time
 
-from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot
 from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import QStatusBar
 
-from app import vlcqt
+from app import config, instrument, vlcqt
 from app.gui import fonts, icons
+from app.output.motion import MotionPredictor
 from app.output.status import IconStatusLabel
 
 log = logging.getLogger(__name__)
 
 
 class ViewpointManager(QObject):
-    """Handles setting viewpoint in vlcqt media player object."""
+    """Handles setting viewpoint in vlcqt media player object.
+
+    libvlc is only called when the effective viewpoint changes. Requests to redraw the
+    current frame, e.g. after a vout or resize event, are coalesced into a single
+    viewpoint update on the next event loop iteration.
+    """
 
     updatedviewpoint = pyqtSignal(float, float, float)
+    redraw_diff = 0.01  # Unobservable yaw differential that forces a frame redraw
 
     def __init__(self, io_ctrlr, media_player):
         super().__init__()
@@ -26,44 +33,70 @@ class ViewpointManager(QObject):
         self.user_vp = vlcqt.VideoViewpoint()
         self.user_vp.field_of_view = 80
         self.user_vp.yaw = self.user_vp.pitch = self.user_vp.roll = 0
-        self.user_vp_axes = [self.user_vp.yaw, self.user_vp.pitch, self.user_vp.roll]
-
-        # An alt viewpoint object for values that will trigger a frame redraw
-        self.redraw_vp = vlcqt.VideoViewpoint()
-        self.redraw_vp.field_of_view = 80
-        self.redraw_vp.yaw = self.user_vp.pitch = self.user_vp.roll = 0
 
-        # Some variables for cycling through diff values for triggering frame redraws
-        minor_diff = 0.01
-        self.minor_diffs_cycle = cycle((minor_diff, -minor_diff))
-        self.param_indexes_cycle = cycle((0, 1, 2))
+        # Viewpoint object passed to libvlc, and its last applied values
+        self.output_vp = vlcqt.VideoViewpoint()
+        self._applied_vp = None
+        self._redraw_sign = 1
         self.is_enabled = False
 
+        self.redraw_timer = QTimer(self)
+        self.redraw_timer.setSingleShot(True)
+        self.redraw_timer.setInterval(0)
+        self.redraw_timer.timeout.connect(self._redraw)
+
+        # Optional smoothing of remote motion states, reset for each connection
+        self.predictor = MotionPredictor(
+            delay=config.state.motion_interpolation_delay,
+            horizon=config.state.motion_prediction_horizon,
+        )
+        self.io_ctrlr.socket.connected.connect(self.predictor.reset)
+        config.state.signals.changed.connect(self.on_config_changed)
+
         # self.mp.newframe.connect(self.on_newframe) # Signal connected in MainWindow
-        self.mp.vout.connect(self.trigger_redraw)  # Not needed if updating per frame
+        self.mp.vout.connect(self.trigger_redraw)
 
-    def set_redraw_every_frame(self, value):
+    def set_enabled(self, value):
         self.is_enabled = value
         if value:
             self.trigger_redraw()
 
+    @pyqtSlot(str, object)
+    def on_config_changed(self, key, value):
+        if key == "motion_interpolation_delay":
+            self.predictor.delay = value
+        elif key == "motion_prediction_horizon":
+            self.predictor.horizon = value
+        elif key == "motion_smoothing":
+            self.predictor.reset()
+
     @pyqtSlot()
+    @instrument.timed("viewpoint.on_newframe")
     def on_newframe(self):
         if not self.is_enabled:
             return
         new_motion_state = self.io_ctrlr.get_new_motion_state()
+        if config.state.motion_smoothing:
+            if new_motion_state:
+                self.predictor.add_sample(
+                    self.io_ctrlr.motion_state_time, *new_motion_state[:3]
+                )
+            new_motion_state = self.predictor.predict(time.perf_counter_ns())
         if new_motion_state:
-            self.set_new_user_viewpoint(*new_motion_state)
-        else:
-            self.trigger_redraw()
+            self.set_new_user_viewpoint(*new_motion_state[:3])
 
-    def _update_viewpoint(self, viewpoint):
-        """Update given viewpoint in player"""
-        errorcode = self.mp.video_update_viewpoint(
-            p_viewpoint=viewpoint, b_absolute=True
-        )
+    def _update_viewpoint(self, yaw, pitch, roll):
+        """Update the viewpoint in player, unless it is unchanged."""
+        values = (yaw, pitch, roll, self.user_vp.field_of_view)
+        if values == self._applied_vp:
+            return
+        vp = self.output_vp
+        vp.yaw, vp.pitch, vp.roll, vp.field_of_view = values
+        errorcode = self.mp.video_update_viewpoint(p_viewpoint=vp, b_absolute=True)
         if errorcode != 0:
             log.error("Error setting viewpoint")
+            return
+        self._applied_vp = values
         self.updatedviewpoint.emit(
             self.user_vp.yaw, self.user_vp.pitch, self.user_vp.roll
         )
@@ -73,31 +106,28 @@ class ViewpointManager(QObject):
         self.user_vp.yaw = -yaw
         self.user_vp.pitch = -pitch
         self.user_vp.roll = -roll
-        self._update_viewpoint(self.user_vp)
-
-    def set_new_offset_viewpoint(self, yaw_diff, pitch_diff, roll_diff):
-        """Set new adjusted viewpoint. Passed values are applied as adjustments to the
-        latest user viewpoint.
-        """
-        self.redraw_vp.yaw = self.user_vp.yaw + -yaw_diff
-        self.redraw_vp.pitch = self.user_vp.pitch + -pitch_diff
-        self.redraw_vp.roll = self.user_vp.roll + -roll_diff
-        self._update_viewpoint(self.redraw_vp)
+        self._update_viewpoint(self.user_vp.yaw, self.user_vp.pitch, self.user_vp.roll)
 
+    @pyqtSlot()
     def trigger_redraw(self):
-        """Force a redraw of the video frame to correct the displayed aspect ratio
-        of a 360 video.
-
-        The redraw is triggered by a hack... setting a new viewpoint with an
-        unobservable differential applied to the yaw value. This is probably only
-        necessary because of the the implementation of viewpoints in vlclib 3.0, and
-        will hopefully be unnecessary in 4.0.
+        """Request a redraw of the video frame to correct the displayed aspect ratio
+        of a 360 video. Requests made in the same event loop iteration are coalesced.
         """
-        diff = next(self.minor_diffs_cycle)
-        index = next(self.param_indexes_cycle)
-        param = self.user_vp_axes[index]
-        self.user_vp_axes[index] = param + diff
-        self.set_new_offset_viewpoint(*self.user_vp_axes)
+        self.redraw_timer.start()
+
+    def _redraw(self):
+        """Force a redraw with a hack... setting the user viewpoint with an
+        unobservable differential applied to the yaw value, so libvlc sees a new
+        viewpoint. The differential is relative to the user viewpoint, so it never
+        accumulates. This is probably only necessary because of the implementation of
+        viewpoints in vlclib 3.0, and will hopefully be unnecessary in 4.0.
+        """
+        self._redraw_sign = -self._redraw_sign
+        self._update_viewpoint(
+            self.user_vp.yaw + self._redraw_sign * self.redraw_diff,
+            self.user_vp.pitch,
+            self.user_vp.roll,
+        )
 
 
 class OrientationStatusLabel(IconStatusLabel):
@@ -3,7 +3,7 @@ import logging
 from PyQt5.QtCore import QObject, Qt, pyqtSignal, pyqtSlot
 from PyQt5.QtWidgets import QAction, QActionGroup, QSlider
 
-from app import config
+from app import config, instrument
 from app.gui import icons
 from app.playlist.model import MediaItem
 
@@ -16,7 +16,7 @@ class LoopModeManager(QObject):
     def __init__(self, parent):
         super().__init__(parent=parent)
 
-        self.option_names = ["off", "one", "all"]
+        self.option_names = list(config.options.loop_mode)
         for index, item in enumerate(self.option_names):
             if item == config.state.loop_mode:
                 self.rotate_list(self.option_names, index)
@@ -45,6 +45,8 @@ class PlaybackModeAction(QAction):
             "off": icons.get("loop_mode_off"),
             "one": icons.get("loop_mode_one"),
             "all": icons.get("loop_mode_all"),
+            "shuffle": icons.get("loop_mode_shuffle"),
+            "weighted": icons.get("loop_mode_weighted"),
         }
         self.setText("Toggle Playback Mode")
         self.setToolTip("Toggle Playback Mode")
@@ -163,7 +165,7 @@ class FrameResolutionTimeSlider(QSlider):
         self.mouse_down = False
 
         self.lp.mediachanged.connect(self.on_mediachanged)
-        self.mp.positionchanged.connect(self.on_positionchanged)
+        self.mp.positionupdated.connect(self.on_positionupdated)
         self.mp.playing.connect(self.on_playing)
         self.mp.stopped.connect(self.on_stopped)
         self.newframe_conn = self.lp.newframe.connect(self.on_newframe)
@@ -181,14 +183,14 @@ class FrameResolutionTimeSlider(QSlider):
     def on_playing(self):
         self.mouse_down = False
 
-    @pyqtSlot()
-    def on_positionchanged(self):
-        pos = self.mp.get_position()
-        if pos and pos > 0:
+    @pyqtSlot(float)
+    def on_positionupdated(self, pos: float):
+        if pos > 0:
             self.mp_pos = pos * self.length
         self.mouse_down = False
 
     @pyqtSlot()
+    @instrument.timed("slider.on_newframe")
     def on_newframe(self):
         if self.mp_pos and self.mp_pos <= 0:
             self.curr_pos = self.mp_pos
@@ -215,7 +217,7 @@ class FrameResolutionTimeSlider(QSlider):
             return super().mousePressEvent(self, e)
         e.accept()
         self.mouse_down = True
-        self.mp.positionchanged.disconnect()
+        self.mp.positionupdated.disconnect(self.on_positionupdated)
         as_proportion, as_slider_val = self.get_mouse_pos(e)
         self.mp.set_position(as_proportion)
         super().setValue(as_slider_val)
@@ -232,7 +234,7 @@ class FrameResolutionTimeSlider(QSlider):
         if e.button() != Qt.LeftButton:
             return super().mousePressEvent(self, e)
         e.accept()
-        self.mp.positionchanged.connect(self.on_positionchanged)
+        self.mp.positionupdated.connect(self.on_positionupdated)
 
     def set_length(self, value):
         self.setMinimum(0)
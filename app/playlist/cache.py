@@ -0,0 +1,155 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Optional
+
+log = logging.getLogger(__name__)
+
+
+class ProbeCache:
+    """Persistent LRU cache of ffprobe results, keyed by path, size and mtime.
+
+    Safe to use from probe worker threads. Entries are stored as compressed json in a
+    SQLite file and the least recently used entries are evicted when the total stored
+    size exceeds 'max_size' bytes.
+    """
+
+    commit_interval = 2.0  # seconds
+
+    def __init__(self, path: str, max_size: int):
+        self.path = path
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._last_commit = time.monotonic()
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._conn = self._connect(path)
+        except (OSError, sqlite3.Error) as e:
+            log.error(f"Could not open probe cache, using memory instead: {e}")
+            self.path = ":memory:"
+            self._conn = self._connect(self.path)
+        self._total_size = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(data)), 0) FROM probes"
+        ).fetchone()[0]
+
+    @staticmethod
+    def _connect(path):
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS probes (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                accessed REAL NOT NULL,
+                data BLOB NOT NULL
+            )"""
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS probes_accessed ON probes (accessed)")
+        conn.commit()
+        return conn
+
+    @staticmethod
+    def _file_key(path):
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def get(self, path: str) -> Optional[dict]:
+        try:
+            size, mtime_ns = self._file_key(path)
+        except OSError:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, data FROM probes WHERE path = ?", (path,)
+            ).fetchone()
+            if not row or row[0] != size or row[1] != mtime_ns:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE probes SET accessed = ? WHERE path = ?", (time.time(), path)
+            )
+            self._maybe_commit()
+            self.hits += 1
+        return json.loads(zlib.decompress(row[2]))
+
+    def put(self, path: str, probe: dict) -> None:
+        try:
+            size, mtime_ns = self._file_key(path)
+        except OSError:
+            return
+        data = zlib.compress(json.dumps(probe, separators=(",", ":")).encode())
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT LENGTH(data) FROM probes WHERE path = ?", (path,)
+            ).fetchone()
+            self._conn.execute(
+                "REPLACE INTO probes VALUES (?, ?, ?, ?, ?)",
+                (path, size, mtime_ns, time.time(), data),
+            )
+            self._total_size += len(data) - (old[0] if old else 0)
+            if self._total_size > self.max_size:
+                self._evict()
+            self._maybe_commit()
+
+    def set_max_size(self, max_size: int) -> None:
+        with self._lock:
+            self.max_size = max_size
+            if self._total_size > self.max_size:
+                self._evict()
+                self._conn.commit()
+
+    def _evict(self):
+        """Delete least recently used entries until the cache is under 90% of its
+        maximum size. Caller must hold the lock.
+        """
+        target = self.max_size * 0.9
+        rows = self._conn.execute(
+            "SELECT path, LENGTH(data) FROM probes ORDER BY accessed"
+        )
+        evicted = []
+        for path, length in rows:
+            if self._total_size <= target:
+                break
+            evicted.append((path,))
+            self._total_size -= length
+        self._conn.executemany("DELETE FROM probes WHERE path = ?", evicted)
+        log.debug(f"PROBE CACHE EVICTED count={len(evicted)}")
+
+    def _maybe_commit(self):
+        now = time.monotonic()
+        if now - self._last_commit > self.commit_interval:
+            self._conn.commit()
+            self._last_commit = now
+
+    def stats(self) -> dict:
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM probes").fetchone()[0]
+            return {
+                "path": self.path,
+                "entries": count,
+                "size": self._total_size,
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def purge(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM probes")
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+            self._total_size = 0
+            self.hits = self.misses = 0
+        log.info(f"PROBE CACHE PURGED path={self.path}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
@@ -5,50 +5,14 @@ from typing import Union
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QAction, QFileDialog, QMenu
 
-from app import vlcqt
 from app.gui import icons
+from app.playlist.playlistfiles import FILE_DIALOG_FILTER
+from app.playlist.scan import scan_directory
 
 log = logging.getLogger(__name__)
 
 
-def get_file_paths(paths: list):
-    file_paths = []
-    for path in paths:
-        if os.path.isfile(path):
-            file_paths.append(path)
-        elif os.path.isdir(path):
-            for i in os.scandir(path):
-                if i.is_file():
-                    file_paths.append(i.path)
-        else:
-            log.warning(f"Path does not exist: {path}")
-    return file_paths
-
-
-def get_media_object(path: str):
-    media = vlcqt.Media(path)
-    media.parse()
-    iter_tracks = media.tracks_get()
-    if not iter_tracks:
-        return None
-    else:
-        return media
-
-
-def get_media_objects(paths: Union[list, str]):
-    if isinstance(paths, str):
-        paths = [paths]
-
-    media_objects = []
-    for p in get_file_paths(paths):
-        obj = get_media_object(p)
-        if obj:
-            media_objects.append(obj)
-
-    return media_objects
-
-
-def get_media_paths(paths):
+def get_file_paths(paths: Union[list, str]):
     if isinstance(paths, str):
         paths = [paths]
 
@@ -57,22 +21,10 @@ def get_media_paths(paths):
         if not os.path.exists(path):
             log.error(f"PATH NOT FOUND path={path}")
         elif os.path.isfile(path):
-            file_paths.append(path)
+            file_paths.append(os.path.abspath(path))
         elif os.path.isdir(path):
-            for i in os.scandir(path):
-                if i.is_file():
-                    file_paths.append(i.path)
-    media_paths = []
-    for path in file_paths:
-        _media = vlcqt.Media(path)
-        _media.parse()
-        iter_tracks = _media.tracks_get()
-        if not iter_tracks:
-            continue
-        media_paths.append(os.path.abspath(path))
-        del _media
-
-    return media_paths
+            file_paths.extend(scan_directory(os.path.abspath(path))[0])
+    return file_paths
 
 
 class OpenFileAction(QAction):
@@ -117,6 +69,26 @@ class OpenMultipleAction(QAction):
             self.playlist_widget.add_media(file_paths)
 
 
+class SavePlaylistAction(QAction):
+    def __init__(self, parent, playlist_widget):
+        super().__init__(parent=parent)
+        self.parent = parent
+        self.playlist_widget = playlist_widget
+        self.setIcon(icons.get("save_playlist"))
+        self.setText("Save Playlist")
+        self.setShortcut("Ctrl+S")
+        self.setShortcutContext(Qt.WidgetWithChildrenShortcut)
+
+        self.triggered.connect(self.on_triggered)
+
+    def on_triggered(self):
+        file_path, filter_desc = QFileDialog.getSaveFileName(
+            self.parent, self.text(), directory="media", filter=FILE_DIALOG_FILTER
+        )
+        if file_path:
+            self.playlist_widget.save_playlist(file_path)
+
+
 class OpenMediaMenu(QMenu):
     def __init__(self, parent, playlist_widget):
         super().__init__(parent=parent)
@@ -126,3 +98,5 @@ class OpenMediaMenu(QMenu):
         self.setTitle("Open Media")
         self.addAction(OpenMultipleAction(parent=self, playlist_widget=playlist_widget))
         self.addAction(OpenFileAction(parent=self, playlist_widget=playlist_widget))
+        self.addSeparator()
+        self.addAction(SavePlaylistAction(parent=self, playlist_widget=playlist_widget))
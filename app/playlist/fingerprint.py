@@ -0,0 +1,113 @@
+import hashlib
+import logging
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+
+def file_key(path: str) -> Tuple[str, int, int]:
+    """Normalized real path, size and mtime of 'path'. Files that can't be read, e.g.
+    on a drive that isn't mounted, have a size and mtime of -1. URLs are keyed by
+    themselves.
+    """
+    if "://" in path:
+        return path, 0, 0
+    realpath = os.path.normcase(os.path.realpath(path))
+    try:
+        stat = os.stat(realpath)
+    except OSError:
+        return realpath, -1, -1
+    return realpath, stat.st_size, stat.st_mtime_ns
+
+
+def partial_hash(path: str, size: int, chunk_size: int) -> Optional[bytes]:
+    """Hash of the first and last 'chunk_size' bytes of a file of 'size' bytes."""
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, "rb") as f:
+            digest.update(f.read(chunk_size))
+            if size > chunk_size:
+                f.seek(max(chunk_size, size - chunk_size))
+                digest.update(f.read(chunk_size))
+    except OSError:
+        return None
+    return digest.digest()
+
+
+class FingerprintIndex:
+    """Index of the files in a playlist by fingerprint, to skip duplicates before
+    they are probed.
+
+    A file is the same as one already in the index if its real path, size and mtime
+    match, so paths through symbolic links, or written differently, are caught.
+    Paths are claimed before they are probed and released when their items are
+    removed, or if probing them fails. Copies of a file at other paths are found by
+    'duplicates', by size and a hash of the start and end of the files.
+    """
+
+    hash_chunk_size = 64 * 1024
+
+    def __init__(self):
+        self._keys: Dict[tuple, str] = {}  # Fingerprint: claimed path
+        self._paths: Dict[str, tuple] = {}  # Claimed path: fingerprint
+        self._hashes: Dict[tuple, Optional[bytes]] = {}
+        self.duplicate_count = 0
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __contains__(self, path: str):
+        return path in self._paths
+
+    def claim(self, paths: Iterable[str]) -> List[str]:
+        """Claim 'paths' and return those not already in the index, in order."""
+        new_paths = []
+        for path in paths:
+            key = file_key(path)
+            if key in self._keys or path in self._paths:
+                self.duplicate_count += 1
+                log.debug(f"DUPLICATE SKIPPED path={path}")
+                continue
+            self._keys[key] = path
+            self._paths[path] = key
+            new_paths.append(path)
+        return new_paths
+
+    def release(self, paths: Iterable[str]):
+        for path in paths:
+            key = self._paths.pop(path, None)
+            if key is not None and self._keys.get(key) == path:
+                del self._keys[key]
+                self._hashes.pop(key, None)
+
+    def clear(self):
+        self._keys.clear()
+        self._paths.clear()
+        self._hashes.clear()
+
+    def _content_key(self, key: tuple) -> Optional[bytes]:
+        if key not in self._hashes:
+            self._hashes[key] = partial_hash(key[0], key[1], self.hash_chunk_size)
+        return self._hashes[key]
+
+    def duplicates(self, paths: Iterable[str]) -> List[List[str]]:
+        """Groups of claimed 'paths' with the same content, in the order of 'paths'.
+        Only files of equal size are hashed.
+        """
+        by_size = defaultdict(list)
+        for path in paths:
+            key = self._paths.get(path)
+            if key is not None and key[1] > 0 and "://" not in path:
+                by_size[key[1]].append((path, key))
+
+        by_content = defaultdict(list)
+        for size, group in by_size.items():
+            if len(group) < 2:
+                continue
+            for path, key in group:
+                content_key = self._content_key(key)
+                if content_key is not None:
+                    by_content[size, content_key].append(path)
+        return [group for group in by_content.values() if len(group) > 1]
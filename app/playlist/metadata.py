@@ -0,0 +1,119 @@
+import logging
+from os.path import basename
+from typing import Iterable
+
+from app.utils import fraction_string_to_float
+
+log = logging.getLogger(__name__)
+
+
+def _fraction(value, default=0.0) -> float:
+    try:
+        return fraction_string_to_float(str(value))
+    except (ValueError, ZeroDivisionError, RuntimeError):
+        return default
+
+
+def _number(value, type_=float, default=0):
+    try:
+        return type_(float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+class MediaMetadata:
+    """Compact media metadata, extracted once from an ffprobe result."""
+
+    __slots__ = (
+        "title",
+        "width",
+        "height",
+        "nb_frames",
+        "has_b_frames",
+        "avg_frame_rate",
+        "r_frame_rate",
+        "duration",
+        "duration_ts",
+        "time_base",
+        "is_spherical",
+        "tags",
+    )
+
+    def __init__(
+        self,
+        title: str,
+        width: int = 0,
+        height: int = 0,
+        nb_frames: int = 0,
+        has_b_frames: int = 0,
+        avg_frame_rate: float = 0.0,
+        r_frame_rate: float = 0.0,
+        duration: float = 0.0,
+        duration_ts: float = 0.0,
+        time_base: float = 0.0,
+        is_spherical: bool = False,
+        tags: dict = None,
+    ):
+        self.title = title
+        self.width = width
+        self.height = height
+        self.nb_frames = nb_frames
+        self.has_b_frames = has_b_frames
+        self.avg_frame_rate = avg_frame_rate
+        self.r_frame_rate = r_frame_rate
+        self.duration = duration
+        self.duration_ts = duration_ts
+        self.time_base = time_base
+        self.is_spherical = is_spherical
+        self.tags = tags if tags is not None else {"title": title}
+
+    @classmethod
+    def from_probe(
+        cls, probe: dict, path: str, tag_keys: Iterable[str]
+    ) -> "MediaMetadata":
+        """Extract metadata from an ffprobe result. Only the format tags named in
+        'tag_keys' are kept, matched without case and stored under their name in
+        'tag_keys'.
+        """
+        streams = probe.get("streams", [])
+        video = next((s for s in streams if s.get("codec_type") == "video"), {})
+        format_ = probe.get("format", {})
+
+        format_tags = {k.lower(): v for k, v in format_.get("tags", {}).items()}
+        title = format_tags.get("title") or basename(path)
+        format_tags["title"] = title
+        tags = {k: format_tags[k.lower()] for k in tag_keys if k.lower() in format_tags}
+
+        avg_frame_rate = _fraction(video.get("avg_frame_rate", 0))
+        duration = _number(video.get("duration", format_.get("duration")))
+        nb_frames = _number(video.get("nb_frames"), int)
+        if not nb_frames:
+            nb_frames = int(duration * avg_frame_rate)
+
+        return cls(
+            title=title,
+            width=_number(video.get("width"), int),
+            height=_number(video.get("height"), int),
+            nb_frames=nb_frames,
+            has_b_frames=_number(video.get("has_b_frames"), int),
+            avg_frame_rate=avg_frame_rate,
+            r_frame_rate=_fraction(video.get("r_frame_rate", 0)),
+            duration=duration,
+            duration_ts=_number(video.get("duration_ts")),
+            time_base=_fraction(video.get("time_base", 0)),
+            is_spherical=any(s.get("side_data_list") for s in streams),
+            tags=tags,
+        )
+
+    def info(self) -> dict:
+        return {
+            "width": self.width,
+            "height": self.height,
+            "nb_frames": self.nb_frames,
+            "has_b_frames": self.has_b_frames,
+            "avg_frame_rate": self.avg_frame_rate,
+            "r_frame_rate": self.r_frame_rate,
+            "duration": self.duration,
+            "duration_ts": self.duration_ts,  # duration time scale
+            "time_base": self.time_base,
+        }
@@ -1,161 +1,451 @@
 import logging
-from os.path import basename
+from itertools import compress
+from typing import Dict, List, Optional
 
 from ffmpeg import probe as ffmpeg_probe
-from PyQt5.QtCore import QModelIndex, Qt, pyqtSignal
-from PyQt5.QtGui import QStandardItem, QStandardItemModel
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, pyqtSignal, pyqtSlot
 
 from app import config
-from app.utils import fraction_string_to_float
+from app.playlist.cache import ProbeCache
+from app.playlist.metadata import MediaMetadata
+from app.playlist.sorting import (
+    SortKeys,
+    argsort,
+    metadata_field,
+    sort_key,
+    sort_keys,
+    taker,
+)
+from app.playlist.thumbnails import ThumbnailLoader
 
 log = logging.getLogger(__name__)
 
 
-class MediaItem(QStandardItem):
+class MediaItem:
 
-    PathRole = Qt.UserRole + 1
-    ProbeRole = Qt.UserRole + 3
-    SphericalRole = Qt.UserRole + 4
+    __slots__ = ("_path", "_metadata", "_probed")
 
     def __str__(self):
         return self.title()
 
-    def __init__(self, path: str):
-        super().__init__()
-        # Check probe values
-        probe = ffmpeg_probe(path)
-        try:
-            title = probe["format"]["tags"]["title"]
-        except KeyError:
-            title = probe["format"]["tags"]["title"] = basename(path)
-
-        # Set proprietary data role values
-        self.setData(path, MediaItem.PathRole)
-        self.setData(probe, MediaItem.ProbeRole)
-
-        # Set Qt data role values
-        self.setData(title, Qt.DisplayRole)
-        self.setData(title, Qt.WhatsThisRole)
-        self.setData(title, Qt.StatusTipRole)
+    def __init__(self, path: str, metadata: MediaMetadata, probed=True):
+        """'metadata' comes from a MediaProber, as probing here would block the GUI
+        thread. 'probed' is False if it is a stub, e.g. read from a playlist file, to
+        be replaced by 'set_metadata' once the media is probed.
+        """
+        self._path = path
+        self._metadata = metadata
+        self._probed = probed
 
     def title(self):
-        return self.probe()["format"]["tags"]["title"]
+        return self._metadata.title
 
     def path(self):
-        return self.data(MediaItem.PathRole)
+        return self._path
+
+    def metadata(self) -> MediaMetadata:
+        return self._metadata
+
+    def set_metadata(self, metadata: MediaMetadata):
+        self._metadata = metadata
+        self._probed = True
 
-    def probe(self):
-        return self.data(MediaItem.ProbeRole)
+    def is_probed(self) -> bool:
+        return self._probed
+
+    def probe(self, cache: ProbeCache = None) -> dict:
+        """Load the full ffprobe result. It is not kept in memory, so this reads the
+        probe cache or runs ffprobe on every call.
+        """
+        probe = cache.get(self._path) if cache else None
+        return probe if probe is not None else ffmpeg_probe(self._path)
 
     def size(self):
-        probe = self.probe()
-        stream = next((i for i in probe["streams"] if i["codec_type"] == "video"), None)
-        width = int(stream["width"])
-        height = int(stream["height"])
-        return width, height
+        return self._metadata.width, self._metadata.height
 
     def info(self):
-        probe = self.probe()
-        stream = next((i for i in probe["streams"] if i["codec_type"] == "video"), None)
-        return {
-            "width": int(stream["width"]),
-            "height": int(stream["height"]),
-            "nb_frames": int(stream["nb_frames"]),
-            "has_b_frames": int(stream["has_b_frames"]),
-            "avg_frame_rate": fraction_string_to_float(stream["avg_frame_rate"]),
-            "r_frame_rate": fraction_string_to_float(stream["r_frame_rate"]),
-            "duration": float(stream["duration"]),
-            "duration_ts": float(stream["duration_ts"]),  # duration time scale
-            "time_base": fraction_string_to_float(stream["time_base"]),
-        }
+        return self._metadata.info()
 
     def is_spherical(self) -> bool:
-        probe = self.data(MediaItem.ProbeRole)
-        for stream in probe["streams"]:
-            if stream.get("side_data_list"):
-                return True
-        return False
+        return self._metadata.is_spherical
+
+
+class PlaylistModel(QAbstractTableModel):
+    """Table model of MediaItem rows, backed by a columnar store of display values.
 
+    Each column is a list holding one tag value per row, so painting a cell is a
+    plain list lookup. The column keys are cached from config, and the store is
+    rebuilt when the 'meta_tags' setting changes. Rows are exposed to views
+    incrementally through canFetchMore/fetchMore, while 'item' and 'row_of' address
+    every stored row. Typed sort keys are read from the values of a column, or from
+    the metadata of tags such as duration, the first time it is sorted, and then
+    kept in step with the store.
+
+    With a thumbnail loader set and the 'playlist_thumbnails' setting on, a last
+    column shows thumbnails, which are requested as views paint their rows.
+    """
 
-class PlaylistModel(QStandardItemModel):
     rowCountChanged = pyqtSignal(int)
+    itemsInserted = pyqtSignal(list)
+    itemsRemoved = pyqtSignal(list)
+    itemsUpdated = pyqtSignal(list)  # Also for rows not fetched yet
+    fetch_batch_size = 256
 
     def __init__(self, parent=None):
-        super().__init__(0, len(config.state.meta_tags), parent=parent)
+        super().__init__(parent=parent)
+        self._keys = tuple(config.state.meta_tags)
+        self._items: List[MediaItem] = []
+        self._columns: List[list] = [[] for _ in self._keys]
+        self._sort_keys: Dict[int, SortKeys] = {}  # Column: sort keys
+        self._rows: Optional[dict] = {}
+        self._fetched = 0
+        self._thumbnails: Optional[ThumbnailLoader] = None
+        self._show_thumbnails = False
+        config.state.signals.changed.connect(self.on_config_changed)
+
+    def set_thumbnails(self, loader: ThumbnailLoader):
+        self.beginResetModel()
+        self._thumbnails = loader
+        self._show_thumbnails = config.state.playlist_thumbnails
+        loader.thumbnailready.connect(self.on_thumbnailready)
+        self.endResetModel()
+
+    def thumbnail_column(self) -> int:
+        """Column of the thumbnails, or -1 if they are not shown."""
+        return len(self._keys) if self._show_thumbnails else -1
+
+    def request_thumbnails(self, rows):
+        """Request the thumbnails of 'rows', the last rows first."""
+        if self.thumbnail_column() < 0:
+            return
+        for row in rows:
+            item = self.item(row)
+            if item is not None:
+                self._thumbnails.request(item)
+
+    @pyqtSlot(object)
+    def on_thumbnailready(self, item: MediaItem):
+        row = self.row_of(item)
+        column = self.thumbnail_column()
+        if row is not None and row < self._fetched and column >= 0:
+            index = self.index(row, column)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    @pyqtSlot(str, object)
+    def on_config_changed(self, key, value):
+        if key == "playlist_thumbnails":
+            if self._thumbnails is not None and value != self._show_thumbnails:
+                self.beginResetModel()
+                self._show_thumbnails = value
+                self._thumbnails.clear()
+                self.endResetModel()
+            return
+        if key != "meta_tags":
+            return
+        self.beginResetModel()
+        self._keys = tuple(value)
+        self._build_columns()
+        self._fetched = min(self._fetched, len(self._items))
+        self.endResetModel()
+
+    def _build_columns(self):
+        self._columns = [[] for _ in self._keys]
+        self._sort_keys = {}
+        for item in self._items:
+            for column, value in zip(self._columns, self._column_values(item)):
+                column.append(value)
+
+    def _column_values(self, item: MediaItem) -> list:
+        tags = item.metadata().tags
+        return [tags.get(key) for key in self._keys]
+
+    def _sort_values(self, column: int, start: int, stop: int) -> list:
+        """Values of rows 'start' to 'stop' that the sort keys of 'column' are read
+        from: the displayed values, or the metadata fields of tags such as duration.
+        Fields that are unknown, e.g. in stub metadata, fall back to the tag value.
+        """
+        values = self._columns[column][start:stop]
+        field = metadata_field(self._keys[column])
+        if field is None:
+            return values
+        metadatas = (item.metadata() for item in self._items[start:stop])
+        return [
+            getattr(metadata, field) or value
+            for metadata, value in zip(metadatas, values)
+        ]
+
+    def _invalidate_rows(self):
+        self._rows = None
+
+    def row_of(self, item: MediaItem) -> Optional[int]:
+        """Row of 'item' in the store, or None if it is not in this model."""
+        if self._rows is None:
+            self._rows = {item: row for row, item in enumerate(self._items)}
+        return self._rows.get(item)
+
+    def rows_of(self, items: set) -> List[int]:
+        """Sorted rows of the 'items' in this model."""
+        if len(items) * 8 > len(self._items):
+            return list(
+                compress(range(len(self._items)), map(items.__contains__, self._items))
+            )
+        rows = (self.row_of(item) for item in items)
+        return sorted(row for row in rows if row is not None)
+
+    def item(self, row: int, column: int = 0) -> Optional[MediaItem]:
+        if 0 <= row < len(self._items):
+            return self._items[row]
+        return None
+
+    def update_item(self, item: MediaItem, metadata: MediaMetadata):
+        """Replace the metadata of 'item' and refresh its displayed values."""
+        item.set_metadata(metadata)
+        row = self.row_of(item)
+        if row is None:
+            return
+        for column, value in zip(self._columns, self._column_values(item)):
+            column[row] = value
+        for column, keys in self._sort_keys.items():
+            value = self._sort_values(column, row, row + 1)[0]
+            keys[row] = sort_key(self._keys[column], value)
+        self.itemsUpdated.emit([item])
+        if row < self._fetched and self._keys:
+            self.dataChanged.emit(
+                self.index(row, 0), self.index(row, len(self._keys) - 1)
+            )
+
+    def item_count(self) -> int:
+        """Number of stored rows, including rows not fetched by views yet."""
+        return len(self._items)
+
+    def itemFromIndex(self, index: QModelIndex) -> Optional[MediaItem]:
+        if not index.isValid():
+            return None
+        return self.item(index.row())
 
-    def data(self, index: QModelIndex, role: Qt.ItemDataRole):
+    def indexFromItem(self, item: MediaItem) -> QModelIndex:
+        row = self.row_of(item)
+        if row is None or row >= self._fetched:
+            return QModelIndex()
+        return self.index(row, 0)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._fetched
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._keys) + (1 if self._show_thumbnails else 0)
+
+    def fetch_all(self):
+        """Expose every stored row to views, in one insertion."""
+        if self._fetched < len(self._items):
+            self.beginInsertRows(QModelIndex(), self._fetched, len(self._items) - 1)
+            self._fetched = len(self._items)
+            self.endInsertRows()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._fetched < len(self._items)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(self.fetch_batch_size, len(self._items) - self._fetched)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._fetched, self._fetched + count - 1)
+        self._fetched += count
+        self.endInsertRows()
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
         if not index.isValid():
             return None
+        if index.column() == len(self._keys):
+            if role == Qt.DecorationRole:
+                return self._thumbnails.thumbnail(self._items[index.row()])
+            return None
         if role == Qt.DisplayRole:
-            media_item = self.item(index.row(), 0)
-            probe = media_item.data(MediaItem.ProbeRole)
-            key = config.state.meta_tags[index.column()]  # type: ignore
-            return probe["format"]["tags"].get(key, None)
-        elif role == (Qt.ToolTipRole):
-            return config.state.meta_tags[index.column()]  # type: ignore
-        else:
-            item = self.item(index.row(), 0)
-            return item.data(role)
+            return self._columns[index.column()][index.row()]
+        elif role == Qt.ToolTipRole:
+            return self._keys[index.column()]
+        elif role in (Qt.WhatsThisRole, Qt.StatusTipRole):
+            return self._items[index.row()].title()
+        return None
 
-    def headerData(self, section, orientation, role):
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
         if role == Qt.DisplayRole:
             if orientation == Qt.Vertical:
                 return section + 1
             elif orientation == Qt.Horizontal:
-                return config.state.meta_tags[section]
-
-    def setItem(self, row, item):
-        """Reimplimentation for signal emissions"""
-        result = super().setItem(row, item)
-        self.rowCountChanged.emit(self.rowCount())
-        return result
-
-    def takeItem(self, row, column=0):
-        """Reimplimentation for signal emissions"""
-        result = super().takeItem(row, column)
-        self.rowCountChanged.emit(self.rowCount())
-        return result
-
-    def takeRow(self, row):
-        """Reimplimentation for signal emissions"""
-        result = super().takeRow(row)
-        self.rowCountChanged.emit(self.rowCount())
-        return result
-
-    def insertRow(self, row, items):
-        """Reimplimentation for signal emissions"""
-        result = super().insertRow(row, items)
-        self.rowCountChanged.emit(self.rowCount())
-        return result
-
-    def appendRow(self, items):
-        """Reimplimentation for signal emissions"""
-        result = super().appendRow(items)
-        self.rowCountChanged.emit(self.rowCount())
-        return result
-
-    def removeRow(self, row):
-        """Reimplimentation for signal emissions"""
-        result = super().removeRow(row)
-        self.rowCountChanged.emit(self.rowCount())
-        return result
-
-    def insertRows(self, row, count, parent=QModelIndex()):
-        """Reimplimentation for signal emissions"""
-        first = row
-        last = row + count if row == 0 else row + count - 1
-        self.beginInsertRows(parent, first, last)
-        result = super().insertRows(row, count, parent)
-        self.endInsertRows()
-        self.rowCountChanged.emit(self.rowCount())
-        return result
+                return self._keys[section] if section < len(self._keys) else "thumbnail"
+
+    def flags(self, index: QModelIndex):
+        if not index.isValid():
+            return Qt.ItemIsDropEnabled
+        return (
+            Qt.ItemIsEnabled
+            | Qt.ItemIsSelectable
+            | Qt.ItemIsDragEnabled
+            | Qt.ItemIsDropEnabled
+        )
+
+    def supportedDropActions(self):
+        return Qt.CopyAction | Qt.MoveAction
+
+    def insertRow(self, row: int, item: MediaItem):
+        return self.insert_items(row, [item])
+
+    def appendRow(self, item: MediaItem):
+        return self.insert_items(len(self._items), [item])
+
+    def append_items(self, items: List[MediaItem]) -> bool:
+        return self.insert_items(len(self._items), items)
+
+    def insert_items(self, row: int, items: List[MediaItem]) -> bool:
+        """Insert 'items' at 'row' in one model operation. Items inserted among fetched
+        rows are exposed to views right away. Items appended once every row is fetched
+        are exposed up to 'fetch_batch_size', and the rest are left to fetchMore.
+        """
+        if not items:
+            return False
+        row = max(0, min(row, len(self._items)))
+        if row < self._fetched:
+            exposed = len(items)
+        elif self._fetched == len(self._items):
+            exposed = min(len(items), self.fetch_batch_size)
+        else:
+            exposed = 0
+        if exposed:
+            self.beginInsertRows(QModelIndex(), row, row + exposed - 1)
+        is_append = row == len(self._items)
+        self._items[row:row] = items
+        values = zip(*(self._column_values(item) for item in items))
+        for column, column_values in zip(self._columns, values):
+            column[row:row] = column_values
+        for column, keys in self._sort_keys.items():
+            new_values = self._sort_values(column, row, row + len(items))
+            keys[row:row] = sort_keys(self._keys[column], new_values)
+        if is_append and self._rows is not None:
+            self._rows.update((item, row + i) for i, item in enumerate(items))
+        else:
+            self._invalidate_rows()
+        if exposed:
+            self._fetched += exposed
+            self.endInsertRows()
+        self.itemsInserted.emit(list(items))
+        self.rowCountChanged.emit(len(self._items))
+        return True
+
+    def move_row(self, row: int, dest: int) -> bool:
+        """Move the item at 'row' so it ends up at row 'dest'. The item stays in the
+        model, so 'itemsRemoved' and 'itemsInserted' are not emitted.
+        """
+        count = len(self._items)
+        if not (0 <= row < count and 0 <= dest < count) or row == dest:
+            return False
+        while max(row, dest) >= self._fetched:
+            self.fetchMore()
+        # Qt counts the destination in rows before the move
+        self.beginMoveRows(
+            QModelIndex(), row, row, QModelIndex(), dest + 1 if dest > row else dest
+        )
+        for values in (self._items, *self._columns, *self._sort_keys.values()):
+            values.insert(dest, values.pop(row))
+        self._invalidate_rows()
+        self.endMoveRows()
+        return True
+
+    def takeRow(self, row: int) -> Optional[MediaItem]:
+        item = self.item(row)
+        if item is not None:
+            self.removeRows(row, 1)
+        return item
+
+    def removeRow(self, row, parent=QModelIndex()):
+        return self.removeRows(row, 1, parent)
 
     def removeRows(self, row, count, parent=QModelIndex()):
-        """Reimplimentation for signal emissions"""
-        first = row
-        last = row + count if row == 0 else row + count - 1
-        self.beginRemoveRows(parent, first, last)
-        result = super().removeRows(row, count, parent)
-        self.endRemoveRows()
-        self.rowCountChanged.emit(self.rowCount())
-        return result
+        if parent.isValid() or count <= 0 or row < 0:
+            return False
+        last = min(row + count, len(self._items)) - 1
+        if last < row:
+            return False
+        exposed_last = min(last, self._fetched - 1)
+        if row <= exposed_last:
+            self.beginRemoveRows(QModelIndex(), row, exposed_last)
+        removed_items = self._items[row : last + 1]
+        del self._items[row : last + 1]
+        for column in self._columns:
+            del column[row : last + 1]
+        for keys in self._sort_keys.values():
+            del keys[row : last + 1]
+        self._invalidate_rows()
+        if row <= exposed_last:
+            self._fetched -= exposed_last - row + 1
+            self.endRemoveRows()
+        self.itemsRemoved.emit(removed_items)
+        self.rowCountChanged.emit(len(self._items))
+        return True
+
+    def remove_items(self, items) -> int:
+        """Remove 'items' in a single pass over the store, wherever they are, and
+        return the number of rows removed. Scattered rows are removed in one model
+        reset instead of one removal per contiguous range.
+        """
+        removed = set(items)
+        if len(removed) == 1:
+            row = self.row_of(next(iter(removed)))
+            return 1 if row is not None and self.removeRows(row, 1) else 0
+        kept_rows = [row for row, item in enumerate(self._items) if item not in removed]
+        count = len(self._items) - len(kept_rows)
+        if not count:
+            return 0
+        removed_items = [item for item in self._items if item in removed]
+        self.beginResetModel()
+        self._fetched -= sum(
+            1 for item in self._items[: self._fetched] if item in removed
+        )
+        take = taker(kept_rows)
+        self._items = take(self._items)
+        self._columns = [take(column) for column in self._columns]
+        self._sort_keys = {c: take(keys) for c, keys in self._sort_keys.items()}
+        self._invalidate_rows()
+        self.endResetModel()
+        self.itemsRemoved.emit(removed_items)
+        self.rowCountChanged.emit(len(self._items))
+        return count
+
+    def sort(self, column: int, order=Qt.AscendingOrder):
+        """Sort the store by 'column' in a single layout change. The sort is stable, so
+        sorting by one column then another orders rows by both.
+        """
+        if not 0 <= column < len(self._keys) or len(self._items) < 2:
+            return
+        keys = self._sort_keys.get(column)
+        if keys is None:
+            values = self._sort_values(column, 0, len(self._items))
+            keys = sort_keys(self._keys[column], values)
+            self._sort_keys[column] = keys
+        rows = argsort(keys, descending=order == Qt.DescendingOrder)
+        new_rows = [0] * len(rows)
+        for new_row, old_row in enumerate(rows):
+            new_rows[old_row] = new_row
+        # Persistent indexes, like the current one, may move past the fetched rows
+        old_indexes = self.persistentIndexList()
+        last = max((new_rows[i.row()] for i in old_indexes), default=-1)
+        while last >= self._fetched:
+            self.fetchMore()
+
+        self.layoutAboutToBeChanged.emit()
+        take = taker(rows)
+        self._items = take(self._items)
+        self._columns = [take(values) for values in self._columns]
+        self._sort_keys = {c: take(keys) for c, keys in self._sort_keys.items()}
+        self._invalidate_rows()
+        if old_indexes:
+            self.changePersistentIndexList(
+                old_indexes,
+                [self.index(new_rows[i.row()], i.column()) for i in old_indexes],
+            )
+        self.layoutChanged.emit()
+        log.info(f"PLAYLIST SORTED column={self._keys[column]} order={order}")
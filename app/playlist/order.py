@@ -0,0 +1,148 @@
+import logging
+import random
+from typing import Callable, Iterable, List, Optional
+
+log = logging.getLogger(__name__)
+
+
+class ShuffleOrder:
+    """Plays every item once in a random order, then starts a new random order.
+
+    Inserted items are swapped into a random position among the items not played yet
+    in the current round. Removed items, and items already played in the round, are
+    skipped when reached, so playlist changes cost O(1) per item.
+    """
+
+    def __init__(self, rng: random.Random = None):
+        self._rng = rng or random.Random()
+        self._items: set = set()
+        self._order: list = []
+        self._position = 0  # Index of the next item in '_order'
+        self._played: set = set()
+        self._last = None
+
+    def reset(self, items: Iterable):
+        self._items = set(items)
+        self._order = []
+        self._position = 0
+        self._played.clear()
+
+    def insert(self, items: Iterable):
+        for item in items:
+            self._items.add(item)
+            self._order.append(item)
+            index = self._rng.randint(self._position, len(self._order) - 1)
+            self._order[index], self._order[-1] = self._order[-1], self._order[index]
+
+    def remove(self, items: Iterable):
+        self._items.difference_update(items)
+
+    def _new_round(self):
+        self._order = list(self._items)
+        self._rng.shuffle(self._order)
+        self._position = 0
+        self._played.clear()
+        # Don't start the round with the item that ended the last one
+        if len(self._order) > 1 and self._order[0] is self._last:
+            self._order[0], self._order[-1] = self._order[-1], self._order[0]
+
+    def peek(self):
+        """The next item, without advancing."""
+        order, items, played = self._order, self._items, self._played
+        while self._position < len(order) and (
+            order[self._position] not in items or order[self._position] in played
+        ):
+            self._position += 1
+        if self._position >= len(order):
+            if not items:
+                return None
+            self._new_round()
+        return self._order[self._position]
+
+    def advance(self):
+        item = self.peek()
+        if item is not None:
+            self._position += 1
+            self._played.add(item)
+            self._last = item
+        return item
+
+
+class WeightedOrder:
+    """Picks items at random in proportion to their weights, with Vose's alias method.
+
+    The alias table is rebuilt in O(n) on the first pick after the playlist changed,
+    and each pick then takes O(1). Picking the same item twice in a row is avoided by
+    drawing again, up to 'max_repeat_draws' times.
+    """
+
+    max_repeat_draws = 8
+
+    def __init__(self, weight_of: Callable[..., float], rng: random.Random = None):
+        self.weight_of = weight_of
+        self._rng = rng or random.Random()
+        self._items: list = []
+        self._prob: Optional[List[float]] = None
+        self._alias: List[int] = []
+        self._next = None
+        self._last = None
+
+    def reset(self, items: Iterable):
+        self._items = list(items)
+        self._invalidate()
+
+    def insert(self, items: Iterable):
+        self._items.extend(items)
+        self._invalidate()
+
+    def remove(self, items: Iterable):
+        removed = set(items)
+        self._items = [item for item in self._items if item not in removed]
+        self._invalidate()
+
+    def _invalidate(self):
+        self._prob = None
+        self._next = None
+
+    def _build(self):
+        count = len(self._items)
+        weights = [max(0.0, self.weight_of(item)) for item in self._items]
+        total = sum(weights)
+        if total <= 0:
+            weights, total = [1.0] * count, float(count)
+        scaled = [weight * count / total for weight in weights]
+        prob = [1.0] * count
+        alias = list(range(count))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            prob[less], alias[less] = scaled[less], more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        self._prob, self._alias = prob, alias
+
+    def _draw(self):
+        if self._prob is None:
+            self._build()
+        index = self._rng.randrange(len(self._items))
+        if self._rng.random() >= self._prob[index]:
+            index = self._alias[index]
+        return self._items[index]
+
+    def peek(self):
+        """The next item, without advancing."""
+        if self._next is None and self._items:
+            item = self._draw()
+            for _ in range(self.max_repeat_draws):
+                if item is not self._last:
+                    break
+                item = self._draw()
+            self._next = item
+        return self._next
+
+    def advance(self):
+        item = self.peek()
+        self._next = None
+        self._last = item
+        return item
@@ -1,23 +1,39 @@
 import logging
+from itertools import chain
+from typing import Optional
 
-from PyQt5.QtCore import QModelIndex, QObject, Qt, QTimer, pyqtSignal, pyqtSlot
+from PyQt5.QtCore import QModelIndex, QObject, pyqtSignal, pyqtSlot
 
-from app import config
+from app import config, vlcqt
+from app.playlist.metadata import MediaMetadata
 from app.playlist.model import MediaItem
+from app.playlist.order import ShuffleOrder, WeightedOrder
+from app.playlist.probe import MediaProber
+from app.playlist.scheduler import FrameScheduler
 
 log = logging.getLogger(__name__)
 
 
 class _ListPlayer(QObject):
     mediachanged = pyqtSignal(MediaItem)
+    prefetch_lead_time = 5000  # ms before the end of the current item
 
-    def __init__(self, viewpoint_mngr, loop_mode_mngr, media_player):
+    def __init__(self, viewpoint_mngr, loop_mode_mngr, media_player, probe_cache=None):
         super().__init__()
         self.viewpoint_mngr = viewpoint_mngr
         self.loop_mode_mngr = loop_mode_mngr
         self.mp = media_player
+        self.prober = MediaProber(cache=probe_cache, parent=self)
         self._item = None
+        self._model = None
+        self._prefetched = None  # (MediaItem, vlc.Media) expected to play next
+        self._probing: set = set()  # Items with a probe running
+        self._orders = {
+            "shuffle": ShuffleOrder(),
+            "weighted": WeightedOrder(weight_of=self._item_weight),
+        }
         self.mp.endreached.connect(self._handle_media_finished)
+        self.mp.timeupdated.connect(self.on_timeupdated)
 
     def on_mp_endreached(self):
         self._handle_media_finished()
@@ -29,21 +45,146 @@ class _ListPlayer(QObject):
             self.mp.stop()
 
     def index(self):
-        return self._item.model().indexFromItem(self._item)
+        return self._model.indexFromItem(self._item)
 
     def item(self):
         return self._item
 
+    @staticmethod
+    def _item_weight(item: MediaItem) -> float:
+        try:
+            return float(item.metadata().tags.get(config.state.weight_tag, 1.0))
+        except (TypeError, ValueError):
+            return 1.0
+
+    def _set_model(self, model):
+        """Follow the items of 'model' in the shuffle and weighted play orders."""
+        if model is self._model:
+            return
+        if self._model is not None:
+            self._model.itemsInserted.disconnect(self.on_model_itemsInserted)
+            self._model.itemsRemoved.disconnect(self.on_model_itemsRemoved)
+        self._model = model
+        model.itemsInserted.connect(self.on_model_itemsInserted)
+        model.itemsRemoved.connect(self.on_model_itemsRemoved)
+        items = [model.item(row) for row in range(model.item_count())]
+        for order in self._orders.values():
+            order.reset(items)
+
+    @pyqtSlot(list)
+    def on_model_itemsInserted(self, items: list):
+        for order in self._orders.values():
+            order.insert(items)
+
+    @pyqtSlot(list)
+    def on_model_itemsRemoved(self, items: list):
+        for order in self._orders.values():
+            order.remove(items)
+
+    def _probe_item(self, item: MediaItem):
+        """Probe an item added from a playlist file off the GUI thread, the first time
+        it is about to play. Its stub metadata is replaced when the probe finishes.
+        """
+        if item.is_probed() or item in self._probing:
+            return
+        self._probing.add(item)
+        job = self.prober.probe([item.path()])
+
+        def on_batchready(batch: list):
+            self._on_item_probed(item, batch[0][1])
+
+        def on_finished():
+            self._probing.discard(item)
+            if job.failed_paths:
+                log.error(f"PROBE FAILED path={item.path()}")
+
+        job.batchready.connect(on_batchready)
+        job.finished.connect(on_finished)
+
+    def _on_item_probed(self, item: MediaItem, metadata: MediaMetadata):
+        """Swap in the probed metadata. If 'item' is playing, its viewpoint and
+        'mediachanged' listeners are updated, as its size, frame rate and length were
+        not known when it was loaded.
+        """
+        if self._model is not None:
+            self._model.update_item(item, metadata)
+        else:
+            item.set_metadata(metadata)
+        if item is self._item:
+            self.viewpoint_mngr.set_enabled(item.is_spherical())
+            self.mediachanged.emit(item)
+
+    def _row(self) -> int:
+        row = self._model.row_of(self._item)
+        return -1 if row is None else row
+
+    def _expected_next_item(self) -> Optional[MediaItem]:
+        """The item that will be played when the current item finishes."""
+        if self._item is None or self._model is None:
+            return None
+        curr_row = self._row()
+        loop_mode = config.state.loop_mode
+        if curr_row == -1:
+            return None
+        elif loop_mode == "one":
+            return self._item
+        elif loop_mode in self._orders:
+            return self._orders[loop_mode].peek()
+        next_item = self._model.item(curr_row + 1)
+        if next_item is None and loop_mode == "all":
+            next_item = self._model.item(0)
+        return next_item
+
+    @pyqtSlot(int)
+    def on_timeupdated(self, time: int):
+        """Prefetch the metadata of the next item's media a few seconds before the
+        current item ends, so its tracks are already parsed when it is set on the
+        player. The player still opens and buffers the file at the transition, so
+        this shortens the gap between items but does not remove it.
+        """
+        if self._prefetched is not None or self._item is None:
+            return
+        length = self._item.metadata().duration * 1000 or self.mp.get_length()
+        if length <= 0 or length - time > self.prefetch_lead_time:
+            return
+        next_item = self._expected_next_item()
+        if next_item is None:
+            return
+        self._probe_item(next_item)
+        media = self.mp.get_instance().media_new(next_item.path())
+        media.parse_with_options(vlcqt.MediaParseFlag.local, -1)
+        self._prefetched = (next_item, media)
+        log.debug(f"PREFETCH MEDIA path={next_item.path()}")
+
+    def _take_prefetched(self, item: MediaItem):
+        """Return the prefetched media if it is for 'item'. Any other prefetched
+        media is released.
+        """
+        prefetched, self._prefetched = self._prefetched, None
+        if prefetched is None:
+            return None
+        if prefetched[0] is item:
+            return prefetched[1]
+        prefetched[1].release()
+        return None
+
     def _handle_media_finished(self):
         """Perform next expected task when media is finished."""
-        curr_index = self._item.index()
-        next_index = curr_index.sibling(self._item.row() + 1, 0)
+        curr_row = self._row()
         loop_mode = config.state.loop_mode
-        if loop_mode == "one" and curr_index.isValid():
+        if loop_mode in self._orders:
+            next_item = self._orders[loop_mode].advance()
+        else:
+            next_item = self._model.item(curr_row + 1)
+        if loop_mode == "one" and curr_row != -1:
+            media = self._take_prefetched(self._item)
             self.mp.stop()
+            if media:
+                self.mp.set_media(media)
+                media.release()  # The player holds its own reference
             self.mp.play()
-        elif next_index.isValid():
-            self.load_media(next_index)
+        elif next_item:
+            self.load_item(next_item)
             self.mp.play()
         else:
             self._handle_playlist_finished()
@@ -56,35 +197,41 @@ class _ListPlayer(QObject):
             return None
         elif loop_mode == "one":
             self.mp.set_position(0)
-            if self._item.index().isValid():
+            if self._row() != -1:
                 self.mp.play()
         elif loop_mode == "all":
-            first_item_index = self._item.index().sibling(0, 0)
-            self.load_media(first_item_index)
-            self.mp.play()
+            first_item = self._model.item(0)
+            if first_item:
+                self.load_item(first_item)
+                self.mp.play()
 
     def skip_previous(self):
-        prev_index = self._item.index().sibling(self._item.row() - 1, 0)
+        prev_row = self._row() - 1
+        prev_item = self._model.item(prev_row) if prev_row >= 0 else None
         is_playing = self.mp.is_playing()
-        if prev_index.isValid():
-            self._item = self._item.model().itemFromIndex(prev_index)
-            self.load_media(prev_index)
+        if prev_item:
+            self.load_item(prev_item)
         else:
             self.mp.set_time(0)
-            log.info(f"LOAD PREV MEDIA Index Invalid row={prev_index.row()}")
+            log.info(f"LOAD PREV MEDIA Index Invalid row={prev_row}")
         if is_playing:
             self.mp.play()
 
     def skip_next(self):
         is_playing = self.mp.is_playing()
-        next_index = self._item.index().sibling(self._item.row() + 1, 0)
-        if next_index.isValid():
-            self._item = self._item.model().itemFromIndex(next_index)
-            self.load_media(next_index)
+        loop_mode = config.state.loop_mode
+        next_row = self._row() + 1
+        if loop_mode in self._orders:
+            next_item = self._orders[loop_mode].advance()
+        else:
+            next_item = self._model.item(next_row)
+        if next_item:
+            self.load_item(next_item)
         else:
-            log.info(f"LOAD NEXT MEDIA Index Invalid row={next_index.row()}")
-            first_item_index = self._item.model().item(0).index()
-            self.load_media(first_item_index)
+            log.info(f"LOAD NEXT MEDIA Index Invalid row={next_row}")
+            first_item = self._model.item(0)
+            if first_item:
+                self.load_item(first_item)
         if is_playing:
             self.mp.play()
 
@@ -92,50 +239,51 @@ class _ListPlayer(QObject):
         if not index.isValid():
             log.info(f"LOAD MEDIA Index Invalid row={index.row()}")
             return False
-        item = index.model().itemFromIndex(index)
+        self._set_model(index.model())
+        item = self._model.itemFromIndex(index)
         if not isinstance(item, MediaItem):
             log.error(f"Unexpected item type '{type(item)}'. Expected MediaItem.")
             return False
+        return self.load_item(item)
+
+    def load_item(self, item: MediaItem) -> bool:
+        self._item = item
+        self._probe_item(item)
+        path = self._item.path()
+        is_spherical = self._item.is_spherical()
+        self.viewpoint_mngr.set_enabled(is_spherical)
+        media = self._take_prefetched(item)
+        self.mp.stop()
+        if media:
+            self.mp.set_media(media)
+            media.release()  # The player holds its own reference
         else:
-            self._item = index.model().itemFromIndex(index)
-            path = self._item.path()
-            is_spherical = self._item.is_spherical()
-            self.viewpoint_mngr.set_redraw_every_frame(is_spherical)
-            self.mp.stop()
             self.mp.set_mrl(path)
-            self.mediachanged.emit(self._item)
-            self.mp.play()
-            return True
+        self.mediachanged.emit(self._item)
+        self.mp.play()
+        return True
 
-    def unload_media(self, items: list):
+    def unload_media(self, items):
         """If current media is in 'items', unload it without loading any of the other
         items in 'items'.
         """
-        if self._item not in items:
+        removed = items if isinstance(items, (set, frozenset)) else set(items)
+        if self._item not in removed:
             return None
 
-        curr_index = self._item.index()
-        loop_mode = self.loop_mode_mngr.get_mode()
-
-        # Get indexes after current index
-        indexes = []
-        index = curr_index.sibling(self._item.row() + 1, 0)
-        while index.isValid():
-            indexes.append(index)
-            index = index.sibling(index.row() + 1, 0)
-
-        # If loop mode is 'all', get indexes before current index
-        if loop_mode == "all":
-            index = curr_index.sibling(0, 0)
-            while index != curr_index:
-                indexes.append(index)
-                index = index.sibling(index.row() + 1, 0)
-
-        # Look for a valid item in collected indexes and load
-        for index in indexes:
-            item = index.model().itemFromIndex(index)
-            if item not in items:
-                if self.load_media(index):
+        curr_row = self._row()
+        item_count = self._model.item_count()
+
+        # Look for the next item that is not removed, wrapping around unless the loop
+        # mode stops at the end. Only removed items are skipped, so this takes at most
+        # len(items) steps.
+        rows = range(curr_row + 1, item_count)
+        if self.loop_mode_mngr.get_mode() not in ("off", "one"):
+            rows = chain(rows, range(0, curr_row))
+        for row in rows:
+            item = self._model.item(row)
+            if item not in removed:
+                if self.load_item(item):
                     return None  # Return if a valid item was loaded
 
         # Stop playing and let view handle controls state
@@ -150,27 +298,36 @@ class MediaListPlayer(_ListPlayer):
     newframe = pyqtSignal()
     slider_precision = 100
 
-    def __init__(self, viewpoint_mngr, loop_mode_mngr, media_player):
+    def __init__(self, viewpoint_mngr, loop_mode_mngr, media_player, probe_cache=None):
         super().__init__(
             viewpoint_mngr=viewpoint_mngr,
             loop_mode_mngr=loop_mode_mngr,
             media_player=media_player,
+            probe_cache=probe_cache,
         )
-        self.timer = QTimer()
-        self.timer.setTimerType(Qt.CoarseTimer)
-        self.timer.timeout.connect(self.on_timeout)
+        self.scheduler = FrameScheduler(parent=self)
+        self.scheduler.ticked.connect(self.newframe)
 
-        self.mp.playing.connect(self.timer.start)
-        self.mp.stopped.connect(self.timer.stop)
-        self.mp.paused.connect(self.timer.stop)
+        self.mp.playing.connect(self.on_playing)
+        self.mp.stopped.connect(self.scheduler.stop)
+        self.mp.paused.connect(self.scheduler.stop)
+        self.mp.ratechanged.connect(self.on_ratechanged)
 
         self.mediachanged.connect(self.on_mediachanged)
 
-    def on_timeout(self):
-        self.newframe.emit()
+    def _update_frame_rate(self):
+        fps = self._item.metadata().avg_frame_rate if self._item else 0
+        self.scheduler.set_frame_rate(fps, self.mp.get_rate())
+
+    @pyqtSlot()
+    def on_playing(self):
+        self._update_frame_rate()  # Playback rate may have changed since last play
+        self.scheduler.start()
+
+    @pyqtSlot(float)
+    def on_ratechanged(self, rate: float):
+        self._update_frame_rate()
 
     @pyqtSlot(MediaItem)
     def on_mediachanged(self, media_item: MediaItem):
-        media_info = media_item.info()
-        media_fps = media_info["avg_frame_rate"]
-        self.timer.setInterval(media_fps)
+        self._update_frame_rate()
@@ -0,0 +1,139 @@
+import logging
+import os
+from typing import Iterable, Iterator, NamedTuple, TextIO
+from urllib.parse import unquote, urlparse
+
+log = logging.getLogger(__name__)
+
+M3U_EXTENSIONS = (".m3u", ".m3u8")
+PLS_EXTENSIONS = (".pls",)
+PLAYLIST_EXTENSIONS = M3U_EXTENSIONS + PLS_EXTENSIONS
+FILE_DIALOG_FILTER = "Playlists (*.m3u *.m3u8 *.pls)"
+
+
+class PlaylistEntry(NamedTuple):
+    path: str
+    title: str = ""
+    duration: float = 0.0  # seconds, 0 if unknown
+
+
+def is_playlist_file(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in PLAYLIST_EXTENSIONS
+
+
+def _resolve(location: str, base_dir: str) -> str:
+    """Absolute path of a playlist 'location', relative to the playlist directory.
+    URLs other than file URLs are returned unchanged.
+    """
+    if location.lower().startswith("file://"):
+        return os.path.normpath(unquote(urlparse(location).path))
+    if "://" in location:
+        return location
+    return os.path.normpath(os.path.join(base_dir, location))
+
+
+def _duration(value: str) -> float:
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return 0.0
+
+
+def _read_m3u(lines: Iterable[str], base_dir: str) -> Iterator[PlaylistEntry]:
+    title, duration = "", 0.0
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            # #EXTINF:<duration> [attributes],<title>
+            if line[:8].upper() == "#EXTINF:":
+                info, _, title = line[8:].partition(",")
+                duration = _duration(info.split(maxsplit=1)[0] if info else "")
+                title = title.strip()
+            continue
+        yield PlaylistEntry(_resolve(line, base_dir), title, duration)
+        title, duration = "", 0.0
+
+
+def _read_pls(lines: Iterable[str], base_dir: str) -> Iterator[PlaylistEntry]:
+    """Entries are expected to be grouped by number, as written by every known
+    player, so each entry is yielded as soon as the next number starts.
+    """
+    number, fields = None, {}
+    for line in lines:
+        key, sep, value = line.strip().partition("=")
+        if not sep:
+            continue
+        name = key.rstrip("0123456789").lower()
+        if name not in ("file", "title", "length") or name == key.lower():
+            continue
+        if key[len(name) :] != number:
+            if "file" in fields:
+                yield _pls_entry(fields, base_dir)
+            number, fields = key[len(name) :], {}
+        fields[name] = value.strip()
+    if "file" in fields:
+        yield _pls_entry(fields, base_dir)
+
+
+def _pls_entry(fields: dict, base_dir: str) -> PlaylistEntry:
+    return PlaylistEntry(
+        _resolve(fields["file"], base_dir),
+        fields.get("title", ""),
+        _duration(fields.get("length", "")),
+    )
+
+
+def read_playlist(path: str) -> Iterator[PlaylistEntry]:
+    """Yield the entries of an m3u, m3u8 or pls file, reading it line by line.
+    Relative locations are resolved against the directory of the playlist.
+    """
+    base_dir = os.path.dirname(os.path.abspath(path))
+    reader = _read_pls if path.lower().endswith(PLS_EXTENSIONS) else _read_m3u
+    with open(path, encoding="utf-8-sig", errors="replace") as f:
+        yield from reader(f, base_dir)
+
+
+def _location(path: str, base_dir: str) -> str:
+    """Location of 'path' relative to the playlist directory when it is inside it."""
+    if "://" in path:
+        return path
+    try:
+        relpath = os.path.relpath(path, base_dir)
+    except ValueError:  # On a different drive
+        return path
+    return path if relpath.startswith(os.pardir) else relpath
+
+
+def _write_m3u(f: TextIO, entries: Iterable[PlaylistEntry], base_dir: str) -> int:
+    count = 0
+    f.write("#EXTM3U\n")
+    for entry in entries:
+        duration = round(entry.duration) if entry.duration else -1
+        f.write(f"#EXTINF:{duration},{entry.title}\n")
+        f.write(f"{_location(entry.path, base_dir)}\n")
+        count += 1
+    return count
+
+
+def _write_pls(f: TextIO, entries: Iterable[PlaylistEntry], base_dir: str) -> int:
+    count = 0
+    f.write("[playlist]\n")
+    for count, entry in enumerate(entries, start=1):
+        f.write(f"File{count}={_location(entry.path, base_dir)}\n")
+        f.write(f"Title{count}={entry.title}\n")
+        f.write(f"Length{count}={round(entry.duration) if entry.duration else -1}\n")
+    f.write(f"NumberOfEntries={count}\nVersion=2\n")
+    return count
+
+
+def write_playlist(path: str, entries: Iterable[PlaylistEntry]) -> int:
+    """Write 'entries' to an m3u, m3u8 or pls file, chosen by the extension of
+    'path', and return the number of entries written. Locations inside the
+    playlist directory are written as relative paths.
+    """
+    base_dir = os.path.dirname(os.path.abspath(path))
+    writer = _write_pls if path.lower().endswith(PLS_EXTENSIONS) else _write_m3u
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        return writer(f, entries, base_dir)
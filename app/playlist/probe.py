@@ -0,0 +1,179 @@
+import logging
+from typing import Callable, Optional
+
+from ffmpeg import Error as FFmpegError
+from ffmpeg import probe as ffmpeg_probe
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+from app import config
+from app.playlist.cache import ProbeCache
+from app.playlist.metadata import MediaMetadata
+
+log = logging.getLogger(__name__)
+
+
+def probe_media(path: str, cache: ProbeCache = None) -> Optional[dict]:
+    """Return the ffprobe result for 'path', or None if it has no playable streams.
+
+    If a cache is given, it is checked first and updated with any new result. Files
+    that ffprobe read but could not decode are cached as failures, so they are not
+    probed again until they change. Other errors, e.g. ffprobe missing or the file
+    unreadable, may not last and are not cached.
+    """
+    probe = cache.get(path) if cache else None
+    if probe is None:
+        try:
+            probe = ffmpeg_probe(path)
+        except FFmpegError as e:
+            log.debug(f"PROBE FAILED path={path} error={e.stderr[-200:]!r}")
+            probe = {}
+        except OSError as e:
+            log.error(f"Could not run ffprobe: {e}")
+            return None
+        except Exception as e:
+            log.debug(f"PROBE FAILED path={path} error={e}")
+            return None
+        if cache:
+            cache.put(path, probe)
+    streams = probe.get("streams", [])
+    if not any(s.get("codec_type") in ("video", "audio") for s in streams):
+        return None
+    return probe
+
+
+def probe_metadata(
+    path: str, tag_keys: tuple, cache: ProbeCache = None
+) -> Optional[MediaMetadata]:
+    probe = probe_media(path, cache=cache)
+    if probe is None:
+        return None
+    return MediaMetadata.from_probe(probe, path=path, tag_keys=tag_keys)
+
+
+class _ProbeTask(QRunnable):
+    def __init__(
+        self, results: dict, index: int, path: str, tag_keys: tuple, cache: ProbeCache
+    ):
+        super().__init__()
+        self.results = results
+        self.index = index
+        self.path = path
+        self.tag_keys = tag_keys
+        self.cache = cache
+
+    def run(self):
+        # Single dict item assignment, so no lock is needed to publish the result.
+        # Only the compact metadata is kept, the raw probe is dropped here.
+        self.results[self.index] = probe_metadata(
+            self.path, tag_keys=self.tag_keys, cache=self.cache
+        )
+
+
+class ProbeJob(QObject):
+    """Probes a list of paths on a thread pool and emits the results in batches, in
+    the original order of the paths, on the thread that owns the job.
+
+    An open job accepts more paths through 'extend', e.g. while a directory scan is
+    running, and only finishes once it is closed. If a 'path_filter' is given, it is
+    called with each list of new paths and returns the ones to probe.
+    """
+
+    batchready = pyqtSignal(list)
+    finished = pyqtSignal()
+
+    flush_interval = 50  # ms
+
+    def __init__(
+        self,
+        paths: list,
+        thread_pool: QThreadPool,
+        cache: ProbeCache = None,
+        path_filter: Callable[[list], list] = None,
+        parent=None,
+    ):
+        super().__init__(parent=parent)
+        self.path_filter = path_filter
+        self.paths = path_filter(paths) if path_filter else list(paths)
+        self.failed_paths: list = []
+        self.thread_pool = thread_pool
+        self.cache = cache
+        # Read on this thread, as config state is not shared with worker threads
+        self.tag_keys = (*config.state.meta_tags, config.state.weight_tag)
+        self._results: dict = {}
+        self._next_index = 0
+        self._started = 0  # Number of paths with a started task
+        self._open = False
+        self.batch_count = 0
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.flush_interval)
+        self.timer.timeout.connect(self._flush)
+
+    def start(self, open_=False):
+        self._open = open_
+        self._start_tasks()
+        self.timer.start()
+
+    def extend(self, paths: list):
+        self.paths.extend(self.path_filter(paths) if self.path_filter else paths)
+        self._start_tasks()
+
+    def close(self):
+        """No more paths will be added."""
+        self._open = False
+
+    def _start_tasks(self):
+        for index in range(self._started, len(self.paths)):
+            path = self.paths[index]
+            self.thread_pool.start(
+                _ProbeTask(
+                    self._results,
+                    index,
+                    path,
+                    tag_keys=self.tag_keys,
+                    cache=self.cache,
+                )
+            )
+        self._started = len(self.paths)
+
+    def _flush(self):
+        """Emit every finished result that directly follows the last emitted one."""
+        batch = []
+        while self._next_index in self._results:
+            metadata = self._results.pop(self._next_index)
+            if metadata:
+                batch.append((self.paths[self._next_index], metadata))
+            else:
+                self.failed_paths.append(self.paths[self._next_index])
+            self._next_index += 1
+
+        if batch:
+            self.batch_count += 1
+            self.batchready.emit(batch)
+        if self._next_index >= len(self.paths) and not self._open:
+            self.timer.stop()
+            self.finished.emit()
+
+
+class MediaProber(QObject):
+    """Provides a shared worker pool for probing media files off the GUI thread."""
+
+    def __init__(self, cache: ProbeCache = None, parent=None):
+        super().__init__(parent=parent)
+        self.cache = cache
+        self.thread_pool = QThreadPool(self)
+
+    def probe(self, paths: list, open_=False, path_filter=None) -> ProbeJob:
+        """Start probing 'paths'. If 'open_', more paths can be added to the job until
+        it is closed.
+        """
+        job = ProbeJob(
+            paths=paths,
+            thread_pool=self.thread_pool,
+            cache=self.cache,
+            path_filter=path_filter,
+            parent=self,
+        )
+        job.finished.connect(job.deleteLater)
+        job.start(open_=open_)
+        return job
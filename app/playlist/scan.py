@@ -0,0 +1,284 @@
+import logging
+import os
+from typing import Iterator, List, Tuple
+
+from PyQt5.QtCore import (
+    QFileSystemWatcher,
+    QObject,
+    QRunnable,
+    QThreadPool,
+    QTimer,
+    pyqtSignal,
+    pyqtSlot,
+)
+
+from app import config
+
+log = logging.getLogger(__name__)
+
+# fmt: off
+MEDIA_EXTENSIONS = frozenset(
+    (
+        ".3g2", ".3gp", ".aac", ".aiff", ".ape", ".asf", ".avi", ".divx", ".dv",
+        ".f4v", ".flac", ".flv", ".h264", ".h265", ".hevc", ".m1v", ".m2t", ".m2ts",
+        ".m2v", ".m4a", ".m4v", ".mka", ".mkv", ".mov", ".mp2", ".mp3", ".mp4",
+        ".mpeg", ".mpg", ".mts", ".mxf", ".ogg", ".ogm", ".ogv", ".opus", ".rm",
+        ".rmvb", ".ts", ".vob", ".wav", ".webm", ".wma", ".wmv", ".wv", ".y4m",
+    )
+)
+# fmt: on
+
+# Leading bytes of container formats, for files without a known media extension.
+# Each signature is an (offset, bytes) pair.
+MAGIC_SIGNATURES = (
+    (4, b"ftyp"),  # ISO base media (mp4, mov, 3gp)
+    (0, b"\x1a\x45\xdf\xa3"),  # EBML (mkv, webm)
+    (0, b"RIFF"),  # avi, wav
+    (0, b"OggS"),
+    (0, b"fLaC"),
+    (0, b"ID3"),  # mp3
+    (0, b"FLV"),
+    (0, b"\x00\x00\x01\xba"),  # MPEG program stream
+    (0, b"\x30\x26\xb2\x75"),  # asf, wmv
+    (0, b"YUV4MPEG2"),
+)
+_TS_PACKET_SIZE = 188
+
+
+def has_media_signature(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            head = f.read(_TS_PACKET_SIZE + 1)
+    except OSError:
+        return False
+    if any(head[offset : offset + len(m)] == m for offset, m in MAGIC_SIGNATURES):
+        return True
+    # MPEG transport stream: sync byte at the start of consecutive packets
+    return len(head) > _TS_PACKET_SIZE and head[0] == head[_TS_PACKET_SIZE] == 0x47
+
+
+def is_media_candidate(path: str) -> bool:
+    """Cheap check before probing. Files with a media extension pass, files without
+    an extension are checked for a container signature, any other file is skipped.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in MEDIA_EXTENSIONS:
+        return True
+    return not ext and has_media_signature(path)
+
+
+def scan_directory(path: str) -> Tuple[List[str], List[str]]:
+    """Media candidate files and subdirectories directly in 'path', sorted by name.
+    Symbolic links to directories are not followed, so a tree can't loop.
+    """
+    files, dirs = [], []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(entry.path)
+                    elif entry.is_file() and is_media_candidate(entry.path):
+                        files.append(entry.path)
+                except OSError:
+                    continue
+    except OSError as e:
+        log.error(f"SCAN FAILED path={path} error={e}")
+    files.sort()
+    dirs.sort()
+    return files, dirs
+
+
+def walk_media(root: str, recursive=True) -> Iterator[Tuple[str, List[str]]]:
+    """Yield (directory, media candidate files) for 'root' and, if 'recursive', for
+    every directory below it, depth first in name order.
+    """
+    stack = [os.path.abspath(root)]
+    while stack:
+        path = stack.pop()
+        files, dirs = scan_directory(path)
+        yield path, files
+        if recursive:
+            stack.extend(reversed(dirs))
+
+
+class _ScanTask(QRunnable):
+    def __init__(self, job: "ScanJob"):
+        super().__init__()
+        self.job = job
+
+    def run(self):
+        # Signals emitted on this worker thread are queued to the job, which relays
+        # them on its own thread, the results only if it wasn't cancelled meanwhile
+        job = self.job
+        batch = []
+        for root in job.roots:
+            for path, files in walk_media(root, recursive=job.recursive):
+                if job.is_cancelled():
+                    break
+                job._directoryscanned.emit(path, files)
+                batch.extend(files)
+                if len(batch) >= job.batch_size:
+                    job._pathsfound.emit(batch)
+                    batch = []
+            if job.is_cancelled():
+                break
+        if batch:
+            job._pathsfound.emit(batch)
+        job._finished.emit()
+
+
+class ScanJob(QObject):
+    """Walks directories on a thread pool and emits the media candidate files found,
+    in batches, as the walk goes.
+
+    Once cancelled, the walk stops at the next directory and nothing more is emitted
+    apart from 'finished', including results the walk had already queued.
+    """
+
+    pathsfound = pyqtSignal(list)
+    directoryscanned = pyqtSignal(str, list)
+    finished = pyqtSignal()
+
+    # Emitted by the worker thread, relayed to the public signals
+    _pathsfound = pyqtSignal(list)
+    _directoryscanned = pyqtSignal(str, list)
+    _finished = pyqtSignal()
+
+    batch_size = 256
+
+    def __init__(
+        self, roots: list, recursive: bool, thread_pool: QThreadPool, parent=None
+    ):
+        super().__init__(parent=parent)
+        self.roots = list(roots)
+        self.recursive = recursive
+        self.thread_pool = thread_pool
+        self._cancelled = False
+        self._pathsfound.connect(self._on_found)
+        self._directoryscanned.connect(self._on_scanned)
+        self._finished.connect(self.finished)
+
+    def start(self):
+        self.thread_pool.start(_ScanTask(self))
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    @pyqtSlot(list)
+    def _on_found(self, paths: list):
+        if not self._cancelled:
+            self.pathsfound.emit(paths)
+
+    @pyqtSlot(str, list)
+    def _on_scanned(self, path: str, files: list):
+        if not self._cancelled:
+            self.directoryscanned.emit(path, files)
+
+
+class DirectoryWatcher(QObject):
+    """Keeps watched directory trees in sync with the playlist.
+
+    A snapshot of the media candidate files of each watched directory is kept, and
+    when a directory changes only that directory is scanned again and compared with
+    its snapshot. New subdirectories are scanned and watched in the background, if
+    the 'scan_recursive' setting is on.
+    """
+
+    pathsadded = pyqtSignal(list)
+    pathsremoved = pyqtSignal(list)
+
+    settle_interval = 500  # ms, coalesces bursts of changes, e.g. during a copy
+
+    def __init__(self, thread_pool: QThreadPool, parent=None):
+        super().__init__(parent=parent)
+        self.thread_pool = thread_pool
+        self._files: dict = {}  # Watched directory: set of media candidate files
+        self._changed: set = set()
+        self._jobs: set = set()  # Scans running for 'watch'
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.on_directoryChanged)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.settle_interval)
+        self.timer.timeout.connect(self._update)
+
+    def is_watched(self, path: str) -> bool:
+        return os.path.abspath(path) in self._files
+
+    def add_directory(self, path: str, files: list):
+        """Watch 'path', whose media candidate files are 'files'."""
+        if path not in self._files:
+            self.watcher.addPath(path)
+        self._files[path] = set(files)
+
+    def on_directoryChanged(self, path: str):
+        self._changed.add(path)
+        self.timer.start()
+
+    def _remove_tree(self, root: str) -> list:
+        prefix = os.path.join(root, "")
+        removed_dirs = [p for p in self._files if p == root or p.startswith(prefix)]
+        removed = []
+        for path in removed_dirs:
+            removed.extend(self._files.pop(path))
+            self.watcher.removePath(path)
+        return removed
+
+    def _update(self):
+        changed, self._changed = self._changed, set()
+        added, removed, new_dirs = [], [], []
+        for path in sorted(changed):
+            if path not in self._files:
+                continue
+            if not os.path.isdir(path):
+                removed.extend(self._remove_tree(path))
+                continue
+            files, dirs = scan_directory(path)
+            old_files = self._files[path]
+            self._files[path] = set(files)
+            added.extend(f for f in files if f not in old_files)
+            removed.extend(old_files.difference(files))
+            new_dirs.extend(d for d in dirs if d not in self._files)
+            gone_dirs = [
+                p for p in self._files if os.path.dirname(p) == path and p not in dirs
+            ]
+            for gone_dir in gone_dirs:
+                removed.extend(self._remove_tree(gone_dir))
+        if removed:
+            log.debug(f"WATCHED FILES REMOVED count={len(removed)}")
+            self.pathsremoved.emit(sorted(removed))
+        if added:
+            log.debug(f"WATCHED FILES ADDED count={len(added)}")
+            self.pathsadded.emit(added)
+        if new_dirs and config.state.scan_recursive:
+            self.watch(new_dirs)
+
+    def clear(self):
+        """Stop watching every directory, and cancel the scans of new ones."""
+        for job in self._jobs:
+            job.cancel()
+        self._jobs.clear()
+        if self._files:
+            self.watcher.removePaths(list(self._files))
+        self._files.clear()
+        self._changed.clear()
+        self.timer.stop()
+
+    def watch(self, roots: list):
+        """Watch 'roots' and every directory below them. Files found below them are
+        reported through 'pathsadded'.
+        """
+        job = ScanJob(
+            roots=roots, recursive=True, thread_pool=self.thread_pool, parent=self
+        )
+        job.directoryscanned.connect(self.add_directory)
+        job.pathsfound.connect(self.pathsadded)
+        job.finished.connect(lambda: self._jobs.discard(job))
+        job.finished.connect(job.deleteLater)
+        self._jobs.add(job)
+        job.start()
@@ -0,0 +1,77 @@
+import logging
+import time
+
+from PyQt5.QtCore import QObject, Qt, QTimer, pyqtSignal
+
+from app import instrument
+
+log = logging.getLogger(__name__)
+
+
+class FrameScheduler(QObject):
+    """Emits 'ticked' once per displayed frame of the playing media.
+
+    The tick period is derived from the media frame rate and the playback rate. Each
+    tick has an absolute deadline on the 'clock' in ns, and the next one is placed one
+    period after it, so timer latency never accumulates into drift. If whole periods
+    are missed, they are dropped instead of emitted in a burst.
+
+    Every tick is emitted. The scheduler only runs while media is playing, when each
+    tick advances the position slider, and the viewpoint is already left alone when
+    no new motion state arrived, so there are no unchanged frames to skip.
+    """
+
+    ticked = pyqtSignal()
+    default_fps = 30
+    tolerance_ns = 1_000_000  # A wake-up this close to the deadline counts as on time
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.clock = time.perf_counter_ns
+        self.period_ns = round(1e9 / self.default_fps)
+        self.missed_count = 0
+        self._deadline = 0
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._on_timeout)
+
+    def set_frame_rate(self, fps: float, rate: float = 1.0):
+        if not fps or fps <= 0:
+            fps = self.default_fps
+        if not rate or rate <= 0:
+            rate = 1.0
+        self.period_ns = round(1e9 / (fps * rate))
+        log.debug(f"FRAME SCHEDULER period_ms={self.period_ns / 1e6:.3f}")
+
+    def is_active(self) -> bool:
+        return self.timer.isActive()
+
+    def start(self):
+        now = self.clock()
+        self._deadline = now + self.period_ns
+        self._schedule(now)
+
+    def stop(self):
+        self.timer.stop()
+
+    def _schedule(self, now: int):
+        # Round up to whole ms, so the timer wakes at or after the deadline instead of
+        # early, which would re-arm it for a sub-ms remainder
+        self.timer.start(max(0, -(-(self._deadline - now) // 1_000_000)))
+
+    def _on_timeout(self):
+        now = self.clock()
+        if now + self.tolerance_ns < self._deadline:
+            self._schedule(now)  # Woke up early
+            return
+        lateness = max(0, now - self._deadline)
+        instrument.record("scheduler.tick_lateness", lateness)
+        late_periods = lateness // self.period_ns
+        if late_periods:
+            self.missed_count += late_periods
+            self._deadline += late_periods * self.period_ns
+        self._deadline += self.period_ns
+        self._schedule(now)
+        self.ticked.emit()
@@ -0,0 +1,393 @@
+import logging
+import re
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from PyQt5.QtCore import (
+    QAbstractProxyModel,
+    QModelIndex,
+    QPersistentModelIndex,
+    Qt,
+    pyqtSlot,
+)
+
+log = logging.getLogger(__name__)
+
+# Runs of letters or of digits, so numbered names like 'clip0042' or 'DSC_0042'
+# share the 'clip' or 'dsc' token instead of each having a token of its own
+_TOKEN_RE = re.compile(r"[^\W\d_]+|\d+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.casefold())
+
+
+class SearchIndex:
+    """Inverted index from word tokens to items, searched by token prefix.
+
+    The distinct tokens are kept sorted, so the tokens starting with a prefix are a
+    contiguous range found by bisection. Items are also indexed by the first one and
+    two characters of their tokens, as those ranges span most tokens. Adding or
+    removing items only touches their own tokens, and new tokens are merged into the
+    sorted list at the next search.
+    """
+
+    short_prefix_length = 2
+
+    def __init__(self, text_of: Callable[..., str]):
+        self.text_of = text_of
+        self._postings: Dict[str, set] = {}
+        self._short_postings: Dict[str, set] = {}
+        self._item_tokens: dict = {}
+        self._sorted_tokens: List[str] = []
+        self._new_tokens: List[str] = []
+        self._stale_count = 0  # Tokens left in '_sorted_tokens' with no items
+
+    def __len__(self):
+        return len(self._item_tokens)
+
+    def reset(self, items: Iterable):
+        self._postings.clear()
+        self._short_postings.clear()
+        self._item_tokens.clear()
+        self._sorted_tokens = []
+        self._new_tokens = []
+        self._stale_count = 0
+        self.add(items)
+
+    def _short_prefixes(self, tokens: Iterable[str]) -> set:
+        return {
+            token[:length]
+            for token in tokens
+            for length in range(1, self.short_prefix_length + 1)
+        }
+
+    def add(self, items: Iterable):
+        postings, short_postings = self._postings, self._short_postings
+        for item in items:
+            if item in self._item_tokens:
+                continue
+            tokens = frozenset(tokenize(self.text_of(item)))
+            self._item_tokens[item] = tokens
+            for token in tokens:
+                posting = postings.get(token)
+                if posting is None:
+                    postings[token] = {item}
+                    self._new_tokens.append(token)
+                else:
+                    posting.add(item)
+            for prefix in self._short_prefixes(tokens):
+                posting = short_postings.get(prefix)
+                if posting is None:
+                    short_postings[prefix] = {item}
+                else:
+                    posting.add(item)
+
+    def _discard(self, postings: dict, key: str, item) -> bool:
+        posting = postings[key]
+        posting.discard(item)
+        if posting:
+            return False
+        del postings[key]
+        return True
+
+    def remove(self, items: Iterable):
+        for item in items:
+            tokens = self._item_tokens.pop(item, ())
+            for token in tokens:
+                if self._discard(self._postings, token, item):
+                    self._stale_count += 1
+            for prefix in self._short_prefixes(tokens):
+                self._discard(self._short_postings, prefix, item)
+
+    def update(self, items: Iterable):
+        """Index 'items' again, after their text changed."""
+        items = list(items)
+        self.remove(items)
+        self.add(items)
+
+    def _merge_new_tokens(self):
+        tokens = self._sorted_tokens
+        if self._stale_count * 2 > len(tokens):
+            self._sorted_tokens = sorted(self._postings)
+            self._stale_count = 0
+        elif self._new_tokens:
+            # Sorting two sorted runs is a linear merge
+            tokens.extend(sorted(self._new_tokens))
+            tokens.sort()
+        self._new_tokens = []
+
+    def _matches(self, prefix: str) -> Set:
+        if len(prefix) <= self.short_prefix_length:
+            return self._short_postings.get(prefix, set())
+        if self._new_tokens or self._stale_count:
+            self._merge_new_tokens()
+        tokens = self._sorted_tokens
+        first = bisect_left(tokens, prefix)
+        last = bisect_left(tokens, prefix[:-1] + chr(ord(prefix[-1]) + 1), first)
+        get = self._postings.get
+        return set().union(*(get(token, ()) for token in tokens[first:last]))
+
+    def search(self, query: str) -> Optional[Set]:
+        """Items with a token starting with each word of 'query', or None if 'query'
+        has no words.
+        """
+        prefixes = sorted(set(tokenize(query)), key=len, reverse=True)
+        if not prefixes:
+            return None
+        # Longer prefixes usually match fewer items, so intersect from them
+        result = set(self._matches(prefixes[0]))
+        for prefix in prefixes[1:]:
+            if not result:
+                break
+            result &= self._matches(prefix)
+        return result
+
+
+class PlaylistFilterProxyModel(QAbstractProxyModel):
+    """Shows the rows of a PlaylistModel matching a search, in playlist order.
+
+    Matches come from a SearchIndex over the displayed tag values of each item, kept
+    up to date as items are added, removed or probed, instead of calling 'data' for
+    every cell. Without a search, rows map one to one to the source rows.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.search_index = SearchIndex(text_of=self._text_of)
+        self._text = ""
+        self._rows: Optional[List[int]] = None  # Sorted source rows, None if no filter
+        self._layout_proxy: list = []
+        self._layout_source: list = []
+
+    @staticmethod
+    def _text_of(item) -> str:
+        # Tags only hold the 'meta_tags' values read when the item was probed
+        tags = item.metadata().tags
+        return " ".join(map(str, (item.title(), *tags.values())))
+
+    def setSourceModel(self, model):
+        old_model = self.sourceModel()
+        if old_model is not None:
+            for signal, slot in self._source_connections(old_model):
+                signal.disconnect(slot)
+        self.beginResetModel()
+        super().setSourceModel(model)
+        self._rows = None
+        self._reindex()
+        self._update_rows()
+        for signal, slot in self._source_connections(model):
+            signal.connect(slot)
+        self.endResetModel()
+
+    def _source_connections(self, model) -> list:
+        return [
+            (model.rowsAboutToBeInserted, self.on_source_rowsAboutToBeInserted),
+            (model.rowsInserted, self.on_source_rowsInserted),
+            (model.rowsAboutToBeRemoved, self.on_source_rowsAboutToBeRemoved),
+            (model.rowsRemoved, self.on_source_rowsRemoved),
+            (model.rowsAboutToBeMoved, self.on_source_rowsAboutToBeMoved),
+            (model.rowsMoved, self.on_source_rowsMoved),
+            (model.modelAboutToBeReset, self.beginResetModel),
+            (model.modelReset, self.on_source_modelReset),
+            (model.layoutAboutToBeChanged, self.on_source_layoutAboutToBeChanged),
+            (model.layoutChanged, self.on_source_layoutChanged),
+            (model.dataChanged, self.on_source_dataChanged),
+            (model.headerDataChanged, self.headerDataChanged),
+            (model.itemsInserted, self.on_source_itemsInserted),
+            (model.itemsRemoved, self.on_source_itemsRemoved),
+            (model.itemsUpdated, self.on_source_itemsUpdated),
+        ]
+
+    def _reindex(self):
+        model = self.sourceModel()
+        self.search_index.reset(model.item(row) for row in range(model.item_count()))
+
+    def is_filtering(self) -> bool:
+        return self._rows is not None
+
+    def _update_rows(self):
+        matches = self.search_index.search(self._text)
+        if matches is None:
+            self._rows = None
+            return
+        model = self.sourceModel()
+        # Filtered rows may be anywhere in the store, so all rows must be fetched
+        model.fetch_all()
+        self._rows = model.rows_of(matches)
+
+    def _refilter(self):
+        if self._rows is None and tokenize(self._text):
+            # Fetch while rows are still forwarded, not during the reset
+            self.sourceModel().fetch_all()
+        self.beginResetModel()
+        self._update_rows()
+        self.endResetModel()
+
+    def set_filter_text(self, text: str):
+        if text == self._text:
+            return
+        self._text = text
+        self._refilter()
+        log.debug(f"PLAYLIST FILTERED text={text!r} rows={self.rowCount()}")
+
+    def filter_text(self) -> str:
+        return self._text
+
+    # Source model signals, forwarded as is when not filtering
+
+    @pyqtSlot(QModelIndex, int, int)
+    def on_source_rowsAboutToBeInserted(self, parent, first, last):
+        if self._rows is None:
+            self.beginInsertRows(QModelIndex(), first, last)
+
+    @pyqtSlot(QModelIndex, int, int)
+    def on_source_rowsInserted(self, parent, first, last):
+        if self._rows is None:
+            self.endInsertRows()
+
+    @pyqtSlot(QModelIndex, int, int)
+    def on_source_rowsAboutToBeRemoved(self, parent, first, last):
+        if self._rows is None:
+            self.beginRemoveRows(QModelIndex(), first, last)
+
+    @pyqtSlot(QModelIndex, int, int)
+    def on_source_rowsRemoved(self, parent, first, last):
+        if self._rows is None:
+            self.endRemoveRows()
+
+    @pyqtSlot(QModelIndex, int, int, QModelIndex, int)
+    def on_source_rowsAboutToBeMoved(self, parent, first, last, dest_parent, dest):
+        if self._rows is None:
+            self.beginMoveRows(QModelIndex(), first, last, QModelIndex(), dest)
+        else:
+            # Filtered rows are found again once the move is done
+            self.on_source_layoutAboutToBeChanged()
+
+    @pyqtSlot(QModelIndex, int, int, QModelIndex, int)
+    def on_source_rowsMoved(self, parent, first, last, dest_parent, dest):
+        if self._rows is None:
+            self.endMoveRows()
+        else:
+            self.on_source_layoutChanged()
+
+    @pyqtSlot()
+    def on_source_modelReset(self):
+        if self._rows is not None:
+            self._update_rows()
+        self.endResetModel()
+
+    @pyqtSlot()
+    def on_source_layoutAboutToBeChanged(self):
+        self.layoutAboutToBeChanged.emit()
+        self._layout_proxy = self.persistentIndexList()
+        self._layout_source = [
+            QPersistentModelIndex(self.mapToSource(index))
+            for index in self._layout_proxy
+        ]
+
+    @pyqtSlot()
+    def on_source_layoutChanged(self):
+        if self._rows is not None:
+            self._update_rows()
+        self.changePersistentIndexList(
+            self._layout_proxy,
+            [self.mapFromSource(QModelIndex(i)) for i in self._layout_source],
+        )
+        self._layout_proxy, self._layout_source = [], []
+        self.layoutChanged.emit()
+
+    @pyqtSlot(QModelIndex, QModelIndex, "QVector<int>")
+    def on_source_dataChanged(self, top_left, bottom_right, roles=()):
+        # The searched text changes with 'itemsUpdated', emitted even for rows that
+        # are not fetched, so this only forwards the change
+        if self._rows is None:
+            self.dataChanged.emit(
+                self.mapFromSource(top_left), self.mapFromSource(bottom_right), roles
+            )
+            return
+        model = self.sourceModel()
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            left = self.mapFromSource(model.index(row, top_left.column()))
+            if left.isValid():
+                right = left.sibling(left.row(), bottom_right.column())
+                self.dataChanged.emit(left, right, roles)
+
+    @pyqtSlot(list)
+    def on_source_itemsInserted(self, items: list):
+        self.search_index.add(items)
+        if self._rows is not None:
+            self._refilter()
+
+    @pyqtSlot(list)
+    def on_source_itemsRemoved(self, items: list):
+        self.search_index.remove(items)
+        if self._rows is not None:
+            self._refilter()
+
+    @pyqtSlot(list)
+    def on_source_itemsUpdated(self, items: list):
+        self.search_index.update(items)
+        if self._rows is not None:
+            rows = self._rows
+            self._update_rows()
+            if rows != self._rows:
+                # Updated items now match the search, or no longer do
+                self.beginResetModel()
+                self.endResetModel()
+
+    # QAbstractProxyModel
+
+    def mapToSource(self, proxy_index: QModelIndex) -> QModelIndex:
+        model = self.sourceModel()
+        if not proxy_index.isValid() or model is None:
+            return QModelIndex()
+        row = proxy_index.row()
+        if self._rows is not None:
+            row = self._rows[row]
+        return model.index(row, proxy_index.column())
+
+    def mapFromSource(self, source_index: QModelIndex) -> QModelIndex:
+        if not source_index.isValid():
+            return QModelIndex()
+        row = source_index.row()
+        if self._rows is not None:
+            row = bisect_left(self._rows, row)
+            if row >= len(self._rows) or self._rows[row] != source_index.row():
+                return QModelIndex()
+        return self.index(row, source_index.column())
+
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def rowCount(self, parent=QModelIndex()):
+        model = self.sourceModel()
+        if parent.isValid() or model is None:
+            return 0
+        return model.rowCount() if self._rows is None else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        model = self.sourceModel()
+        if parent.isValid() or model is None:
+            return 0
+        return model.columnCount()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return self._rows is None and self.sourceModel().canFetchMore(parent)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if self._rows is None:
+            self.sourceModel().fetchMore(parent)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if self.sourceModel() is None:
+            return None
+        if orientation == Qt.Vertical and self._rows is not None:
+            if 0 <= section < len(self._rows):
+                section = self._rows[section]
+        return self.sourceModel().headerData(section, orientation, role)
@@ -0,0 +1,122 @@
+import re
+from array import array
+from itertools import compress, repeat
+from math import nan
+from operator import eq, is_, is_not, itemgetter, ne
+from typing import Callable, Iterable, List, Optional, Sequence, Union
+
+# Tags sorted by number rather than by text, and how to read their values
+NUMBER_TAGS = ("track number", "disc number", "track", "disc", "rating", "year")
+DURATION_TAGS = ("duration",)
+DATE_TAGS = ("date", "creation_time")
+# Tags that are also fields of the probed metadata. Media files rarely carry them
+# as tags, so their sort keys are read from the fields.
+METADATA_TAGS = ("duration", "width", "height", "nb_frames", "avg_frame_rate")
+
+_NUMBER_RE = re.compile(r"[-+]?\d+(?:\.\d+)?")
+_DIGITS_RE = re.compile(r"\d+")
+
+SortKeys = Union[array, List[Optional[str]]]
+
+
+def parse_number(value) -> float:
+    """Leading number of a tag value, e.g. 3 for a track number of '3/12'."""
+    match = _NUMBER_RE.search(str(value))
+    return float(match.group()) if match else nan
+
+
+def parse_duration(value) -> float:
+    """Seconds in a duration of seconds or of the form [[HH:]MM:]SS[.ms]."""
+    seconds = 0.0
+    try:
+        for part in str(value).strip().split(":"):
+            seconds = seconds * 60 + float(part)
+    except ValueError:
+        return nan
+    return seconds
+
+
+def parse_date(value) -> float:
+    """A date or date and time, e.g. '2019', '2019-05-01' or '2019-05-01T12:30:00Z',
+    as the number YYYYMMDDhhmmss. Missing parts count as zero.
+    """
+    parts = _DIGITS_RE.findall(str(value))
+    if not parts or len(parts[0]) != 4:
+        return nan
+    number = 0
+    for width, part in zip((4, 2, 2, 2, 2, 2), parts[:6] + ["0"] * (6 - len(parts))):
+        number = number * 10**width + int(part[:width])
+    return float(number)
+
+
+def key_function(tag: str) -> Optional[Callable[..., float]]:
+    """Function reading the numeric sort key of values of 'tag', or None if 'tag'
+    is sorted as text.
+    """
+    tag = tag.lower()
+    if tag in DURATION_TAGS:
+        return parse_duration
+    if tag in DATE_TAGS:
+        return parse_date
+    if tag in NUMBER_TAGS or tag in METADATA_TAGS:
+        return parse_number
+    return None
+
+
+def metadata_field(tag: str) -> Optional[str]:
+    """Name of the metadata field holding the value of 'tag', or None."""
+    tag = tag.lower()
+    return tag if tag in METADATA_TAGS else None
+
+
+def sort_keys(tag: str, values: Iterable) -> SortKeys:
+    """Typed sort keys of the values of 'tag': an array of floats, NaN if missing, for
+    numeric tags, or a list of case-folded strings, None if missing.
+    """
+    parse = key_function(tag)
+    if parse is None:
+        return [None if value is None else str(value).casefold() for value in values]
+    return array("d", (nan if value is None else parse(value) for value in values))
+
+
+def sort_key(tag: str, value) -> Union[float, Optional[str]]:
+    """Sort key of a single value, as stored by 'sort_keys'."""
+    return sort_keys(tag, (value,))[0]
+
+
+def argsort(keys: Sequence, descending=False) -> List[int]:
+    """Indexes of 'keys' in sorted order. The sort is stable in both directions, so
+    sorting by one column then by another orders rows by both. Missing keys, None or
+    NaN, always go last.
+    """
+    indexes = range(len(keys))
+    if isinstance(keys, array):
+        # NaN is the only float not equal to itself
+        present = list(compress(indexes, map(eq, keys, keys)))
+        is_missing = map(ne, keys, keys)
+    else:
+        present = list(compress(indexes, map(is_not, keys, repeat(None))))
+        is_missing = map(is_, keys, repeat(None))
+    present.sort(key=keys.__getitem__, reverse=descending)
+    if len(present) < len(keys):
+        present.extend(compress(indexes, is_missing))
+    return present
+
+
+def taker(indexes: Sequence[int]) -> Callable[[Sequence], Sequence]:
+    """Function taking the values at 'indexes' of a list or array, in a sequence of
+    the same kind. Reordering many columns by the same rows reuses one taker.
+    """
+    if len(indexes) > 1:
+        get = itemgetter(*indexes)
+    else:
+
+        def get(values):
+            return [values[index] for index in indexes]
+
+    def take_values(values: Sequence) -> Sequence:
+        if isinstance(values, array):
+            return array(values.typecode, get(values))
+        return list(get(values))
+
+    return take_values
@@ -0,0 +1,294 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import ffmpeg
+from PyQt5.QtCore import QObject, QRunnable, QThread, QThreadPool, pyqtSignal, pyqtSlot
+from PyQt5.QtGui import QImage, QPixmap
+
+from app.playlist.fingerprint import file_key
+
+log = logging.getLogger(__name__)
+
+Size = Tuple[int, int]
+
+
+def seek_time(duration: float) -> float:
+    """Time of the poster frame, a tenth into the media to skip fades from black, but
+    no more than 30 seconds in so long files don't seek far.
+    """
+    return min(duration * 0.1, 30.0) if duration > 0 else 0.0
+
+
+def extract_poster_frame(
+    path: str, size: Size, duration: float, is_spherical: bool
+) -> Optional[bytes]:
+    """JPEG poster frame of 'path' fitting in 'size', from ffmpeg. Returns empty bytes
+    if ffmpeg can't decode a frame, and None if ffmpeg can't be run at all.
+    """
+    stream = ffmpeg.input(path, ss=seek_time(duration))
+    if is_spherical:
+        # The front view of an equirectangular frame: 120 degrees of its width and
+        # 67.5 degrees of its height around the horizon, with a 16:9 aspect ratio
+        stream = stream.filter("crop", "iw/3", "ih*3/8", "iw/3", "ih*5/16")
+    stream = stream.filter(
+        "scale", size[0], size[1], force_original_aspect_ratio="decrease"
+    )
+    stream = stream.output("pipe:", vframes=1, format="image2", vcodec="mjpeg")
+    try:
+        data, _ = stream.run(capture_stdout=True, capture_stderr=True)
+    except ffmpeg.Error as e:
+        log.debug(f"POSTER FRAME FAILED path={path} error={e.stderr[-200:]!r}")
+        return b""
+    except OSError as e:
+        log.error(f"Could not run ffmpeg: {e}")
+        return None
+    return data
+
+
+class ThumbnailCache:
+    """Disk cache of thumbnail images, keyed by the path, size and mtime of their media
+    file, whether it is spherical, and the thumbnail size.
+
+    Safe to use from worker threads. Each thumbnail is a file in 'path', and the least
+    recently used files are deleted when their total size exceeds 'max_size' bytes.
+    Failures are stored as empty files, so they are not tried again.
+    """
+
+    suffix = ".jpg"
+
+    def __init__(self, path: str, max_size: int):
+        self.path = path
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_size = 0
+
+        try:
+            os.makedirs(path, exist_ok=True)
+            self._total_size = sum(entry.stat().st_size for entry in self._entries())
+        except OSError as e:
+            log.error(f"Could not open thumbnail cache, thumbnails won't be kept: {e}")
+            self.path = None
+
+    def _entries(self):
+        with os.scandir(self.path) as entries:
+            return [e for e in entries if e.name.endswith(self.suffix)]
+
+    def _file_path(
+        self, media_path: str, size: Size, is_spherical: bool
+    ) -> Optional[str]:
+        key = file_key(media_path)
+        if key[1] < 0 or self.path is None:
+            return None
+        digest = hashlib.blake2b(
+            repr((key, size, is_spherical)).encode(), digest_size=16
+        )
+        return os.path.join(self.path, digest.hexdigest() + self.suffix)
+
+    def get(self, media_path: str, size: Size, is_spherical: bool) -> Optional[bytes]:
+        """Cached thumbnail of 'media_path', empty if it failed, or None if missing."""
+        path = self._file_path(media_path, size, is_spherical)
+        try:
+            if path is None:
+                raise FileNotFoundError
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def put(self, media_path: str, size: Size, is_spherical: bool, data: bytes) -> None:
+        path = self._file_path(media_path, size, is_spherical)
+        if path is None:
+            return
+        try:
+            with open(path, "wb") as f:
+                f.write(data)
+        except OSError as e:
+            log.debug(f"THUMBNAIL CACHE WRITE FAILED path={path} error={e}")
+            return
+        with self._lock:
+            self._total_size += len(data)
+            if self._total_size > self.max_size:
+                self._evict()
+
+    def set_max_size(self, max_size: int) -> None:
+        with self._lock:
+            self.max_size = max_size
+            if self._total_size > self.max_size:
+                self._evict()
+
+    def _evict(self):
+        """Delete least recently used files until the cache is under 90% of its
+        maximum size. Caller must hold the lock.
+        """
+        target = self.max_size * 0.9
+        try:
+            entries = [(e.stat(), e.path) for e in self._entries()]
+        except OSError:
+            return
+        self._total_size = sum(stat.st_size for stat, _ in entries)
+        entries.sort(key=lambda entry: entry[0].st_mtime_ns)
+        count = 0
+        for stat, path in entries:
+            if self._total_size <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._total_size -= stat.st_size
+            count += 1
+        log.debug(f"THUMBNAIL CACHE EVICTED count={count}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "path": self.path,
+                "entries": len(self._entries()) if self.path else 0,
+                "size": self._total_size,
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def purge(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            for entry in self._entries():
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+            self._total_size = 0
+            self.hits = self.misses = 0
+        log.info(f"THUMBNAIL CACHE PURGED path={self.path}")
+
+
+class _ThumbnailTask(QRunnable):
+    def __init__(self, loader: "ThumbnailLoader"):
+        super().__init__()
+        self.loader = loader
+
+    def run(self):
+        # Takes requests until there are none left, newest first. Images are decoded
+        # here, and only turned into pixmaps on the GUI thread.
+        loader = self.loader
+        cache = loader.cache
+        while True:
+            request = loader.take_request()
+            if request is None:
+                return
+            key, item = request
+            path, is_spherical = key
+            data = cache.get(path, loader.size, is_spherical) if cache else None
+            if data is None:
+                duration = item.metadata().duration
+                data = extract_poster_frame(path, loader.size, duration, is_spherical)
+                if data is not None and cache:
+                    cache.put(path, loader.size, is_spherical, data)
+            image = QImage.fromData(data) if data else QImage()
+            loader.imageready.emit(key, item, image)
+
+
+class ThumbnailLoader(QObject):
+    """Makes playlist thumbnails on a thread pool and keeps the latest ones in memory.
+
+    Requests are served last in, first out, so the rows in view after scrolling are
+    served before the rows scrolled past, and the oldest requests are dropped when
+    there are more than 'max_requests'. Asking for a thumbnail never waits: it returns
+    the pixmap if it is in memory, or requests it, and 'thumbnailready' is emitted
+    with the item once it is.
+    """
+
+    thumbnailready = pyqtSignal(object)
+    imageready = pyqtSignal(tuple, object, QImage)
+
+    size = (160, 90)
+    max_requests = 256
+    max_pixmaps = 512
+
+    def __init__(self, cache: ThumbnailCache = None, parent=None):
+        super().__init__(parent=parent)
+        self.cache = cache
+        self.thread_pool = QThreadPool(self)
+        # Leave cores to playback, decoding a frame can use several threads
+        self.thread_pool.setMaxThreadCount(max(1, QThread.idealThreadCount() // 2))
+        # Thumbnails are keyed by media path and whether the media is spherical, which
+        # changes once an item read from a playlist file is probed
+        self._pixmaps: OrderedDict = OrderedDict()  # Key: QPixmap
+        self._failed: set = set()
+        self._lock = threading.Lock()
+        self._requests: OrderedDict = OrderedDict()  # Key: item, newest last
+        self._making: set = set()  # Keys of the thumbnails being made
+        self._task_count = 0
+        self.imageready.connect(self.on_imageready)
+
+    @staticmethod
+    def _key(item) -> tuple:
+        return item.path(), item.metadata().is_spherical
+
+    def thumbnail(self, item) -> Optional[QPixmap]:
+        key = self._key(item)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is None:
+            self.request(item)
+            return None
+        self._pixmaps.move_to_end(key)
+        return pixmap
+
+    def request(self, item):
+        """Request the thumbnail of 'item', ahead of the earlier requests."""
+        key = self._key(item)
+        if key in self._pixmaps or key in self._failed:
+            return
+        with self._lock:
+            if key in self._making:
+                return
+            self._requests[key] = item
+            self._requests.move_to_end(key)
+            while len(self._requests) > self.max_requests:
+                self._requests.popitem(last=False)
+            start_task = self._task_count < self.thread_pool.maxThreadCount()
+            if start_task:
+                self._task_count += 1
+        if start_task:
+            self.thread_pool.start(_ThumbnailTask(self))
+
+    def take_request(self) -> Optional[Tuple[tuple, object]]:
+        """Key and item of the newest request, or None once there are none and the
+        task should end.
+        """
+        with self._lock:
+            if self._requests:
+                key, item = self._requests.popitem()
+                self._making.add(key)
+                return key, item
+            self._task_count -= 1
+            return None
+
+    def clear(self):
+        """Drop the requests not started yet."""
+        with self._lock:
+            self._requests.clear()
+
+    @pyqtSlot(tuple, object, QImage)
+    def on_imageready(self, key: tuple, item, image: QImage):
+        with self._lock:
+            self._making.discard(key)
+        if image.isNull():
+            self._failed.add(key)
+            return
+        self._pixmaps[key] = QPixmap.fromImage(image)
+        while len(self._pixmaps) > self.max_pixmaps:
+            self._pixmaps.popitem(last=False)
+        self.thumbnailready.emit(item)
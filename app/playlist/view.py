@@ -1,11 +1,25 @@
 import logging
+import os
+from itertools import islice
+from typing import Callable, Optional
 
 from PyQt5 import QtGui
-from PyQt5.QtCore import QModelIndex, QPoint, Qt, pyqtSlot
+from PyQt5.QtCore import (
+    QModelIndex,
+    QObject,
+    QPoint,
+    QSize,
+    Qt,
+    QThreadPool,
+    QTimer,
+    pyqtSignal,
+    pyqtSlot,
+)
 from PyQt5.QtGui import QKeySequence
 from PyQt5.QtWidgets import (
     QAction,
     QHeaderView,
+    QLineEdit,
     QMainWindow,
     QMenu,
     QShortcut,
@@ -15,12 +29,19 @@ from PyQt5.QtWidgets import (
     QWidget,
 )
 
+from app import config
 from app.base.docking import DockableWidget
 from app.base.popup import PopupWindowAction, PopupWindowWidget
 from app.gui import icons
+from app.playlist.fingerprint import FingerprintIndex
+from app.playlist.metadata import MediaMetadata
 from app.playlist.model import MediaItem, PlaylistModel
+from app.playlist.probe import MediaProber
+from app.playlist.scan import DirectoryWatcher, ScanJob
+from app.playlist.search import PlaylistFilterProxyModel
+from app.playlist.thumbnails import ThumbnailCache, ThumbnailLoader
 
-from . import files
+from . import files, playlistfiles
 
 log = logging.getLogger(__name__)
 
@@ -78,6 +99,9 @@ class PlaylistView(QTableView):
         self.setDropIndicatorShown(True)
         self.setHorizontalHeader(PlaylistViewHeader(parent=self))
         self.setContextMenuPolicy(Qt.CustomContextMenu)
+        # Keep the playlist order until a column header is clicked
+        self.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.setSortingEnabled(True)
 
         # Create shortcuts
         self.rem_selected_items_shortcut = QShortcut(self)
@@ -90,31 +114,90 @@ class PlaylistView(QTableView):
         self.play_selected_item_shortcut.setContext(Qt.WidgetWithChildrenShortcut)
         self.play_selected_item_shortcut.activated.connect(self.play_selected_item)
 
+        self.playlist_model = None
+        self.filter_model = PlaylistFilterProxyModel(parent=self)
         self.setModel(PlaylistModel())
 
+        # Thumbnails of the rows around the viewport are requested once scrolling
+        # settles, while the visible rows request theirs as they are painted
+        self.row_height = self.verticalHeader().defaultSectionSize()
+        self.thumbnail_timer = QTimer(self)
+        self.thumbnail_timer.setSingleShot(True)
+        self.thumbnail_timer.setInterval(100)
+        self.thumbnail_timer.timeout.connect(self.request_nearby_thumbnails)
+
         # Setup signals
         self.customContextMenuRequested.connect(self.show_context_menu)
         self.doubleClicked.connect(self.on_doubleClicked)
         self.selectionModel().selectionChanged.connect(self.on_selectionChanged)
+        self.verticalScrollBar().valueChanged.connect(self.on_scrolled)
+        self.filter_model.modelReset.connect(self.update_thumbnail_column)
 
     def showEvent(self, e):
         if self.model().rowCount():
             if not self.selectionModel().hasSelection():
-                self.setCurrentIndex(self.model().item(0).index())
+                self.setCurrentIndex(self.model().index(0, 0))
         self.setFocus()
 
+    @pyqtSlot()
+    def update_thumbnail_column(self):
+        """Show the thumbnail column first, and make rows as tall as thumbnails."""
+        column = self.playlist_model.thumbnail_column()
+        if column < 0:
+            self.verticalHeader().setDefaultSectionSize(self.row_height)
+            return
+        width, height = ThumbnailLoader.size
+        self.setIconSize(QSize(width, height))
+        self.verticalHeader().setDefaultSectionSize(height + 4)
+        header = self.horizontalHeader()
+        header.moveSection(header.visualIndex(column), 0)
+        header.resizeSection(column, width + 8)
+
+    @pyqtSlot(int)
+    def on_scrolled(self, value):
+        self.thumbnail_timer.start()
+
+    @pyqtSlot()
+    def request_nearby_thumbnails(self):
+        """Request the thumbnails of a page of rows above and below the viewport, then
+        of the visible rows, so the visible rows are served first.
+        """
+        if self.playlist_model.thumbnail_column() < 0:
+            return
+        first = self.rowAt(0)
+        if first < 0:
+            return
+        last = self.rowAt(self.viewport().height() - 1)
+        if last < 0:
+            last = self.model().rowCount() - 1
+        page = last - first + 1
+        rows = [
+            *range(min(last + page, self.model().rowCount() - 1), last, -1),
+            *range(max(0, first - page), first),
+            *range(last, first - 1, -1),
+        ]
+        self.playlist_model.request_thumbnails(
+            self.source_index(self.model().index(row, 0)).row() for row in rows
+        )
+
+    def source_index(self, index: QModelIndex) -> QModelIndex:
+        """Map an index of this view to the playlist model."""
+        return self.filter_model.mapToSource(index)
+
+    def item_at(self, index: QModelIndex) -> Optional[MediaItem]:
+        return self.playlist_model.itemFromIndex(self.source_index(index))
+
     @pyqtSlot()
     def play_selected_item(self):
-        self.player.load_media(index=self.currentIndex())
+        self.player.load_media(index=self.source_index(self.currentIndex()))
         self.player.mp.play()
 
     def mousePressEvent(self, e):
         """Clear both row and current index selections when clicking away from items."""
         clicked_index = self.indexAt(e.pos())
         if clicked_index.isValid():
-            item = self.model().item(clicked_index.row())
-            status_tip = item.data(role=Qt.DisplayRole)
-            self.status_bar.showMessage(status_tip)
+            item = self.item_at(clicked_index)
+            self.status_bar.showMessage(item.title())
         else:
             self.selectionModel().clear()
         return super().mousePressEvent(e)
@@ -125,7 +208,7 @@ class PlaylistView(QTableView):
 
     @pyqtSlot(QModelIndex)
     def on_doubleClicked(self, index):
-        self.player.load_media(index=index)
+        self.player.load_media(index=self.source_index(index))
         self.player.mp.play()
 
     def dropEvent(self, e):
@@ -139,10 +222,15 @@ class PlaylistView(QTableView):
         if dropped_index.row() == -1:
             return None
 
-        model = self.model()
-        item = model.takeRow(dragged_index.row())
-        model.insertRow(dropped_index.row(), item)
-        self.setCurrentIndex(dropped_index)
+        model = self.playlist_model
+        item = model.itemFromIndex(self.source_index(dragged_index))
+        model.move_row(
+            self.source_index(dragged_index).row(),
+            self.source_index(dropped_index).row(),
+        )
+        # Rows are no longer in the order of the sorted column
+        self.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.setCurrentIndex(self.filter_model.mapFromSource(model.indexFromItem(item)))
         e.ignore()
 
     @pyqtSlot(int)
@@ -153,25 +241,29 @@ class PlaylistView(QTableView):
         else:
             self.play_ctrls.setEnabled(False)
 
-    def setModel(self, model):
+    def setModel(self, model: PlaylistModel):
+        """Show 'model' through the filter proxy."""
         # Disconnect previous model
-        if self.model():
-            self.model().rowCountChanged.disconnect()
+        if self.playlist_model:
+            self.playlist_model.rowCountChanged.disconnect()
         # Connect this model
         model.rowCountChanged.connect(self.on_model_rowCountChanged)
         model.rowCountChanged.connect(self.player.on_playlist_rowCountChanged)
-        super().setModel(model)
+        self.playlist_model = model
+        self.filter_model.setSourceModel(model)
+        if self.model() is not self.filter_model:
+            super().setModel(self.filter_model)
 
     def selected_items(self):
         items = []
         for i in self.selectionModel().selectedRows():
-            items.append(self.model().itemFromIndex(i))
+            items.append(self.item_at(i))
         return items
 
     def show_context_menu(self, pos: QPoint):
         selected_items = self.selected_items()
         if len(selected_items) <= 1:
-            rem_selected_text = f"Remove '{selected_items[0].data(Qt.DisplayRole)}'"
+            rem_selected_text = f"Remove '{selected_items[0].title()}'"
         else:
             rem_selected_text = f"Remove {len(selected_items)} items"
         menu = QMenu(self)
@@ -181,35 +273,44 @@ class PlaylistView(QTableView):
             self.remove_selected_items,
             self.rem_selected_items_shortcut.key(),
         )
+        if self.actions():
+            menu.addSeparator()
+            menu.addActions(self.actions())
         menu.exec_(self.mapToGlobal(pos))
 
     @pyqtSlot()
     def remove_selected_items(self):
         indexes = self.selectionModel().selectedRows()
-        items = [self.model().itemFromIndex(i) for i in indexes]
+        items = [self.item_at(i) for i in indexes]
         self.remove_items(items)
 
     def remove_items(self, items):
         # Create a status message
         if len(items) == 1:
-            status_msg = f"Removed '{items[0].data(Qt.DisplayRole)}'"
+            status_msg = f"Removed '{items[0].title()}'"
         else:
             status_msg = f"Removed {len(items)} items"
 
         # Unload from player
-        self.player.unload_media(items=items)
+        removed = set(items)
+        self.player.unload_media(items=removed)
 
-        # Remove from model
-        start_row = self.model().indexFromItem(items[0]).row()
-        num_rows = len(items)
-        self.model().removeRows(start_row, num_rows)
+        # Remove from model, whether or not the rows are contiguous
+        self.playlist_model.remove_items(removed)
 
         # Push status message
         self.status_bar.showMessage(status_msg)
 
 
 class PlaylistWidget(QWidget):
-    def __init__(self, listplayer, play_ctrls, parent: QMainWindow):
+    def __init__(
+        self,
+        listplayer,
+        play_ctrls,
+        probe_cache,
+        thumbnail_cache: ThumbnailCache,
+        parent: QMainWindow,
+    ):
         super().__init__(parent=parent)
         self.player = listplayer
         self.play_ctrls = play_ctrls
@@ -219,24 +320,280 @@ class PlaylistWidget(QWidget):
             status_bar=self.parent().statusBar(),
         )
 
+        self.search_box = QLineEdit(parent=self)
+        self.search_box.setPlaceholderText("Search")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.textChanged.connect(self.view.filter_model.set_filter_text)
+        self.search_shortcut = QShortcut(QKeySequence.Find, self)
+        self.search_shortcut.setContext(Qt.WidgetWithChildrenShortcut)
+        self.search_shortcut.activated.connect(self.search_box.setFocus)
+
         self.setLayout(QVBoxLayout())
         self.layout().setContentsMargins(0, 0, 0, 0)
+        self.layout().setSpacing(0)
+        self.layout().addWidget(self.search_box)
         self.layout().addWidget(self.view)
 
+        self.fingerprints = FingerprintIndex()
+        self.view.playlist_model.itemsRemoved.connect(self.on_model_itemsRemoved)
+        self.remove_duplicates_act = QAction("Remove Duplicates", self.view)
+        self.remove_duplicates_act.triggered.connect(self.remove_duplicates)
+        self.view.addAction(self.remove_duplicates_act)
+
+        self.thumbnails = ThumbnailLoader(cache=thumbnail_cache, parent=self)
+        self.view.playlist_model.set_thumbnails(self.thumbnails)
+
+        self.prober = MediaProber(cache=probe_cache, parent=self)
+        self.scan_pool = QThreadPool(self)
+        self.scan_jobs: set = set()  # Scans running for 'add_media'
+        self.watcher = DirectoryWatcher(thread_pool=self.scan_pool, parent=self)
+        self.watcher.pathsadded.connect(self.on_watcher_pathsadded)
+        self.watcher.pathsremoved.connect(self.on_watcher_pathsremoved)
+        config.state.signals.changed.connect(self.on_config_changed)
+
+    @pyqtSlot(str, object)
+    def on_config_changed(self, key, value):
+        if key == "watch_directories" and not value:
+            self.watcher.clear()
+
     def add_media(self, paths=[]):
-        media_paths = files.get_media_paths(paths)
-        if not media_paths:
-            log.error(f"No media paths found in {media_paths}")
+        """Probe media files from 'paths' off the GUI thread and append them to the
+        playlist in batches as the results arrive. Directories are scanned off the
+        GUI thread too, and their files are probed as they are found. Playlist files
+        are read into the playlist directly, and their items are probed when first
+        played.
+        """
+        if isinstance(paths, str):
+            paths = [paths]
+        playlist_paths = [
+            p for p in paths if os.path.isfile(p) and playlistfiles.is_playlist_file(p)
+        ]
+        for path in playlist_paths:
+            self.load_playlist(path)
+
+        other_paths = [p for p in paths if p and p not in playlist_paths]
+        dir_paths = [os.path.abspath(p) for p in other_paths if os.path.isdir(p)]
+        file_paths = files.get_file_paths(
+            [p for p in other_paths if not os.path.isdir(p)]
+        )
+        if not file_paths and not dir_paths:
+            if not playlist_paths:
+                log.error(f"No media paths found in {paths}")
+            return
+
+        # Paths already in the playlist are dropped before they are probed
+        job = self.prober.probe(
+            file_paths, open_=bool(dir_paths), path_filter=self.fingerprints.claim
+        )
+        if not job.paths and not dir_paths:
+            self.view.status_bar.showMessage("Already in the playlist")
+        job.batchready.connect(self.on_probe_batchready)
+        job.finished.connect(self.on_probe_finished)
+        if dir_paths:
+            scan = ScanJob(
+                roots=dir_paths,
+                recursive=config.state.scan_recursive,
+                thread_pool=self.scan_pool,
+                parent=self,
+            )
+            scan.pathsfound.connect(job.extend)
+            scan.finished.connect(job.close)
+            scan.finished.connect(lambda: self.scan_jobs.discard(scan))
+            scan.finished.connect(scan.deleteLater)
+            if config.state.watch_directories:
+                scan.directoryscanned.connect(self.watcher.add_directory)
+            self.scan_jobs.add(scan)
+            scan.start()
+
+    def cancel_scans(self):
+        """Stop the directory scans of 'add_media' and of watched directories, so
+        closing the window doesn't wait for them.
+        """
+        for scan in self.scan_jobs:
+            scan.cancel()
+        self.scan_jobs.clear()
+        self.watcher.clear()
+
+    def load_playlist(self, path: str):
+        """Append the entries of a playlist file in chunks as it is read, with the
+        titles and durations it lists as stub metadata. Entries are probed when
+        first played.
+        """
+        loader = PlaylistFileLoader(
+            path,
+            model=self.view.playlist_model,
+            path_filter=self.fingerprints.claim,
+            parent=self,
+        )
+        loader.chunkloaded.connect(self.on_playlist_chunkloaded)
+        loader.finished.connect(loader.deleteLater)
+        loader.start()
+
+    @pyqtSlot()
+    def on_playlist_chunkloaded(self):
+        # Load the first item if the playlist was empty before this file was opened
+        loader = self.sender()
+        if loader.chunk_count == 1 and loader.start_count == 0:
+            first_index = self.view.playlist_model.index(0, 0)
+            if first_index.isValid():
+                self.player.load_media(index=first_index)
+
+    def save_playlist(self, path: str):
+        model = self.view.playlist_model
+        items = (model.item(row) for row in range(model.item_count()))
+        entries = (
+            playlistfiles.PlaylistEntry(
+                item.path(), item.title(), item.metadata().duration
+            )
+            for item in items
+        )
+        try:
+            count = playlistfiles.write_playlist(path, entries)
+        except OSError as e:
+            log.error(f"Could not save playlist path={path} error={e}")
+            self.view.status_bar.showMessage(f"Could not save '{path}'")
             return
+        self.view.status_bar.showMessage(f"Saved {count} items to '{path}'")
 
-        model = self.view.model()
-        for media_path in media_paths:
-            item = MediaItem(media_path)
-            model.appendRow(item)
+    @pyqtSlot(list)
+    def on_probe_batchready(self, batch: list):
+        model = self.view.playlist_model
+        self._append_probed(batch)
 
-        first_item = self.view.model().item(0)
-        if first_item:
-            self.player.load_media(index=first_item.index())
+        # Load the first item once per job, when its first batch arrives
+        if self.sender().batch_count == 1:
+            first_index = model.index(0, 0)
+            if first_index.isValid():
+                self.player.load_media(index=first_index)
+
+    @pyqtSlot()
+    def on_probe_finished(self):
+        job = self.sender()
+        if job.paths and not job.batch_count:
+            log.error(f"No media found in {job.paths}")
+        self.fingerprints.release(job.failed_paths)
+
+    @pyqtSlot(list)
+    def on_model_itemsRemoved(self, items: list):
+        self.fingerprints.release(item.path() for item in items)
+
+    def duplicates(self) -> list:
+        """Groups of playlist items with the same content, in playlist order."""
+        model = self.view.playlist_model
+        items = {}
+        for row in range(model.item_count()):
+            item = model.item(row)
+            items[item.path()] = item
+        groups = self.fingerprints.duplicates(items)
+        return [[items[path] for path in group] for group in groups]
+
+    @pyqtSlot()
+    def remove_duplicates(self) -> int:
+        """Keep the first item of each group of duplicates and remove the others, in
+        one model operation.
+        """
+        removed = [item for group in self.duplicates() for item in group[1:]]
+        if removed:
+            self.view.remove_items(removed)
+        else:
+            self.view.status_bar.showMessage("No duplicates found")
+        return len(removed)
+
+    def _append_probed(self, batch: list):
+        self.view.playlist_model.append_items(
+            [MediaItem(media_path, metadata=metadata) for media_path, metadata in batch]
+        )
+
+    @pyqtSlot(list)
+    def on_watcher_pathsadded(self, paths: list):
+        job = self.prober.probe(paths, path_filter=self.fingerprints.claim)
+        job.batchready.connect(self._append_probed)
+        job.finished.connect(self.on_probe_finished)
+
+    @pyqtSlot(list)
+    def on_watcher_pathsremoved(self, paths: list):
+        removed = set(paths)
+        model = self.view.playlist_model
+        items = [
+            item
+            for item in (model.item(row) for row in range(model.item_count()))
+            if item.path() in removed
+        ]
+        if items:
+            self.view.remove_items(items)
+
+
+class PlaylistFileLoader(QObject):
+    """Reads a playlist file into a model, one chunk of entries per event loop
+    iteration, so the first rows show at once and the GUI stays responsive while
+    large files are read.
+    """
+
+    chunkloaded = pyqtSignal()
+    finished = pyqtSignal()
+    chunk_size = 1000
+
+    def __init__(
+        self,
+        path: str,
+        model: PlaylistModel,
+        path_filter: Callable[[list], list] = None,
+        parent=None,
+    ):
+        super().__init__(parent=parent)
+        self.path = path
+        self.model = model
+        self.path_filter = path_filter
+        self.start_count = model.item_count()
+        self.chunk_count = 0
+        self._entries = playlistfiles.read_playlist(path)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self._load_chunk)
+
+    def start(self):
+        self.timer.start()
+
+    def _load_chunk(self):
+        entries = []
+        try:
+            entries.extend(islice(self._entries, self.chunk_size))
+            read = len(entries)
+        except OSError as e:
+            log.error(f"Could not read playlist path={self.path} error={e}")
+            read = 0
+        if self.path_filter:
+            # Kept paths come back in order, each once, so an entry is kept if it is
+            # the next of them. Later entries with the same path are dropped.
+            kept_paths = iter(self.path_filter([entry.path for entry in entries]))
+            kept_path = next(kept_paths, None)
+            kept = []
+            for entry in entries:
+                if entry.path == kept_path:
+                    kept.append(entry)
+                    kept_path = next(kept_paths, None)
+            entries = kept
+        items = [
+            MediaItem(
+                entry.path,
+                metadata=MediaMetadata(
+                    title=entry.title or os.path.basename(entry.path),
+                    duration=entry.duration,
+                ),
+                probed=False,
+            )
+            for entry in entries
+        ]
+        loaded = self.model.append_items(items)
+        if loaded:
+            self.chunk_count += 1
+            self.chunkloaded.emit()
+        if read < self.chunk_size:
+            self.timer.stop()
+            count = self.model.item_count() - self.start_count
+            log.info(f"PLAYLIST LOADED path={self.path} count={count}")
+            self.finished.emit()
 
 
 class DockablePlaylist(DockableWidget):
@@ -12,8 +12,26 @@ class EnableHardwareAccelerationCheckbox(QtWidgets.QCheckBox):
         )
 
 
+class CacheStatsLabel(QtWidgets.QLabel):
+    def __init__(self, cache, parent=None):
+        super().__init__(parent=parent)
+        self.cache = cache
+        self.update_stats()
+
+    def update_stats(self):
+        stats = self.cache.stats()
+        self.setText(
+            f"""Entries: {stats["entries"]}
+Size: {stats["size"] / 1024 ** 2:.2f} MB of {stats["max_size"] / 1024 ** 2:.0f} MB
+Hits/misses this session: {stats["hits"]}/{stats["misses"]}
+File: {stats["path"]}"""
+        )
+
+
 class PlayerPreferencesWindow(base.modal.BaseModalSettingsDialog):
-    def __init__(self, main_win, media_player):
+    def __init__(self, main_win, media_player, probe_cache, thumbnail_cache):
+        self.probe_cache = probe_cache
+        self.thumbnail_cache = thumbnail_cache
         super().__init__(title="Media Player Preferences", main_win=main_win)
 
     def create(self, widget):
@@ -33,6 +51,94 @@ class PlayerPreferencesWindow(base.modal.BaseModalSettingsDialog):
         self.hw_accel_checkbox.setChecked(config.state.hw_accel)
         self.vlc_options_lo.addWidget(self.hw_accel_checkbox)
 
+        self.software_output_checkbox = QtWidgets.QCheckBox(
+            text="Render video frames in software (Requires restart)", parent=widget
+        )
+        self.software_output_checkbox.setChecked(
+            config.state.video_output == "callbacks"
+        )
+        self.vlc_options_lo.addWidget(self.software_output_checkbox)
+
+        # Media Folders
+        self.media_folders_group = QtWidgets.QGroupBox(
+            title="Media Folders", parent=widget
+        )
+        self.media_folders_lo = QtWidgets.QVBoxLayout()
+        self.media_folders_group.setLayout(self.media_folders_lo)
+        widget.layout().addWidget(self.media_folders_group)
+
+        self.scan_recursive_checkbox = QtWidgets.QCheckBox(
+            text="Include subfolders", parent=widget
+        )
+        self.scan_recursive_checkbox.setChecked(config.state.scan_recursive)
+        self.media_folders_lo.addWidget(self.scan_recursive_checkbox)
+
+        self.watch_directories_checkbox = QtWidgets.QCheckBox(
+            text="Keep the playlist in sync with opened folders", parent=widget
+        )
+        self.watch_directories_checkbox.setChecked(config.state.watch_directories)
+        self.media_folders_lo.addWidget(self.watch_directories_checkbox)
+
+        # Probe Cache
+        self.probe_cache_group = QtWidgets.QGroupBox(title="Probe Cache", parent=widget)
+        self.probe_cache_lo = QtWidgets.QFormLayout()
+        self.probe_cache_group.setLayout(self.probe_cache_lo)
+        widget.layout().addWidget(self.probe_cache_group)
+
+        self.probe_cache_max_size_spinbox = QtWidgets.QSpinBox(parent=widget)
+        self.probe_cache_max_size_spinbox.setSuffix(" MB")
+        self.probe_cache_max_size_spinbox.setRange(
+            config.schema["probe_cache_max_size"]["min"],
+            config.schema["probe_cache_max_size"]["max"],
+        )
+        self.probe_cache_max_size_spinbox.setValue(config.state.probe_cache_max_size)
+        self.probe_cache_lo.addRow("Maximum size", self.probe_cache_max_size_spinbox)
+
+        self.probe_cache_stats_lbl = CacheStatsLabel(
+            cache=self.probe_cache, parent=widget
+        )
+        self.probe_cache_lo.addRow(self.probe_cache_stats_lbl)
+
+        self.probe_cache_purge_bttn = QtWidgets.QPushButton("Purge", parent=widget)
+        self.probe_cache_purge_bttn.clicked.connect(self.purge_probe_cache)
+        self.probe_cache_lo.addRow(self.probe_cache_purge_bttn)
+
+        # Playlist Thumbnails
+        self.thumbnails_group = QtWidgets.QGroupBox(
+            title="Playlist Thumbnails", parent=widget
+        )
+        self.thumbnails_lo = QtWidgets.QFormLayout()
+        self.thumbnails_group.setLayout(self.thumbnails_lo)
+        widget.layout().addWidget(self.thumbnails_group)
+
+        self.playlist_thumbnails_checkbox = QtWidgets.QCheckBox(
+            text="Show thumbnails in the playlist", parent=widget
+        )
+        self.playlist_thumbnails_checkbox.setChecked(config.state.playlist_thumbnails)
+        self.thumbnails_lo.addRow(self.playlist_thumbnails_checkbox)
+
+        self.thumbnail_cache_max_size_spinbox = QtWidgets.QSpinBox(parent=widget)
+        self.thumbnail_cache_max_size_spinbox.setSuffix(" MB")
+        self.thumbnail_cache_max_size_spinbox.setRange(
+            config.schema["thumbnail_cache_max_size"]["min"],
+            config.schema["thumbnail_cache_max_size"]["max"],
+        )
+        self.thumbnail_cache_max_size_spinbox.setValue(
+            config.state.thumbnail_cache_max_size
+        )
+        self.thumbnails_lo.addRow(
+            "Maximum cache size", self.thumbnail_cache_max_size_spinbox
+        )
+
+        self.thumbnail_cache_stats_lbl = CacheStatsLabel(
+            cache=self.thumbnail_cache, parent=widget
+        )
+        self.thumbnails_lo.addRow(self.thumbnail_cache_stats_lbl)
+
+        self.thumbnail_cache_purge_bttn = QtWidgets.QPushButton("Purge", parent=widget)
+        self.thumbnail_cache_purge_bttn.clicked.connect(self.purge_thumbnail_cache)
+        self.thumbnails_lo.addRow(self.thumbnail_cache_purge_bttn)
+
         # About
         self.about_group = QtWidgets.QGroupBox(title="About", parent=widget)
         self.about_lo = QtWidgets.QVBoxLayout()
@@ -43,22 +149,49 @@ class PlayerPreferencesWindow(base.modal.BaseModalSettingsDialog):
 
         return widget
 
+    def purge_probe_cache(self):
+        self.probe_cache.purge()
+        self.probe_cache_stats_lbl.update_stats()
+
+    def purge_thumbnail_cache(self):
+        self.thumbnail_cache.purge()
+        self.thumbnail_cache_stats_lbl.update_stats()
+
     def save(self):
         config.state.hw_accel = True if self.hw_accel_checkbox.isChecked() else False
+        config.state.video_output = (
+            "callbacks" if self.software_output_checkbox.isChecked() else "window"
+        )
+        config.state.scan_recursive = self.scan_recursive_checkbox.isChecked()
+        config.state.watch_directories = self.watch_directories_checkbox.isChecked()
+        config.state.probe_cache_max_size = self.probe_cache_max_size_spinbox.value()
+        self.probe_cache.set_max_size(config.state.probe_cache_max_size * 1024**2)
+        config.state.playlist_thumbnails = self.playlist_thumbnails_checkbox.isChecked()
+        config.state.thumbnail_cache_max_size = (
+            self.thumbnail_cache_max_size_spinbox.value()
+        )
+        self.thumbnail_cache.set_max_size(
+            config.state.thumbnail_cache_max_size * 1024**2
+        )
 
 
 class OpenMediaPlayerPreferencesWindowAction(
     base.modal.BaseOpenModalSettingsDialogAction
 ):
-    def __init__(self, main_win, media_player):
+    def __init__(self, main_win, media_player, probe_cache, thumbnail_cache):
         super().__init__(
             text="Media Player Preferences",
             main_win=main_win,
             icon=gui.icons.get("open_media_player_preferences"),
         )
         self.media_player = media_player
+        self.probe_cache = probe_cache
+        self.thumbnail_cache = thumbnail_cache
 
     def create(self):
         return PlayerPreferencesWindow(
-            main_win=self.main_win, media_player=self.media_player
+            main_win=self.main_win,
+            media_player=self.media_player,
+            probe_cache=self.probe_cache,
+            thumbnail_cache=self.thumbnail_cache,
         )
@@ -10,7 +10,7 @@ def fraction_string_to_float(string):
     splitted = string.split("/")
     length = len(splitted)
     if length == 1:
-        return float(splitted)
+        return float(splitted[0])
     elif length == 2:
         numerator, denominator = (int(n) for n in splitted)
         return float(fractions.Fraction(numerator, denominator))
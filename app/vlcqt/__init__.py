@@ -3,7 +3,7 @@ import sys
 
 import vlc
 
-from . import _facades
+from . import _facades, _render
 
 log = logging.getLogger(__name__)
 
@@ -18,3 +18,4 @@ for key, val in vlc.__dict__.items():
 
 MediaPlayer = _facades.QtVLCMediaPlayer
 Media = _facades.QtVLCMedia
+FrameBuffer = _render.FrameBuffer
@@ -3,21 +3,49 @@ import sys
 
 import vlc
 
-from . import _signals
+from app import instrument
+
+from . import _render, _signals
 
 log = logging.getLogger(__name__)
 
 
+def bind_vlc_methods(facade, vlc_obj):
+    """Bind the public methods of 'vlc_obj' onto the 'facade' instance, so calls take
+    the normal attribute lookup path instead of failing over to '__getattr__'. Names
+    the facade already defines, on its class or instance, are left alone. With
+    timings enabled, each method records its call durations.
+    """
+    facade_cls = type(facade)
+    for name in dir(type(vlc_obj)):
+        if name.startswith("_") or hasattr(facade_cls, name) or name in vars(facade):
+            continue
+        attribute = getattr(vlc_obj, name)
+        if callable(attribute):
+            if instrument.is_enabled():
+                attribute = instrument.timed(f"libvlc.{name}")(attribute)
+            setattr(facade, name, attribute)
+
+
 class QtVLCMediaPlayer(_signals.MediaPlayerSignals):
     _vlc_obj = None
+    _output_win_id = None
 
     def __init__(self):
         self._vlc_obj = vlc.MediaPlayer()
         super().__init__(vlc_media_player=self._vlc_obj)
+        bind_vlc_methods(self, self._vlc_obj)
 
     def __getattr__(self, attribute):
         return getattr(self._vlc_obj, attribute)
 
+    def set_rate(self, rate: float) -> int:
+        """Set the playback rate, and emit 'ratechanged' if libvlc accepted it."""
+        result = self._vlc_obj.set_rate(rate)
+        if result == 0:
+            self.ratechanged.emit(rate)
+        return result
+
     def _set_output_to_widget(self, widget):
         if sys.platform.startswith("linux"):  # for Linux X Server
             self.set_xwindow(widget.winId())
@@ -28,7 +56,22 @@ class QtVLCMediaPlayer(_signals.MediaPlayerSignals):
         else:
             raise EnvironmentError("Could not determine platform")
 
+    def set_output_frame_buffer(self, frame_buffer: _render.FrameBuffer):
+        """Decode video frames into 'frame_buffer' instead of a native window."""
+        self._output_win_id = None
+        self.video_set_format_callbacks(frame_buffer.format_cb, frame_buffer.cleanup_cb)
+        self.video_set_callbacks(
+            frame_buffer.lock_cb, frame_buffer.unlock_cb, frame_buffer.display_cb, None
+        )
+
     def set_output_widget(self, widget):
+        """Render into the native window of 'widget'. If it is the window already
+        rendered into, nothing is done and playback is not interrupted.
+        """
+        win_id = int(widget.winId())
+        if win_id == self._output_win_id:
+            return
+        self._output_win_id = win_id
         state = self.get_state()
         time = self.get_time()
         if state in [vlc.State.Buffering, vlc.State.Playing]:
@@ -63,9 +106,7 @@ class QtVLCMedia(_signals.MediaVlclibSignals):
     def __init__(self, mrl, *options):
         self._vlc_obj = vlc.Media(mrl, *options)
         super().__init__(vlc_media=self._vlc_obj)
+        bind_vlc_methods(self, self._vlc_obj)
 
     def __getattr__(self, attribute):
-        try:
-            return getattr(self._vlc_obj, attribute)
-        except Exception as e:
-            raise e
+        return getattr(self._vlc_obj, attribute)
@@ -0,0 +1,133 @@
+import ctypes
+import itertools
+import logging
+import threading
+from collections import deque
+
+import vlc
+from PyQt5 import sip
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtGui import QImage
+
+log = logging.getLogger(__name__)
+
+# Same as vlc.CallbackDecorators.VideoFormatCb, except that 'chroma' is a pointer, so
+# the requested chroma can be written into it
+_VideoFormatCb = ctypes.CFUNCTYPE(
+    ctypes.c_uint,
+    ctypes.POINTER(ctypes.c_void_p),
+    ctypes.c_void_p,
+    ctypes.POINTER(ctypes.c_uint),
+    ctypes.POINTER(ctypes.c_uint),
+    ctypes.POINTER(ctypes.c_uint),
+    ctypes.POINTER(ctypes.c_uint),
+)
+
+
+class FrameBuffer(QObject):
+    """Video frames decoded by libvlc into memory through its video callbacks.
+
+    RV32 buffers are allocated when libvlc sets the video format, and reused for
+    every frame until the format changes. libvlc may lock a picture before the
+    previous one is displayed, so each locked picture gets a free buffer and its own
+    picture id, and displaying it makes that buffer the front one. Pictures
+    locked before a displayed one but never displayed were dropped, and their buffers
+    are freed. Each buffer is wrapped by a QImage that shares its memory, so frames
+    are painted without a copy. Hold 'lock' while using 'image()', so the front
+    buffer is not swapped out meanwhile.
+    """
+
+    frameready = pyqtSignal()
+    chroma = b"RV32"
+    bytes_per_pixel = 4
+    buffer_count = 3  # The front buffer and two pictures being decoded
+
+    def __init__(self, parent=None):
+        super().__init__(parent=parent)
+        self.lock = threading.Lock()
+        self.width = self.height = self.pitch = 0
+        self.frame_count = 0
+        self._buffers: list = []
+        self._images: list = []
+        self._front = 0
+        self._free: list = []  # Indexes of buffers libvlc can write into
+        self._locked: deque = deque()  # (picture id, index) pairs, oldest first
+        self._picture_ids = itertools.count(1)  # Zero would be passed back as NULL
+
+        # References to the ctypes callbacks must be kept while libvlc may call them
+        self._format_cb = _VideoFormatCb(self._on_format)
+        self.format_cb = ctypes.cast(
+            self._format_cb, vlc.CallbackDecorators.VideoFormatCb
+        )
+        self.cleanup_cb = vlc.CallbackDecorators.VideoCleanupCb(self._on_cleanup)
+        self.lock_cb = vlc.CallbackDecorators.VideoLockCb(self._on_lock)
+        self.unlock_cb = vlc.CallbackDecorators.VideoUnlockCb(self._on_unlock)
+        self.display_cb = vlc.CallbackDecorators.VideoDisplayCb(self._on_display)
+
+    def image(self) -> QImage:
+        """The latest displayed frame, or a null image if there is none yet."""
+        if not self._images or not self.frame_count:
+            return QImage()
+        return self._images[self._front]
+
+    def _allocate(self, width, height):
+        self.width, self.height = width, height
+        self.pitch = width * self.bytes_per_pixel
+        size = self.pitch * height
+        self._buffers = [(ctypes.c_ubyte * size)() for _ in range(self.buffer_count)]
+        self._images = [
+            QImage(
+                sip.voidptr(ctypes.addressof(buffer)),
+                width,
+                height,
+                self.pitch,
+                QImage.Format_RGB32,
+            )
+            for buffer in self._buffers
+        ]
+        self._front = 0
+        self._free = list(range(1, self.buffer_count))
+        self._locked.clear()
+        self.frame_count = 0
+        log.debug(f"FRAME BUFFER ALLOCATED width={width} height={height}")
+
+    def _on_format(self, opaque, chroma, width, height, pitches, lines):
+        """Called by libvlc when the video format is set."""
+        ctypes.memmove(chroma, self.chroma, len(self.chroma))
+        with self.lock:
+            if (width[0], height[0]) != (self.width, self.height):
+                self._allocate(width[0], height[0])
+        pitches[0] = self.pitch
+        lines[0] = self.height
+        return 1  # Number of picture planes
+
+    def _on_cleanup(self, opaque):
+        """Buffers are kept, to be reused if the next video has the same size."""
+
+    def _on_lock(self, opaque, planes):
+        with self.lock:
+            if self._free:
+                index = self._free.pop()
+            else:
+                _, index = self._locked.popleft()  # Reuse the oldest, it is late anyway
+            picture = next(self._picture_ids)
+            self._locked.append((picture, index))
+        planes[0] = ctypes.addressof(self._buffers[index])
+        return picture
+
+    def _on_unlock(self, opaque, picture, planes):
+        pass
+
+    def _on_display(self, opaque, picture):
+        with self.lock:
+            if not any(locked == picture for locked, _ in self._locked):
+                return  # Its buffer was reused, a newer picture will be displayed
+            while True:
+                locked, index = self._locked.popleft()
+                if locked == picture:
+                    break
+                self._free.append(index)  # Locked earlier but dropped
+            self._free.append(self._front)
+            self._front = index
+            self.frame_count += 1
+        self.frameready.emit()
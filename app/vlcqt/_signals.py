@@ -1,12 +1,151 @@
 import logging
+from operator import attrgetter
 
 import vlc
-from PyQt5.QtCore import QObject, Qt, QTimer, pyqtSignal, pyqtSlot
+from PyQt5.QtCore import QMetaMethod, QObject, Qt, QTimer, pyqtSignal
 
 log = logging.getLogger(__name__)
 
 
-class MediaPlayerVlclibSignals(QObject):
+class _CoalescingBridge(QObject):
+    """Carries the latest values of high frequency libvlc events to the GUI thread.
+
+    The libvlc event thread only overwrites the latest value and, if no notification
+    is pending already, queues one. The GUI thread then emits each changed value at
+    most once per 'interval', so bursts of events cost one queued call per frame.
+    """
+
+    interval = 16  # ms, about one UI frame
+    _pending = pyqtSignal()
+
+    def __init__(self, names, emit, parent=None):
+        super().__init__(parent=parent)
+        self._emit = emit
+        self._latest = dict.fromkeys(names)
+        self._emitted = dict.fromkeys(names)
+        self._is_pending = False
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.interval)
+        self.timer.timeout.connect(self._on_timeout)
+        self._pending.connect(self._on_pending)
+
+    def store(self, name, value):
+        """Called from the libvlc event thread."""
+        self._latest[name] = value
+        if not self._is_pending:
+            self._is_pending = True
+            self._pending.emit()
+
+    def _on_pending(self):
+        if not self.timer.isActive():
+            self._flush()
+
+    def _on_timeout(self):
+        if self._is_pending:
+            self._flush()
+
+    def _flush(self):
+        self._is_pending = False  # Cleared first, so no later value can be missed
+        for name, value in list(self._latest.items()):
+            if value is not None and value != self._emitted[name]:
+                self._emitted[name] = value
+                self._emit(name, value)
+        self.timer.start()
+
+
+class _EventSignals(QObject):
+    """Base for Qt signals that re-emit libvlc events.
+
+    'event_signal_names' maps libvlc event types to signal names, and
+    'coalesced_signal_names' maps event types to a signal carrying only the latest
+    value read from the event. An event is only attached to libvlc while one of its
+    signals has receivers, so events nobody listens to never cross into the Qt event
+    loop. Every attached event is handled by the same callback, which looks up its
+    signals in dispatch tables built once per instance.
+    """
+
+    event_signal_names: dict = {}
+    coalesced_signal_names: dict = {}
+
+    def __init__(self, event_manager):
+        super().__init__()
+        self._event_manager = event_manager  # Keep one wrapper, it holds the callbacks
+        self._signal_event_types = {}
+        self._event_signals = {}
+        for e_type, name in self.event_signal_names.items():
+            self._add_signal_event_type(name, e_type)
+        for e_type, (name, _) in self.coalesced_signal_names.items():
+            self._add_signal_event_type(name, e_type)
+
+        self._dispatch_table = {
+            e_type.value: (name, getattr(self, name))
+            for e_type, name in self.event_signal_names.items()
+        }
+        self._coalesce_table = {
+            e_type.value: (name, read_value)
+            for e_type, (name, read_value) in self.coalesced_signal_names.items()
+        }
+        self._bridge = _CoalescingBridge(
+            names=[name for name, _ in self._coalesce_table.values()],
+            emit=self._emit_latest,
+            parent=self,
+        )
+        self._listened = set()  # Names of signals with receivers
+        self._attached = set()  # Values of event types attached in libvlc
+        self.emission_counts = dict.fromkeys(self._signal_event_types, 0)
+
+    def _add_signal_event_type(self, name, e_type):
+        self._signal_event_types[name] = e_type
+        self._event_signals.setdefault(e_type.value, []).append(name)
+
+    def _dispatch(self, e):
+        """Called from the libvlc event thread."""
+        key = e.type.value
+        name, signal = self._dispatch_table[key]
+        if name in self._listened:
+            self.emission_counts[name] += 1
+            signal.emit(e)
+        if key in self._coalesce_table:
+            name, read_value = self._coalesce_table[key]
+            if name in self._listened:
+                self._bridge.store(name, read_value(e))
+
+    def _emit_latest(self, name, value):
+        self.emission_counts[name] += 1
+        getattr(self, name).emit(value)
+
+    def _update_attachment(self, name: str):
+        e_type = self._signal_event_types.get(name)
+        if e_type is None:
+            return
+        if self.receivers(getattr(self, name)) > 0:
+            self._listened.add(name)
+        else:
+            self._listened.discard(name)
+
+        is_needed = any(n in self._listened for n in self._event_signals[e_type.value])
+        if is_needed and e_type.value not in self._attached:
+            self._event_manager.event_attach(e_type, self._dispatch)
+            self._attached.add(e_type.value)
+            log.debug(f"VLCQT ATTACH event='{e_type}'")
+        elif not is_needed and e_type.value in self._attached:
+            self._event_manager.event_detach(e_type)
+            self._attached.discard(e_type.value)
+            log.debug(f"VLCQT DETACH event='{e_type}'")
+
+    def connectNotify(self, signal: QMetaMethod):
+        super().connectNotify(signal)
+        self._update_attachment(bytes(signal.name()).decode())
+
+    def disconnectNotify(self, signal: QMetaMethod):
+        super().disconnectNotify(signal)
+        if signal.isValid():
+            self._update_attachment(bytes(signal.name()).decode())
+
+
+class MediaPlayerVlclibSignals(_EventSignals):
 
     # audiodevice = pyqtSignal(vlc.Event)
     audiovolume = pyqtSignal(vlc.Event)
@@ -28,7 +167,6 @@ class MediaPlayerVlclibSignals(QObject):
     pausablechanged = pyqtSignal(vlc.Event)
     paused = pyqtSignal(vlc.Event)
     playing = pyqtSignal(vlc.Event)
-    stopped = pyqtSignal(vlc.Event)
     positionchanged = pyqtSignal(vlc.Event)
     # scrambledchanged = pyqtSignal(vlc.Event)
     # seekablechanged = pyqtSignal(vlc.Event)
@@ -40,198 +178,58 @@ class MediaPlayerVlclibSignals(QObject):
     unmuted = pyqtSignal(vlc.Event)
     vout = pyqtSignal(vlc.Event)
 
-    def __init__(self, vlc_media_player):
-        super().__init__()
+    # Latest values of high frequency events, emitted at most once per UI frame
+    positionupdated = pyqtSignal(float)
+    timeupdated = pyqtSignal(int)
+
+    event_signal_names = {
+        # vlc.EventType.MediaPlayerAudioDevice: "audiodevice",
+        vlc.EventType.MediaPlayerAudioVolume: "audiovolume",
+        # vlc.EventType.MediaPlayerBackward: "backward",
+        vlc.EventType.MediaPlayerBuffering: "buffering",
+        # vlc.EventType.MediaPlayerChapterChanged: "chapterchanged",
+        # vlc.EventType.MediaPlayerCorked: "corked",
+        # vlc.EventType.MediaPlayerESAdded: "esadded",
+        # vlc.EventType.MediaPlayerESDeleted: "esdeleted",
+        # vlc.EventType.MediaPlayerESSelected: "esselected",
+        vlc.EventType.MediaPlayerEncounteredError: "encounterederror",
+        vlc.EventType.MediaPlayerEndReached: "endreached",
+        vlc.EventType.MediaPlayerForward: "forward",
+        # vlc.EventType.MediaPlayerLengthChanged: "lengthchanged",
+        # vlc.EventType.MediaPlayerMediaChanged: "mediachanged",
+        vlc.EventType.MediaPlayerMuted: "muted",
+        vlc.EventType.MediaPlayerNothingSpecial: "nothingspecial",
+        vlc.EventType.MediaPlayerOpening: "opening",
+        vlc.EventType.MediaPlayerPausableChanged: "pausablechanged",
+        vlc.EventType.MediaPlayerPaused: "paused",
+        vlc.EventType.MediaPlayerPlaying: "playing",
+        vlc.EventType.MediaPlayerPositionChanged: "positionchanged",
+        # vlc.EventType.MediaPlayerScrambledChanged: "scrambledchanged",
+        # vlc.EventType.MediaPlayerSeekableChanged: "seekablechanged",
+        # vlc.EventType.MediaPlayerSnapshotTaken: "snapshottaken",
+        vlc.EventType.MediaPlayerStopped: "stopped",
+        vlc.EventType.MediaPlayerTimeChanged: "timechanged",
+        vlc.EventType.MediaPlayerTitleChanged: "titlechanged",
+        vlc.EventType.MediaPlayerUncorked: "uncorked",
+        vlc.EventType.MediaPlayerUnmuted: "unmuted",
+        vlc.EventType.MediaPlayerVout: "vout",
+    }
+
+    coalesced_signal_names = {
+        vlc.EventType.MediaPlayerPositionChanged: (
+            "positionupdated",
+            attrgetter("u.new_position"),
+        ),
+        vlc.EventType.MediaPlayerTimeChanged: ("timeupdated", attrgetter("u.new_time")),
+    }
 
-        type_slot_pairs = [
-            # (vlc.EventType.MediaPlayerAudioDevice, self._audiodevice),
-            (vlc.EventType.MediaPlayerAudioVolume, self._audiovolume),
-            # (vlc.EventType.MediaPlayerBackward, self._backward),
-            (vlc.EventType.MediaPlayerBuffering, self._buffering),
-            # (vlc.EventType.MediaPlayerChapterChanged, self._chapterchanged),
-            # (vlc.EventType.MediaPlayerCorked, self._corked),
-            # (vlc.EventType.MediaPlayerESAdded, self._esadded),
-            # (vlc.EventType.MediaPlayerESDeleted, self._esdeleted),
-            # (vlc.EventType.MediaPlayerESSelected, self._esselected),
-            (vlc.EventType.MediaPlayerEncounteredError, self._encounterederror),
-            (vlc.EventType.MediaPlayerEndReached, self._endreached),
-            (vlc.EventType.MediaPlayerForward, self._forward),
-            # (vlc.EventType.MediaPlayerLengthChanged, self._lengthchanged),
-            # (vlc.EventType.MediaPlayerMediaChanged, self._mediachanged),
-            (vlc.EventType.MediaPlayerMuted, self._muted),
-            (vlc.EventType.MediaPlayerNothingSpecial, self._nothingspecial),
-            (vlc.EventType.MediaPlayerOpening, self._opening),
-            (vlc.EventType.MediaPlayerPausableChanged, self._pausablechanged),
-            (vlc.EventType.MediaPlayerPaused, self._paused),
-            (vlc.EventType.MediaPlayerPlaying, self._playing),
-            (vlc.EventType.MediaPlayerPositionChanged, self._positionchanged),
-            # (vlc.EventType.MediaPlayerScrambledChanged, self._scrambledchanged),
-            # (vlc.EventType.MediaPlayerSeekableChanged, self._seekablechanged),
-            # (vlc.EventType.MediaPlayerSnapshotTaken, self._snapshottaken),
-            (vlc.EventType.MediaPlayerStopped, self._stopped),
-            (vlc.EventType.MediaPlayerTimeChanged, self._timechanged),
-            (vlc.EventType.MediaPlayerTitleChanged, self._titlechanged),
-            (vlc.EventType.MediaPlayerUncorked, self._uncorked),
-            (vlc.EventType.MediaPlayerUnmuted, self._unmuted),
-            (vlc.EventType.MediaPlayerVout, self._vout),
-        ]
-        event_manager = vlc_media_player.event_manager()
-        for e_type, cb_slot in type_slot_pairs:
-            event_manager.event_attach(e_type, cb_slot)
-
-    @pyqtSlot(vlc.Event)
-    def _audiodevice(self, e):
-        self.audiodevice.emit(e)
-        # log.debug("VLCQT SIGNAL name='audiodevice'")
-
-    @pyqtSlot(vlc.Event)
-    def _audiovolume(self, e):
-        self.audiovolume.emit(e)
-        # log.debug("VLCQT SIGNAL name='audiovolume'")
-
-    @pyqtSlot(vlc.Event)
-    def _backward(self, e):
-        self.backward.emit(e)
-        # log.debug("VLCQT SIGNAL name='backward'")
-
-    @pyqtSlot(vlc.Event)
-    def _buffering(self, e):
-        self.buffering.emit(e)
-        # log.debug("VLCQT SIGNAL name='buffering'")
-
-    @pyqtSlot(vlc.Event)
-    def _chapterchanged(self, e):
-        self.chapterchanged.emit(e)
-        # log.debug("VLCQT SIGNAL name='chapterchanged'")
-
-    @pyqtSlot(vlc.Event)
-    def _corked(self, e):
-        self.corked.emit(e)
-        # log.debug("VLCQT SIGNAL name='corked'")
-
-    @pyqtSlot(vlc.Event)
-    def _esadded(self, e):
-        self.esadded.emit(e)
-        # log.debug("VLCQT SIGNAL name='esadded'")
-
-    @pyqtSlot(vlc.Event)
-    def _esdeleted(self, e):
-        self.esdeleted.emit(e)
-        # log.debug("VLCQT SIGNAL name='esdeleted'")
-
-    @pyqtSlot(vlc.Event)
-    def _esselected(self, e):
-        self.esselected.emit(e)
-        # log.debug("VLCQT SIGNAL name='esselected'")
-
-    @pyqtSlot(vlc.Event)
-    def _encounterederror(self, e):
-        self.encounterederror.emit(e)
-        # log.debug("VLCQT SIGNAL name='encounterederror'")
-
-    @pyqtSlot(vlc.Event)
-    def _endreached(self, e):
-        self.endreached.emit(e)
-        # log.debug("VLCQT SIGNAL name='endreached'")
-
-    @pyqtSlot(vlc.Event)
-    def _forward(self, e):
-        self.forward.emit(e)
-        # log.debug("VLCQT SIGNAL name='forward'")
-
-    @pyqtSlot(vlc.Event)
-    def _lengthchanged(self, e):
-        self.lengthchanged.emit(e)
-        # log.debug("VLCQT SIGNAL name='lengthchanged'")
-
-    @pyqtSlot(vlc.Event)
-    def _mediachanged(self, e):
-        self.mediachanged.emit(e)
-        # log.debug("VLCQT SIGNAL name='mediachanged'")
-
-    @pyqtSlot(vlc.Event)
-    def _muted(self, e):
-        self.muted.emit(e)
-        # log.debug("VLCQT SIGNAL name='muted'")
-
-    @pyqtSlot(vlc.Event)
-    def _nothingspecial(self, e):
-        self.nothingspecial.emit(e)
-        # log.debug("VLCQT SIGNAL name='nothingspecial'")
-
-    @pyqtSlot(vlc.Event)
-    def _opening(self, e):
-        self.opening.emit(e)
-        # log.debug("VLCQT SIGNAL name='opening'")
-
-    @pyqtSlot(vlc.Event)
-    def _pausablechanged(self, e):
-        self.pausablechanged.emit(e)
-        # log.debug("VLCQT SIGNAL name='pausablechanged'")
-
-    @pyqtSlot(vlc.Event)
-    def _paused(self, e):
-        self.paused.emit(e)
-        # log.debug("VLCQT SIGNAL name='paused'")
-
-    @pyqtSlot(vlc.Event)
-    def _playing(self, e):
-        self.playing.emit(e)
-        # log.debug("VLCQT SIGNAL name='playing'")
-
-    @pyqtSlot(vlc.Event)
-    def _positionchanged(self, e):
-        self.positionchanged.emit(e)
-        # log.debug("VLCQT SIGNAL name='positionchanged'")
-
-    @pyqtSlot(vlc.Event)
-    def _scrambledchanged(self, e):
-        self.scrambledchanged.emit(e)
-        # log.debug("VLCQT SIGNAL name='scrambledchanged'")
-
-    @pyqtSlot(vlc.Event)
-    def _seekablechanged(self, e):
-        self.seekablechanged.emit(e)
-        # log.debug("VLCQT SIGNAL name='seekablechanged'")
-
-    @pyqtSlot(vlc.Event)
-    def _snapshottaken(self, e):
-        self.snapshottaken.emit(e)
-        # log.debug("VLCQT SIGNAL name='snapshottaken'")
-
-    @pyqtSlot(vlc.Event)
-    def _stopped(self, e):
-        self.stopped.emit(e)
-        # log.debug("VLCQT SIGNAL name='stopped'")
-
-    @pyqtSlot(vlc.Event)
-    def _timechanged(self, e):
-        self.timechanged.emit(e)
-        # log.debug("VLCQT SIGNAL name='timechanged'")
-
-    @pyqtSlot(vlc.Event)
-    def _titlechanged(self, e):
-        self.titlechanged.emit(e)
-        # log.debug("VLCQT SIGNAL name='titlechanged'")
-
-    @pyqtSlot(vlc.Event)
-    def _uncorked(self, e):
-        self.uncorked.emit(e)
-        # log.debug("VLCQT SIGNAL name='uncorked'")
-
-    @pyqtSlot(vlc.Event)
-    def _unmuted(self, e):
-        self.unmuted.emit(e)
-        # log.debug("VLCQT SIGNAL name='unmuted'")
-
-    @pyqtSlot(vlc.Event)
-    def _vout(self, e):
-        self.vout.emit(e)
-        # log.debug("VLCQT SIGNAL name='vout'")
+    def __init__(self, vlc_media_player):
+        super().__init__(event_manager=vlc_media_player.event_manager())
 
 
 class MediaPlayerCustomSignals(MediaPlayerVlclibSignals):
     newframe = pyqtSignal()
+    ratechanged = pyqtSignal(float)  # libvlc has no event for it
     slider_precision = 100
 
     def __init__(self, vlc_media_player):
@@ -275,7 +273,7 @@ class MediaPlayerCustomSignals(MediaPlayerVlclibSignals):
 MediaPlayerSignals = MediaPlayerCustomSignals
 
 
-class MediaVlclibSignals(QObject):
+class MediaVlclibSignals(_EventSignals):
 
     mediadurationchanged = pyqtSignal(vlc.Event)
     mediafreed = pyqtSignal(vlc.Event)
@@ -283,59 +281,16 @@ class MediaVlclibSignals(QObject):
     mediasubitemadded = pyqtSignal(vlc.Event)
     mediasubitemtreeadded = pyqtSignal(vlc.Event)
 
-    def __init__(self, vlc_media):
-        super().__init__()
+    event_signal_names = {
+        vlc.EventType.MediaDurationChanged: "mediadurationchanged",
+        vlc.EventType.MediaFreed: "mediafreed",
+        vlc.EventType.MediaStateChanged: "mediastatechanged",
+        vlc.EventType.MediaSubItemAdded: "mediasubitemadded",
+        vlc.EventType.MediaSubItemTreeAdded: "mediasubitemtreeadded",
+    }
 
-        type_slot_pairs = [
-            (vlc.EventType.MediaDurationChanged, self.__MediaDurationChanged),
-            (vlc.EventType.MediaFreed, self.__MediaFreed),
-            (vlc.EventType.MediaStateChanged, self.__MediaStateChanged),
-            (vlc.EventType.MediaSubItemAdded, self.__MediaSubItemAdded),
-            (vlc.EventType.MediaSubItemTreeAdded, self.__MediaSubItemTreeAdded),
-        ]
-        event_manager = vlc_media.event_manager()
-        for e_type, cb_slot in type_slot_pairs:
-            event_manager.event_attach(e_type, cb_slot)
-
-    @pyqtSlot(vlc.Event)
-    def __MediaDurationChanged(self, e):
-        try:
-            self.mediadurationchanged.emit(e)
-        except AttributeError as e:
-            log.error(e)
-        # log.debug("VLCQT SIGNAL name='mediadurationchanged'")
-
-    @pyqtSlot(vlc.Event)
-    def __MediaFreed(self, e):
-        try:
-            self.mediafreed.emit(e)
-        except AttributeError as e:
-            log.error(e)
-        # log.debug("VLCQT SIGNAL name='mediafreed'")
-
-    @pyqtSlot(vlc.Event)
-    def __MediaStateChanged(self, e):
-        try:
-            self.mediastatechanged.emit(e)
-        except AttributeError as e:
-            log.error(e)
-        # log.debug("VLCQT SIGNAL name='mediastatechanged'")
-
-    @pyqtSlot(vlc.Event)
-    def __MediaSubItemAdded(self, e):
-        try:
-            self.mediasubitemadded.emit(e)
-        except AttributeError as e:
-            log.error(e)
-        # log.debug("VLCQT SIGNAL name='mediasubitemadded'")
-
-    @pyqtSlot(vlc.Event)
-    def __MediaSubItemTreeAdded(self, e):
-        try:
-            self.mediasubitemtreeadded.emit(e)
-        except AttributeError as e:
-            log.error(e)
-        # log.debug("VLCQT SIGNAL name='mediasubitemtreeadded'")
+    def __init__(self, vlc_media):
+        super().__init__(event_manager=vlc_media.event_manager())
 
 
 MediaSignals = MediaVlclibSignals
@@ -0,0 +1,42 @@
+"""Microbenchmark of method calls on the vlcqt media player facade.
+
+Compares hot calls through methods bound onto the facade instance with the same
+calls forwarded by '__getattr__'. Requires libvlc. Run from the repository root:
+
+    python scripts/bench_facades.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QCoreApplication  # noqa: E402
+
+from app import vlcqt  # noqa: E402
+
+NUMBER = 200_000
+REPEAT = 5
+NAMES = ("get_position", "is_playing", "get_time", "get_rate")
+
+
+def best_ns_per_call(stmt, namespace):
+    times = timeit.repeat(stmt, globals=namespace, number=NUMBER, repeat=REPEAT)
+    return min(times) / NUMBER * 1e9
+
+
+def main():
+    app = QCoreApplication(sys.argv)  # noqa: F841
+    mp = vlcqt.MediaPlayer()
+    print(f"{'call':<16}{'bound ns':>10}{'forwarded ns':>14}{'saving ns':>11}")
+    for name in NAMES:
+        bound_method = mp.__dict__[name]
+        bound = best_ns_per_call(f"mp.{name}()", {"mp": mp})
+        del mp.__dict__[name]  # Fall back to '__getattr__' forwarding
+        forwarded = best_ns_per_call(f"mp.{name}()", {"mp": mp})
+        mp.__dict__[name] = bound_method
+        print(f"{name:<16}{bound:>10.1f}{forwarded:>14.1f}{forwarded - bound:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
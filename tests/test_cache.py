@@ -0,0 +1,70 @@
+import json
+import os
+import zlib
+
+from app.playlist.cache import ProbeCache
+
+
+def make_file(tmp_path, name, data=b"media"):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def stored_size(probe):
+    return len(zlib.compress(json.dumps(probe, separators=(",", ":")).encode()))
+
+
+def test_probe_cache_keys(tmp_path):
+    cache = ProbeCache(str(tmp_path / "cache" / "probes.sqlite3"), max_size=10**6)
+    media = make_file(tmp_path, "a.mp4")
+    probe = {"format": {"duration": "1.5"}}
+
+    assert cache.get(media) is None
+    cache.put(media, probe)
+    assert cache.get(media) == probe
+
+    # A modified file is a miss, by mtime or by size
+    os.utime(media, ns=(0, 0))
+    assert cache.get(media) is None
+    cache.put(media, probe)
+    with open(media, "ab") as f:
+        f.write(b"more")
+    os.utime(media, ns=(0, 0))
+    assert cache.get(media) is None
+
+    assert cache.get(str(tmp_path / "missing.mp4")) is None
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 3)
+
+
+def test_probe_cache_persists_and_purges(tmp_path):
+    path = str(tmp_path / "probes.sqlite3")
+    media = make_file(tmp_path, "a.mp4")
+    cache = ProbeCache(path, max_size=10**6)
+    cache.put(media, {"streams": []})
+    cache.close()
+
+    cache = ProbeCache(path, max_size=10**6)
+    assert cache.get(media) == {"streams": []}
+    assert cache.stats()["size"] == stored_size({"streams": []})
+    cache.purge()
+    assert cache.get(media) is None
+    assert (cache.stats()["entries"], cache.stats()["size"]) == (0, 0)
+
+
+def test_probe_cache_evicts_least_recently_used(tmp_path):
+    media = [make_file(tmp_path, f"{name}.mp4") for name in "abcd"]
+    probes = [{"format": {"filename": os.urandom(64).hex()}} for _ in media]
+    total = sum(map(stored_size, probes))
+    cache = ProbeCache(str(tmp_path / "probes.sqlite3"), max_size=total - 1)
+
+    for path, probe in zip(media[:3], probes):
+        cache.put(path, probe)
+    assert cache.get(media[0]) == probes[0]  # Now used after 'b' and 'c'
+    cache.put(media[3], probes[3])
+
+    # Evicted down to 90% of the maximum size, least recently used first
+    assert cache.stats()["size"] <= (total - 1) * 0.9
+    assert cache.get(media[1]) is None
+    assert [cache.get(path) for path in media[::2]] == probes[::2]
+    assert cache.get(media[3]) == probes[3]
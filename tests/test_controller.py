@@ -0,0 +1,40 @@
+import struct
+from types import SimpleNamespace
+
+from PyQt5.QtCore import QByteArray
+
+from app.client.controller import IOController
+
+
+def make_controller():
+    socket = SimpleNamespace(
+        binaryMessageReceived=SimpleNamespace(connect=lambda slot: None)
+    )
+    return IOController(socket)
+
+
+def message(*values):
+    return QByteArray(struct.pack(f"{len(values)}d", *values))
+
+
+def test_motion_states_are_consumed_once():
+    ctrlr = make_controller()
+    assert ctrlr.get_new_motion_state() is None
+
+    ctrlr.received_bytes(message(1.0, 0.0, 0.0, 0.0))
+    assert ctrlr.has_new_motion_state()
+    assert ctrlr.get_new_motion_state() == (1.0, 0.0, 0.0, 0.0)
+    assert ctrlr.last_latency >= 0
+    assert not ctrlr.has_new_motion_state()
+    assert ctrlr.get_new_motion_state() is None
+    assert ctrlr.skipped_count == 0
+
+
+def test_unconsumed_and_malformed_states():
+    ctrlr = make_controller()
+    ctrlr.received_bytes(message(1.0, 2.0))
+    ctrlr.received_bytes(message(3.0, 4.0))  # Replaces a state never consumed
+    ctrlr.received_bytes(QByteArray(b"\x00" * 12))  # Not a whole number of doubles
+    ctrlr.received_bytes(QByteArray())
+    assert (ctrlr.sequence, ctrlr.skipped_count) == (2, 1)
+    assert ctrlr.get_new_motion_state() == (3.0, 4.0)
@@ -0,0 +1,38 @@
+import os
+
+from app.playlist.fingerprint import FingerprintIndex
+
+
+def test_claim_skips_same_file(tmp_path):
+    (tmp_path / "sub").mkdir()
+    path = tmp_path / "a.mp4"
+    path.write_bytes(b"a" * 100)
+    link = tmp_path / "link.mp4"
+    os.symlink(path, link)
+    other_spelling = str(tmp_path / "sub" / ".." / "a.mp4")
+
+    index = FingerprintIndex()
+    assert index.claim([str(path), str(link), other_spelling, str(path)]) == [str(path)]
+    assert index.duplicate_count == 3
+
+    index.release([str(path)])
+    assert index.claim([str(link)]) == [str(link)]
+
+
+def test_duplicates_by_content(tmp_path):
+    index = FingerprintIndex()
+    index.hash_chunk_size = 4
+    contents = {"a": b"0123456789", "b": b"0123456789", "c": b"0123xx6789", "d": b"0"}
+    paths = []
+    for name, content in contents.items():
+        path = tmp_path / name
+        path.write_bytes(content)
+        paths.append(str(path))
+    index.claim(paths)
+
+    # 'c' only differs in the middle, which is not hashed
+    assert index.duplicates(paths) == [paths[:3]]
+    (tmp_path / "c").write_bytes(b"0123xx678x")
+    index.release([paths[2]])
+    index.claim([paths[2]])
+    assert index.duplicates(paths) == [paths[:2]]
@@ -0,0 +1,33 @@
+from app import instrument
+from app.instrument import TimingHistogram
+
+
+def test_histogram_ring_buffer_percentiles():
+    hist = TimingHistogram("test", capacity=100)
+    for duration in range(1, 151):
+        hist.record(duration * 1_000_000)
+
+    # Only the latest 100 samples, 51 to 150 ms, are kept
+    summary = hist.summary()
+    assert summary["count"] == 150
+    assert summary["p50"] == 100
+    assert summary["p95"] == 145
+    assert summary["p99"] == 149
+    assert summary["max"] == 150
+    assert TimingHistogram("empty", capacity=10).summary() == {"count": 0}
+
+
+def test_timed_only_records_when_enabled(monkeypatch):
+    monkeypatch.setattr(instrument._State, "histograms", {})
+
+    @instrument.timed("test.double")
+    def double(value):
+        return value * 2
+
+    assert double(2) == 4
+    assert "test.double" not in instrument._State.histograms
+
+    monkeypatch.setattr(instrument._State, "enabled", True)
+    assert double(3) == 6
+    assert instrument.histogram("test.double").count == 1
+    assert "test.double" in instrument.report()
@@ -0,0 +1,55 @@
+from app.playlist.metadata import MediaMetadata
+
+PROBE = {
+    "streams": [
+        {"codec_type": "audio", "duration": "5.0"},
+        {
+            "codec_type": "video",
+            "width": 3840,
+            "height": 1920,
+            "nb_frames": "150",
+            "has_b_frames": 2,
+            "avg_frame_rate": "30/1",
+            "r_frame_rate": "30000/1001",
+            "duration": "5.000000",
+            "duration_ts": 450000,
+            "time_base": "1/90000",
+            "side_data_list": [{"side_data_type": "Spherical Mapping"}],
+        },
+    ],
+    "format": {"tags": {"TITLE": "Cockatoo", "artist": "Someone", "encoder": "x"}},
+}
+
+
+def test_metadata_from_probe():
+    metadata = MediaMetadata.from_probe(
+        PROBE, path="/media/cockatoo.mp4", tag_keys=("title", "artist")
+    )
+    assert metadata.title == "Cockatoo"
+    assert (metadata.width, metadata.height) == (3840, 1920)
+    assert metadata.nb_frames == 150
+    assert metadata.avg_frame_rate == 30.0
+    assert metadata.time_base == 1 / 90000
+    assert metadata.is_spherical
+    assert metadata.tags == {"title": "Cockatoo", "artist": "Someone"}
+
+
+def test_metadata_tag_keys_ignore_case():
+    metadata = MediaMetadata.from_probe(
+        PROBE, path="/media/cockatoo.mp4", tag_keys=("Title", "ARTIST", "Weight")
+    )
+    assert metadata.tags == {"Title": "Cockatoo", "ARTIST": "Someone"}
+
+
+def test_metadata_from_sparse_probe():
+    probe = {
+        "streams": [{"codec_type": "video", "avg_frame_rate": "0/0"}],
+        "format": {"duration": "2.5"},
+    }
+    metadata = MediaMetadata.from_probe(probe, path="/media/clip.mkv", tag_keys=())
+    assert metadata.title == "clip.mkv"
+    assert metadata.duration == 2.5
+    assert metadata.avg_frame_rate == 0.0
+    assert metadata.nb_frames == 0
+    assert not metadata.is_spherical
+    assert not hasattr(metadata, "__dict__")
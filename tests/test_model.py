@@ -0,0 +1,142 @@
+import pytest
+from PyQt5.QtCore import QPersistentModelIndex, QSettings, Qt
+
+from app.config import state
+from app.playlist.fingerprint import FingerprintIndex
+from app.playlist.metadata import MediaMetadata
+from app.playlist.model import MediaItem, PlaylistModel
+from app.playlist.view import PlaylistFileLoader
+
+
+@pytest.fixture
+def model(tmp_path):
+    state.load(QSettings(str(tmp_path / "settings.ini"), QSettings.IniFormat))
+    state.meta_tags = ["title", "duration"]
+    return PlaylistModel()
+
+
+def make_items(*titles):
+    return [MediaItem(f"/{t}.mp4", metadata=MediaMetadata(title=t)) for t in titles]
+
+
+def titles(model):
+    return [model.item(row).title() for row in range(model.item_count())]
+
+
+def test_move_row(model):
+    items = make_items("a", "b", "c", "d")
+    model.append_items(items)
+    model.sort(0)  # Builds sort keys, which move with their rows
+    signals = []
+    model.itemsInserted.connect(lambda items: signals.append("inserted"))
+    model.itemsRemoved.connect(lambda items: signals.append("removed"))
+    moves = []
+    model.rowsMoved.connect(lambda *args: moves.append((args[1], args[4])))
+
+    assert model.move_row(0, 2)
+    assert titles(model) == ["b", "c", "a", "d"]
+    assert model.data(model.index(2, 0)) == "a"
+    assert model.row_of(items[0]) == 2
+    assert model.move_row(3, 0)
+    assert titles(model) == ["d", "b", "c", "a"]
+    assert not model.move_row(1, 1)
+    assert not model.move_row(0, 4)
+    assert moves == [(0, 3), (3, 0)]  # Destinations before the move, as Qt counts
+    assert signals == []
+
+
+def test_sort_reads_durations_from_metadata(model):
+    items = [
+        MediaItem(f"/{title}.mp4", metadata=MediaMetadata(title, duration=duration))
+        for title, duration in (("b", 90.0), ("a", 0.0), ("c", 5.5), ("d", 600.0))
+    ]
+    model.append_items(items)
+    assert model.data(model.index(0, 1)) is None  # No duration tag to display
+
+    model.sort(1)
+    assert titles(model) == ["c", "b", "d", "a"]  # Unknown durations go last
+    model.sort(1, Qt.DescendingOrder)
+    assert titles(model) == ["d", "b", "c", "a"]
+    model.sort(0)
+    assert titles(model) == ["a", "b", "c", "d"]
+
+    # Keys follow probed metadata and new rows
+    model.update_item(items[1], MediaMetadata("a", duration=60.0))
+    model.append_items([MediaItem("/e.mp4", metadata=MediaMetadata("e", duration=1))])
+    model.sort(1)
+    assert titles(model) == ["e", "c", "a", "b", "d"]
+
+
+def test_insert_items_exposes_rows_in_fetch_batches(model):
+    model.fetch_batch_size = 2
+    counts = []
+    model.rowCountChanged.connect(counts.append)
+
+    assert model.append_items(make_items("a", "b", "c"))
+    assert (model.item_count(), model.rowCount()) == (3, 2)
+    assert model.canFetchMore()
+
+    # Appended past unfetched rows, left to fetchMore
+    assert model.append_items(make_items("d"))
+    assert model.rowCount() == 2
+    model.fetchMore()
+    assert model.rowCount() == 4
+    assert not model.canFetchMore()
+
+    # Inserted among fetched rows, exposed at once
+    assert model.insert_items(1, make_items("x", "y", "z"))
+    assert model.rowCount() == 7
+    assert titles(model) == ["a", "x", "y", "z", "b", "c", "d"]
+    assert not model.insert_items(0, [])
+    assert counts == [3, 4, 7]
+
+
+def test_remove_items_removes_scattered_rows_in_one_reset(model):
+    model.fetch_batch_size = 4
+    items = make_items(*"abcdefgh")
+    model.append_items(items)
+    assert model.rowCount() == 4
+    resets, removals, removed, counts = [], [], [], []
+    model.modelReset.connect(lambda: resets.append(True))
+    model.rowsRemoved.connect(lambda *args: removals.append(args))
+    model.itemsRemoved.connect(removed.append)
+    model.rowCountChanged.connect(counts.append)
+
+    # Fetched and unfetched rows, in any order
+    assert model.remove_items([items[6], items[1], items[3]]) == 3
+    assert titles(model) == ["a", "c", "e", "f", "h"]
+    assert model.rowCount() == 2  # Two of the fetched rows were removed
+    assert (len(resets), removals) == (1, [])
+    assert removed == [[items[1], items[3], items[6]]]
+    assert counts == [5]
+    assert model.row_of(items[7]) == 4
+
+    assert model.remove_items(make_items("x", "y")) == 0
+    assert len(resets) == 1
+
+
+def test_playlist_file_loader_skips_duplicate_entries(model, tmp_path):
+    playlist = tmp_path / "list.m3u"
+    playlist.write_text("/a.mp4\n/b.mp4\n/a.mp4\n/c.mp4\n/b.mp4\n")
+    fingerprints = FingerprintIndex()
+    loader = PlaylistFileLoader(
+        str(playlist), model=model, path_filter=fingerprints.claim
+    )
+    loader._load_chunk()
+    assert [model.item(row).path() for row in range(model.item_count())] == [
+        "/a.mp4",
+        "/b.mp4",
+        "/c.mp4",
+    ]
+
+
+def test_sort_keeps_persistent_indexes_past_fetched_rows(model):
+    model.fetch_batch_size = 3
+    model.append_items(make_items(*"abcdefghij"))
+    assert model.rowCount() == 3
+    current = QPersistentModelIndex(model.index(0, 0))
+
+    model.sort(0, Qt.DescendingOrder)
+    assert current.isValid()
+    assert (current.row(), current.data()) == (9, "a")
+    assert model.rowCount() == 10
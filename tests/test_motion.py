@@ -0,0 +1,28 @@
+import pytest
+
+from app.output.motion import MotionPredictor, euler_from_quat, quat_from_euler
+
+MS = 1_000_000
+
+
+def test_euler_quaternion_round_trip():
+    angles = euler_from_quat(quat_from_euler(120.0, -30.0, 10.0))
+    assert angles == pytest.approx((120.0, -30.0, 10.0))
+
+
+def test_predictor_interpolates_behind_newest_sample():
+    predictor = MotionPredictor(delay=10, horizon=0)
+    predictor.add_sample(0, 0.0, 0.0, 0.0)
+    predictor.add_sample(20 * MS, 20.0, 0.0, 0.0)
+    yaw, pitch, roll = predictor.predict(20 * MS)
+    assert yaw == pytest.approx(10.0)
+    assert (pitch, roll) == pytest.approx((0.0, 0.0))
+
+
+def test_predictor_extrapolates_up_to_horizon():
+    predictor = MotionPredictor(delay=0, horizon=10)
+    assert predictor.predict(0) is None
+    predictor.add_sample(0, 0.0, 0.0, 0.0)
+    predictor.add_sample(20 * MS, 20.0, 0.0, 0.0)
+    assert predictor.predict(25 * MS)[0] == pytest.approx(25.0)
+    assert predictor.predict(100 * MS)[0] == pytest.approx(30.0)
@@ -0,0 +1,38 @@
+import random
+from collections import Counter
+
+from app.playlist.order import ShuffleOrder, WeightedOrder
+
+
+def test_shuffle_order_plays_each_item_once_per_round():
+    order = ShuffleOrder(rng=random.Random(1))
+    order.reset(range(10))
+    first_round = [order.advance() for _ in range(10)]
+    assert sorted(first_round) == list(range(10))
+    second_round = [order.advance() for _ in range(10)]
+    assert sorted(second_round) == list(range(10))
+    assert second_round[0] != first_round[-1]
+
+
+def test_shuffle_order_follows_playlist_changes():
+    order = ShuffleOrder(rng=random.Random(2))
+    order.reset(range(5))
+    played = [order.advance() for _ in range(2)]
+    unplayed = sorted(set(range(5)) - set(played))
+    order.remove(unplayed[:1])
+    order.insert([10, 11])
+    order.remove(played[:1])
+    order.insert(played[:1])  # A moved item is not played again in the round
+    rest = [order.advance() for _ in range(4)]
+    assert sorted(rest) == unplayed[1:] + [10, 11]
+
+
+def test_weighted_order_follows_weights():
+    weights = {"a": 1.0, "b": 3.0, "c": 0.0}
+    order = WeightedOrder(weight_of=weights.get, rng=random.Random(3))
+    order.reset(weights)
+    order.max_repeat_draws = 0
+    counts = Counter(order.advance() for _ in range(4000))
+    assert counts["c"] == 0
+    assert 2.5 < counts["b"] / counts["a"] < 3.5
+    assert order.peek() is order.advance()
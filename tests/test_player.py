@@ -0,0 +1,182 @@
+from types import SimpleNamespace
+
+import pytest
+from PyQt5.QtCore import QObject, QSettings, pyqtSignal
+
+from app.config import state
+from app.playlist.metadata import MediaMetadata
+from app.playlist.model import MediaItem, PlaylistModel
+from app.playlist.player import MediaListPlayer
+
+
+class FakeMedia:
+    def __init__(self, path):
+        self.path = path
+        self.released = False
+
+    def parse_with_options(self, flags, timeout):
+        pass
+
+    def release(self):
+        self.released = True
+
+
+class FakeMediaPlayer(QObject):
+    """Stands in for the QtVLCMediaPlayer facade, recording what is played."""
+
+    endreached = pyqtSignal()
+    timeupdated = pyqtSignal(int)
+    playing = pyqtSignal()
+    stopped = pyqtSignal()
+    paused = pyqtSignal()
+    ratechanged = pyqtSignal(float)
+
+    def __init__(self):
+        super().__init__()
+        self.rate = 1.0
+        self.media = None
+        self.created_media = []
+        self.stop_count = 0
+
+    def get_instance(self):
+        return SimpleNamespace(media_new=self._media_new)
+
+    def _media_new(self, path):
+        media = FakeMedia(path)
+        self.created_media.append(media)
+        return media
+
+    def set_media(self, media):
+        self.media = media.path
+
+    def set_mrl(self, path):
+        self.media = path
+
+    def set_rate(self, rate):
+        self.rate = rate
+        self.ratechanged.emit(rate)
+
+    def get_rate(self):
+        return self.rate
+
+    def get_length(self):
+        return 0
+
+    def play(self):
+        pass
+
+    def stop(self):
+        self.stop_count += 1
+
+
+@pytest.fixture
+def model(tmp_path):
+    state.load(QSettings(str(tmp_path / "settings.ini"), QSettings.IniFormat))
+    state.meta_tags = ["title"]
+    state.loop_mode = "off"
+    return PlaylistModel()
+
+
+@pytest.fixture
+def player(qapp, model):
+    player = MediaListPlayer(
+        viewpoint_mngr=SimpleNamespace(set_enabled=lambda value: None),
+        loop_mode_mngr=SimpleNamespace(get_mode=lambda: state.loop_mode),
+        media_player=FakeMediaPlayer(),
+    )
+    yield player
+    player.scheduler.stop()
+
+
+def make_items(*titles, duration=60.0, fps=25.0):
+    return [
+        MediaItem(
+            f"/{t}.mp4",
+            metadata=MediaMetadata(t, duration=duration, avg_frame_rate=fps),
+        )
+        for t in titles
+    ]
+
+
+def load(player, model, items, row=0):
+    model.append_items(items)
+    player.load_media(model.index(row, 0))
+
+
+def test_rate_change_updates_frame_period(player, model):
+    load(player, model, make_items("a", fps=25.0))
+    assert player.scheduler.period_ns == 40_000_000
+    player.mp.set_rate(2.0)
+    assert player.scheduler.period_ns == 20_000_000
+
+
+def test_next_item_is_prefetched_within_lead_time(player, model):
+    load(player, model, make_items("a", "b", duration=60.0))
+    player.mp.timeupdated.emit(60_000 - player.prefetch_lead_time - 1000)
+    assert player.mp.created_media == []
+
+    player.mp.timeupdated.emit(60_000 - player.prefetch_lead_time + 1000)
+    player.mp.timeupdated.emit(59_000)
+    assert [media.path for media in player.mp.created_media] == ["/b.mp4"]
+
+    # The prefetched media is played, and the player keeps its own reference
+    player.mp.endreached.emit()
+    assert player.item().title() == "b"
+    assert player.mp.media == "/b.mp4"
+    assert player.mp.created_media[0].released
+    assert player._prefetched is None
+
+
+def test_stale_prefetch_is_released(player, model):
+    load(player, model, make_items("a", "b", "c", duration=60.0))
+    player.mp.timeupdated.emit(58_000)
+    prefetched = player.mp.created_media[0]
+    assert prefetched.path == "/b.mp4"
+
+    # Another item is chosen before the current one ends
+    player.load_media(model.index(2, 0))
+    assert prefetched.released
+    assert player.mp.media == "/c.mp4"
+    assert player._prefetched is None
+
+
+@pytest.mark.parametrize(
+    "loop_mode, current, removed, loaded",
+    [
+        ("off", "c", "cd", "e"),  # Skips removed items after the current one
+        ("off", "d", "de", None),  # Stops at the end
+        ("one", "d", "de", None),
+        ("all", "d", "de", "a"),  # Wraps around
+        ("all", "e", "ea", "b"),  # Wraps around past removed items
+        ("shuffle", "d", "de", "a"),
+        ("all", "c", "abcde", None),
+    ],
+)
+def test_unload_media_loads_next_kept_item(
+    player, model, loop_mode, current, removed, loaded
+):
+    items = make_items(*"abcde")
+    load(player, model, items, row="abcde".index(current))
+    state.loop_mode = loop_mode
+    stop_count = player.mp.stop_count
+
+    player.unload_media([item for item in items if item.title() in removed])
+    if loaded:
+        assert player.item().title() == loaded
+        assert player.mp.media == f"/{loaded}.mp4"
+    else:
+        assert player.item().title() == current
+        assert player.mp.stop_count == stop_count + 1
+
+
+def test_unload_media_keeps_current_item(player, model):
+    items = make_items(*"abcde")
+    load(player, model, items, row=2)
+    stop_count = player.mp.stop_count
+
+    removed = {items[0], items[3]}
+    player.unload_media(removed)
+    model.remove_items(removed)
+    assert player.item() is items[2]
+    assert player.mp.stop_count == stop_count
+    assert player.index().row() == 1
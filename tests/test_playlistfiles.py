@@ -0,0 +1,49 @@
+import os
+
+from app.playlist.playlistfiles import PlaylistEntry, read_playlist, write_playlist
+
+
+def test_read_m3u(tmp_path):
+    path = tmp_path / "list.m3u"
+    path.write_text(
+        "#EXTM3U\n"
+        '#EXTINF:5 tvg-id="a",First, with comma\n'
+        "a.mp4\n"
+        "\n"
+        "sub/b.mp4\n"
+        "#EXTINF:-1,Stream\n"
+        "http://example.com/c.mp4\n",
+        encoding="utf-8",
+    )
+    assert list(read_playlist(str(path))) == [
+        PlaylistEntry(str(tmp_path / "a.mp4"), "First, with comma", 5.0),
+        PlaylistEntry(str(tmp_path / "sub" / "b.mp4"), "", 0.0),
+        PlaylistEntry("http://example.com/c.mp4", "Stream", 0.0),
+    ]
+
+
+def test_read_pls(tmp_path):
+    path = tmp_path / "list.pls"
+    path.write_text(
+        "[playlist]\n"
+        "File1=a.mp4\nTitle1=A\nLength1=12\n"
+        "File2=/abs/b.mp4\nLength2=-1\n"
+        "NumberOfEntries=2\nVersion=2\n",
+        encoding="utf-8",
+    )
+    assert list(read_playlist(str(path))) == [
+        PlaylistEntry(str(tmp_path / "a.mp4"), "A", 12.0),
+        PlaylistEntry(os.path.normpath("/abs/b.mp4"), "", 0.0),
+    ]
+
+
+def test_write_round_trip(tmp_path):
+    entries = [
+        PlaylistEntry(str(tmp_path / "sub" / "a.mp4"), "A", 5.0),
+        PlaylistEntry(os.path.normpath("/elsewhere/b.mp4"), "B", 0.0),
+    ]
+    for name in ("list.m3u8", "list.pls"):
+        path = str(tmp_path / name)
+        assert write_playlist(path, iter(entries)) == 2
+        assert list(read_playlist(path)) == entries
+    assert "sub/a.mp4" in (tmp_path / "list.m3u8").read_text().replace(os.sep, "/")
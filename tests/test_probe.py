@@ -0,0 +1,59 @@
+from ffmpeg import Error as FFmpegError
+from PyQt5.QtCore import QSettings, QThreadPool
+
+from app.config import state
+from app.playlist import probe
+from app.playlist.cache import ProbeCache
+from app.playlist.metadata import MediaMetadata
+from app.playlist.probe import ProbeJob, probe_media
+
+VIDEO = {"streams": [{"codec_type": "video"}], "format": {}}
+
+
+def test_probe_media_caches_only_decode_failures(tmp_path, monkeypatch):
+    cache = ProbeCache(str(tmp_path / "probes.sqlite3"), max_size=10**6)
+    paths = {}
+    for name in ("video", "broken", "busy"):
+        paths[name] = tmp_path / f"{name}.mp4"
+        paths[name].write_bytes(b"media")
+
+    def ffprobe(path):
+        if path == str(paths["broken"]):
+            raise FFmpegError("ffprobe", b"", b"Invalid data found")
+        if path == str(paths["busy"]):
+            raise FileNotFoundError("ffprobe")
+        return VIDEO
+
+    monkeypatch.setattr(probe, "ffmpeg_probe", ffprobe)
+    assert probe_media(str(paths["video"]), cache=cache) == VIDEO
+    assert cache.get(str(paths["video"])) == VIDEO
+    assert probe_media(str(paths["broken"]), cache=cache) is None
+    assert cache.get(str(paths["broken"])) == {}
+    assert probe_media(str(paths["busy"]), cache=cache) is None
+    assert cache.get(str(paths["busy"])) is None
+
+
+def test_probe_job_emits_results_in_order(qtbot, monkeypatch, tmp_path):
+    state.load(QSettings(str(tmp_path / "settings.ini"), QSettings.IniFormat))
+
+    def probe_metadata(path, tag_keys, cache=None):
+        return None if "bad" in path else MediaMetadata(title=path)
+
+    monkeypatch.setattr(probe, "probe_metadata", probe_metadata)
+    batches = []
+    job = ProbeJob(
+        ["a", "bad", "b", "skipped"],
+        thread_pool=QThreadPool(),
+        path_filter=lambda paths: [p for p in paths if p != "skipped"],
+    )
+    job.batchready.connect(batches.append)
+    with qtbot.waitSignal(job.finished):
+        job.start(open_=True)
+        qtbot.waitUntil(lambda: len(batches) > 0)
+        job.extend(["c", "skipped", "d"])
+        job.close()
+
+    paths = [path for batch in batches for path, _ in batch]
+    assert paths == ["a", "b", "c", "d"]
+    assert [metadata.title for batch in batches for _, metadata in batch] == paths
+    assert job.failed_paths == ["bad"]
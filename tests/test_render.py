@@ -0,0 +1,67 @@
+import ctypes
+
+from app.vlcqt._render import FrameBuffer
+
+
+def make_buffer(width=2, height=2):
+    buffer = FrameBuffer()
+    buffer._on_format(
+        None,
+        (ctypes.c_char * 4)(),
+        (ctypes.c_uint * 1)(width),
+        (ctypes.c_uint * 1)(height),
+        (ctypes.c_uint * 1)(),
+        (ctypes.c_uint * 1)(),
+    )
+    return buffer
+
+
+def lock(buffer, value):
+    """Locks a picture and fills it with 'value', as libvlc decodes into it."""
+    planes = (ctypes.c_void_p * 1)()
+    picture = buffer._on_lock(None, planes)
+    ctypes.memset(planes[0], value, len(buffer._buffers[0]))
+    buffer._on_unlock(None, picture, planes)
+    return picture
+
+
+def front_value(buffer):
+    return buffer.image().constBits().asstring(1)[0]
+
+
+def test_pictures_locked_ahead_are_displayed_from_their_own_buffers():
+    buffer = make_buffer()
+    assert buffer.image().isNull()
+
+    first = lock(buffer, 1)
+    second = lock(buffer, 2)
+    assert first and second and first != second
+    buffer._on_display(None, first)
+    assert front_value(buffer) == 1
+    third = lock(buffer, 3)  # Must not overwrite the front picture
+    assert front_value(buffer) == 1
+    buffer._on_display(None, second)
+    assert front_value(buffer) == 2
+    buffer._on_display(None, third)
+    assert front_value(buffer) == 3
+    assert buffer.frame_count == 3
+
+
+def test_dropped_pictures_free_their_buffers():
+    buffer = make_buffer()
+    for value in range(1, 10):
+        lock(buffer, 100)
+        shown = lock(buffer, value)
+        buffer._on_display(None, shown)  # The first one is never displayed
+        assert front_value(buffer) == value
+    assert len(buffer._free) + len(buffer._locked) == buffer.buffer_count - 1
+
+
+def test_reused_picture_is_not_displayed():
+    buffer = make_buffer()
+    stale = lock(buffer, 1)
+    lock(buffer, 2)
+    lock(buffer, 3)  # No free buffer left, reuses the oldest one
+    buffer._on_display(None, stale)
+    assert buffer.frame_count == 0
+    assert buffer.image().isNull()
@@ -0,0 +1,24 @@
+from app.playlist.scan import is_media_candidate, walk_media
+
+
+def test_walk_media_prefilter(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "b.MKV").write_bytes(b"")
+    (tmp_path / "a.mp4").write_bytes(b"")
+    (tmp_path / "readme.txt").write_text("not media")
+    (tmp_path / "thumb.jpg").write_bytes(b"\xff\xd8\xff")
+    (tmp_path / "noext").write_bytes(b"\x00\x00\x00\x18ftypisom")
+    (tmp_path / "notes").write_text("plain text")
+    (tmp_path / "sub" / "c.webm").write_bytes(b"")
+
+    assert list(walk_media(str(tmp_path))) == [
+        (str(tmp_path), [str(tmp_path / n) for n in ("a.mp4", "b.MKV", "noext")]),
+        (str(tmp_path / "sub"), [str(tmp_path / "sub" / "c.webm")]),
+    ]
+    assert len(list(walk_media(str(tmp_path), recursive=False))) == 1
+
+
+def test_transport_stream_signature(tmp_path):
+    path = tmp_path / "capture"
+    path.write_bytes((b"\x47" + bytes(187)) * 2)
+    assert is_media_candidate(str(path))
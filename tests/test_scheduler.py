@@ -0,0 +1,77 @@
+import pytest
+
+from app.playlist.scheduler import FrameScheduler
+
+MS = 1_000_000
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000 * MS
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def scheduler(qapp):
+    scheduler = FrameScheduler()
+    scheduler.clock = FakeClock()
+    scheduler.set_frame_rate(50)  # 20 ms periods
+    ticks = []
+    scheduler.ticked.connect(lambda: ticks.append(scheduler.clock.now))
+    scheduler.ticks = ticks
+    yield scheduler
+    scheduler.stop()
+
+
+def test_ticks_keep_absolute_deadlines(scheduler):
+    clock = scheduler.clock
+    start = clock.now
+    scheduler.start()
+    assert scheduler.timer.interval() == 20
+
+    # Late wake-ups don't push later deadlines back
+    for late in (3, 7, 1):
+        clock.now = scheduler._deadline + late * MS
+        scheduler._on_timeout()
+    assert len(scheduler.ticks) == 3
+    assert scheduler._deadline == start + 4 * 20 * MS
+    assert scheduler.timer.interval() == 19  # Rounded up from 19 ms
+    assert scheduler.missed_count == 0
+
+    # An early wake-up re-arms the timer without ticking
+    clock.now = scheduler._deadline - 5 * MS
+    scheduler._on_timeout()
+    assert len(scheduler.ticks) == 3
+    assert scheduler.timer.interval() == 5
+
+    # Within the tolerance counts as on time
+    clock.now = scheduler._deadline - scheduler.tolerance_ns // 2
+    scheduler._on_timeout()
+    assert len(scheduler.ticks) == 4
+
+
+def test_missed_periods_are_dropped(scheduler):
+    clock = scheduler.clock
+    start = clock.now
+    scheduler.start()
+
+    clock.now = start + 20 * MS + 3 * 20 * MS + 5 * MS  # Three periods late
+    scheduler._on_timeout()
+    assert len(scheduler.ticks) == 1  # Not a burst of four
+    assert scheduler.missed_count == 3
+    assert scheduler._deadline == start + 5 * 20 * MS
+    assert scheduler.timer.interval() == 15
+
+    clock.now = scheduler._deadline
+    scheduler._on_timeout()
+    assert len(scheduler.ticks) == 2
+    assert scheduler.missed_count == 3
+
+
+def test_frame_rate_and_playback_rate_set_the_period(scheduler):
+    scheduler.set_frame_rate(25, rate=2.0)
+    assert scheduler.period_ns == 20 * MS
+    scheduler.set_frame_rate(0, rate=0)
+    assert scheduler.period_ns == round(1e9 / scheduler.default_fps)
@@ -0,0 +1,76 @@
+from PyQt5.QtCore import QSettings
+
+from app.config import state
+from app.playlist.metadata import MediaMetadata
+from app.playlist.model import MediaItem, PlaylistModel
+from app.playlist.search import PlaylistFilterProxyModel, SearchIndex, tokenize
+
+
+def test_tokenize():
+    assert tokenize("Über-Cool_clip02 (2019).MP4") == [
+        "über",
+        "cool",
+        "clip",
+        "02",
+        "2019",
+        "mp",
+        "4",
+    ]
+
+
+def test_search_by_prefixes():
+    texts = {1: "Alpine lake 360", 2: "Alps drone", 3: "City at night", 4: "lake"}
+    index = SearchIndex(text_of=texts.get)
+    index.add(texts)
+
+    assert index.search("alp") == {1, 2}
+    assert index.search("LAKE alp") == {1}
+    assert index.search("al  ") == {1, 2}
+    assert index.search("nothing") == set()
+    assert index.search(" - ") is None
+    assert index.search("36") == {1}
+
+
+def test_incremental_updates():
+    texts = {1: "red fox", 2: "red panda"}
+    index = SearchIndex(text_of=texts.get)
+    index.add(texts)
+
+    index.remove([1])
+    assert index.search("red") == {2}
+    assert index.search("fox") == set()
+
+    texts[3] = "fox cub"
+    index.add([3])
+    assert index.search("fo") == {3}
+
+    texts[2] = "blue whale"
+    index.update([2])
+    assert index.search("red") == set()
+    assert index.search("wh") == {2}
+    assert len(index) == 2
+
+
+def test_filter_sees_updates_of_unfetched_rows(tmp_path):
+    state.load(QSettings(str(tmp_path / "settings.ini"), QSettings.IniFormat))
+    state.meta_tags = ["title"]
+    model = PlaylistModel()
+    model.fetch_batch_size = 2
+    items = [MediaItem(f"/{n}.mp4", metadata=MediaMetadata(str(n))) for n in range(6)]
+    model.append_items(items)
+    proxy = PlaylistFilterProxyModel()
+    proxy.setSourceModel(model)
+    assert model.rowCount() == 2
+
+    model.update_item(items[4], MediaMetadata("Cockatoo"))
+    proxy.set_filter_text("cockatoo")
+    assert proxy.rowCount() == 1
+    assert proxy.data(proxy.index(0, 0)) == "Cockatoo"
+
+    # While filtering, updated items join or leave the matching rows
+    model.update_item(items[1], MediaMetadata("Cockatoo chick"))
+    assert proxy.rowCount() == 2
+    model.update_item(items[4], MediaMetadata("Parrot"))
+    assert [proxy.data(proxy.index(row, 0)) for row in range(proxy.rowCount())] == [
+        "Cockatoo chick"
+    ]
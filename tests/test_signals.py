@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+
+import vlc
+
+from app.vlcqt._signals import MediaPlayerVlclibSignals
+
+
+class FakeEventManager:
+    def __init__(self):
+        self.callbacks = {}  # Event type value: callback
+
+    def event_attach(self, e_type, callback):
+        self.callbacks[e_type.value] = callback
+
+    def event_detach(self, e_type):
+        del self.callbacks[e_type.value]
+
+    def fire(self, e_type, **values):
+        e = vlc.Event()
+        e.type = e_type
+        for name, value in values.items():
+            setattr(e.u, name, value)
+        self.callbacks[e_type.value](e)
+
+
+def make_signals():
+    manager = FakeEventManager()
+    player = SimpleNamespace(event_manager=lambda: manager)
+    return MediaPlayerVlclibSignals(player), manager
+
+
+def test_events_are_attached_while_signals_have_receivers():
+    signals, manager = make_signals()
+    playing = vlc.EventType.MediaPlayerPlaying.value
+    position = vlc.EventType.MediaPlayerPositionChanged.value
+    assert manager.callbacks == {}
+
+    events, other_events = [], []
+    signals.playing.connect(events.append)
+    signals.playing.connect(other_events.append)
+    assert list(manager.callbacks) == [playing]
+    manager.fire(vlc.EventType.MediaPlayerPlaying)
+    assert (len(events), len(other_events)) == (1, 1)
+    assert signals.emission_counts["playing"] == 1
+    signals.playing.disconnect(other_events.append)
+    assert list(manager.callbacks) == [playing]
+    signals.playing.disconnect(events.append)
+    assert manager.callbacks == {}
+
+    # Two signals read the position event, it stays attached until neither has
+    # receivers
+    signals.positionchanged.connect(events.append)
+    signals.positionupdated.connect(events.append)
+    signals.positionchanged.disconnect(events.append)
+    assert list(manager.callbacks) == [position]
+    signals.positionupdated.disconnect(events.append)
+    assert manager.callbacks == {}
+
+
+def test_time_events_are_coalesced_to_the_latest_value(qtbot):
+    signals, manager = make_signals()
+    times = []
+    signals.timeupdated.connect(times.append)
+
+    # The first value is emitted at once, then the latest at most once per interval
+    for time in (100, 200, 300):
+        manager.fire(vlc.EventType.MediaPlayerTimeChanged, new_time=time)
+    assert times == [100]
+    qtbot.waitUntil(lambda: len(times) == 2)
+    assert times == [100, 300]
+
+    # Unchanged values are not emitted again
+    qtbot.waitUntil(lambda: not signals._bridge.timer.isActive())
+    manager.fire(vlc.EventType.MediaPlayerTimeChanged, new_time=300)
+    qtbot.wait(signals._bridge.interval * 2)
+    assert times == [100, 300]
+    assert signals.emission_counts["timeupdated"] == 2
@@ -0,0 +1,21 @@
+from math import isnan
+
+from app.playlist.sorting import argsort, parse_date, parse_duration, sort_keys
+
+
+def test_typed_sort_keys():
+    assert list(sort_keys("Track Number", ["10/12", "2", None])[:2]) == [10.0, 2.0]
+    assert isnan(sort_keys("track number", [None])[0])
+    assert parse_duration("01:02:03.5") == 3723.5
+    assert parse_duration("12.5") == 12.5
+    assert parse_date("2019-05-01T12:30:00Z") == 20190501123000
+    assert parse_date("2019") < parse_date("2019-01-02") < parse_date("2020")
+    assert isnan(parse_date("05/01/2019"))
+    assert sort_keys("title", ["B", None]) == ["b", None]
+
+
+def test_argsort_is_stable_with_missing_keys_last():
+    keys = sort_keys("track number", ["2", None, "1", "2", "x"])
+    assert argsort(keys) == [2, 0, 3, 1, 4]
+    assert argsort(keys, descending=True) == [0, 3, 2, 1, 4]
+    assert argsort(["b", "a", None, "a"]) == [1, 3, 0, 2]
@@ -0,0 +1,36 @@
+import pytest
+from PyQt5.QtCore import QSettings
+
+from app.config import state
+
+
+@pytest.fixture
+def settings(tmp_path):
+    settings = QSettings(str(tmp_path / "settings.ini"), QSettings.IniFormat)
+    settings.setValue("loop_mode", "bogus")  # Not an option, so reset on load
+    state.load(settings)
+    return settings
+
+
+def test_state_reads_and_writes_memory(settings):
+    assert state.loop_mode == "off"
+    changes = []
+    state.signals.changed.connect(lambda key, value: changes.append((key, value)))
+
+    state.volume = "30"
+    state.volume = 30  # Unchanged
+    assert state.volume == 30
+    assert changes == [("volume", 30)]
+    with pytest.raises(ValueError):
+        state.loop_mode = "bogus"
+
+
+def test_state_flushes_writes_together(qtbot, settings):
+    state.volume = 20
+    state.view_scale = 2.0
+    assert settings.value("volume") is None
+    assert state.flush_timer.isActive()
+
+    qtbot.waitUntil(lambda: not state.flush_timer.isActive())
+    assert settings.value("volume", type=int) == 20
+    assert settings.value("view_scale", type=float) == 2.0
@@ -0,0 +1,38 @@
+import os
+
+from app.playlist.thumbnails import ThumbnailCache, seek_time
+
+
+def test_seek_time():
+    assert seek_time(0) == 0
+    assert seek_time(20) == 2
+    assert seek_time(3600) == 30
+
+
+def test_cache_keys_and_eviction(tmp_path):
+    media = tmp_path / "a.mp4"
+    media.write_bytes(b"media")
+    cache = ThumbnailCache(str(tmp_path / "thumbnails"), max_size=250)
+
+    assert cache.get(str(media), (160, 90), False) is None
+    cache.put(str(media), (160, 90), False, b"x" * 100)
+    assert cache.get(str(media), (160, 90), False) == b"x" * 100
+    assert cache.get(str(media), (320, 180), False) is None
+    assert cache.get(str(media), (160, 90), True) is None  # Cropped differently
+
+    # A modified file is a different key
+    os.utime(media, ns=(0, 0))
+    assert cache.get(str(media), (160, 90), False) is None
+
+    # Failures are cached as empty thumbnails, files that can't be read aren't
+    broken = tmp_path / "b.mp4"
+    broken.write_bytes(b"broken")
+    cache.put(str(broken), (160, 90), False, b"")
+    assert cache.get(str(broken), (160, 90), False) == b""
+    cache.put(str(tmp_path / "missing.mp4"), (160, 90), False, b"z")
+    assert cache.stats()["entries"] == 2
+
+    for size in range(3):
+        cache.put(str(media), (size, size), False, b"y" * 100)
+    assert cache.stats()["size"] <= 250 * 0.9
+    assert cache.get(str(media), (2, 2), False) == b"y" * 100